@@ -1,4 +1,5 @@
 from rest_framework import generics, filters
+from catalog.specs import SpecFilterBackend
 from .models import AudioDevice
 from .serializers import AudioDeviceSerializer
 
@@ -10,10 +11,11 @@ class AudioDeviceListView(generics.ListAPIView):
       - category=Buds|Earphones|Speakers|Headphones|Soundbars|Microphones|Others
       - search=<text>   (searches name/specs_text/brand/category)
       - ordering=created_at|price_min_ksh|price_max_ksh|name (prefix with '-' for desc)
+      - ram_gb, storage_gb, battery_mah, camera_mp, display_inches (=, _min=, _max=; see catalog.specs)
     """
     serializer_class = AudioDeviceSerializer
     queryset = AudioDevice.objects.all()
-    filter_backends = [filters.SearchFilter, filters.OrderingFilter]
+    filter_backends = [filters.SearchFilter, filters.OrderingFilter, SpecFilterBackend]
     search_fields = ["name", "specs_text", "brand", "category"]
     ordering_fields = ["created_at", "price_min_ksh", "price_max_ksh", "name"]
     ordering = ["brand", "name"]
@@ -0,0 +1,63 @@
+# authapp/authentication.py
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication, JWTStatelessUserAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+
+USER_CACHE_KEY = "authapp:user:{}"
+
+
+def invalidate_cached_user(user_id) -> None:
+    cache.delete(USER_CACHE_KEY.format(user_id))
+
+
+def add_user_claims(token, user):
+    """
+    Copy the fields the stateless path needs into the token, so
+    TokenClaimsAuthentication can build a user without touching the DB.
+    Claims set on a refresh token are carried over to its access tokens.
+    """
+    token["username"] = user.username
+    token["email"] = user.email
+    token["is_staff"] = user.is_staff
+    return token
+
+
+class TokenClaimsAuthentication(JWTStatelessUserAuthentication):
+    """
+    Zero-query authentication for read-only endpoints.
+
+    request.user is a simplejwt TokenUser built from the token claims; it has
+    id/pk, username, is_staff and is_superuser but is not a model instance,
+    so views must filter on `user_id=request.user.id`, not `user=request.user`.
+    """
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """
+    JWTAuthentication with a short-TTL cache in front of the user lookup.
+    Entries are dropped on every User save/delete (authapp.signals), so a
+    password change or deactivation takes effect on the next request; that
+    needs a cache shared by all workers (CACHE_REDIS_URL). With
+    AUTH_USER_CACHE_TTL=0 (the default without one) every request reads the row.
+    """
+
+    def get_user(self, validated_token):
+        ttl = getattr(settings, "AUTH_USER_CACHE_TTL", 0)
+        if ttl <= 0:
+            return super().get_user(validated_token)
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken(_("Token contained no recognizable user identification"))
+
+        key = USER_CACHE_KEY.format(user_id)
+        user = cache.get(key)
+        if user is None:
+            user = super().get_user(validated_token)
+            cache.set(key, user, ttl)
+        elif not user.is_active:
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+        return user
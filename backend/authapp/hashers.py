@@ -0,0 +1,38 @@
+# authapp/hashers.py
+from django.conf import settings
+from django.contrib.auth.hashers import PBKDF2PasswordHasher, ScryptPasswordHasher
+
+
+class TunablePBKDF2PasswordHasher(PBKDF2PasswordHasher):
+    """
+    PBKDF2-SHA256 with the iteration count taken from settings.PBKDF2_ITERATIONS.
+    Same algorithm name as Django's hasher, so existing hashes keep verifying and
+    are re-encoded on the next successful login when the count changes.
+    """
+
+    @property
+    def iterations(self):
+        return settings.PBKDF2_ITERATIONS
+
+
+class TunableScryptPasswordHasher(ScryptPasswordHasher):
+    """
+    Memory-hard scrypt hasher; cost parameters come from settings.SCRYPT_*.
+    """
+
+    @property
+    def work_factor(self):
+        return settings.SCRYPT_WORK_FACTOR
+
+    @property
+    def block_size(self):
+        return settings.SCRYPT_BLOCK_SIZE
+
+    @property
+    def parallelism(self):
+        return settings.SCRYPT_PARALLELISM
+
+    @property
+    def maxmem(self):
+        # scrypt needs ~128 * n * r bytes; leave headroom over OpenSSL's 32 MiB default.
+        return 256 * self.work_factor * self.block_size
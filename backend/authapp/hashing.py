@@ -0,0 +1,89 @@
+# authapp/hashing.py
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.contrib.auth.hashers import check_password, make_password
+from rest_framework import status
+from rest_framework.exceptions import APIException
+
+logger = logging.getLogger(__name__)
+
+
+class LoginBusy(APIException):
+    """
+    Raised when the hashing pool is full. DRF turns `wait` into a Retry-After header.
+    """
+    status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+    default_detail = "Too many logins right now, please retry shortly."
+    default_code = "login_busy"
+
+    def __init__(self, wait):
+        super().__init__()
+        self.wait = wait
+
+
+class _HashPool:
+    """
+    Bounded pool for password verification.
+
+    hashlib's pbkdf2/scrypt release the GIL, so threads give real parallelism.
+    At most `workers` hashes run at once and at most `queue_depth` more wait;
+    anything beyond that is rejected immediately instead of piling up behind
+    the request threads.
+    """
+
+    def __init__(self, workers, queue_depth):
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="login-hash")
+        self.slots = threading.BoundedSemaphore(workers + queue_depth)
+
+    def submit(self, fn, *args):
+        if not self.slots.acquire(blocking=False):
+            return None
+        future = self.executor.submit(fn, *args)
+        future.add_done_callback(lambda _f: self.slots.release())
+        return future
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def _get_pool():
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = _HashPool(settings.LOGIN_HASH_WORKERS, settings.LOGIN_HASH_QUEUE_DEPTH)
+    return _pool
+
+
+def _verify(raw_password, encoded):
+    """
+    Runs in a pool thread; touches no DB. Returns (is_correct, new_encoded),
+    where new_encoded is set when the stored hash uses an outdated hasher or cost.
+    """
+    upgraded = []
+    ok = check_password(raw_password, encoded, setter=lambda raw: upgraded.append(make_password(raw)))
+    return ok, (upgraded[0] if upgraded else None)
+
+
+def verify_login_password(user, raw_password) -> bool:
+    """
+    Verify `raw_password` for `user` on the hashing pool and transparently
+    upgrade the stored hash (e.g. PBKDF2 -> scrypt) on success.
+
+    Raises:
+        LoginBusy: if the pool and its queue are full.
+    """
+    future = _get_pool().submit(_verify, raw_password, user.password)
+    if future is None:
+        logger.warning("Login hash pool saturated; rejecting login for user_id=%s", user.pk)
+        raise LoginBusy(settings.LOGIN_RETRY_AFTER)
+
+    ok, new_encoded = future.result()
+    if ok and new_encoded:
+        user.password = new_encoded
+        user.save(update_fields=["password"])
+    return ok
@@ -0,0 +1,71 @@
+# authapp/management/commands/bench_login.py
+import os
+import threading
+import time
+
+from django.conf import settings
+from django.contrib.auth.hashers import check_password, get_hasher, make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.utils.module_loading import import_string
+
+from authapp.hashing import _HashPool, _verify
+
+
+class Command(BaseCommand):
+    help = "Measure password verifications per second (per core) for the configured hashers."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--hasher", default="default",
+                            help='Hasher algorithm name (e.g. "pbkdf2_sha256", "scrypt") or "all".')
+        parser.add_argument("--seconds", type=float, default=5.0)
+        parser.add_argument("--threads", type=int, default=os.cpu_count() or 1)
+        parser.add_argument("--pool", action="store_true",
+                            help="Go through the login hash pool (authapp.hashing) instead of calling hashers directly.")
+
+    def handle(self, *args, **opts):
+        if opts["hasher"] == "all":
+            algorithms = list(dict.fromkeys(import_string(path).algorithm for path in settings.PASSWORD_HASHERS))
+        else:
+            algorithms = [opts["hasher"]]
+
+        cores = min(opts["threads"], os.cpu_count() or 1)
+        for algorithm in algorithms:
+            try:
+                encoded = make_password("bench-Passw0rd!", hasher=algorithm)
+            except Exception as e:  # unknown algorithm or missing optional library (argon2-cffi)
+                self.stdout.write(self.style.WARNING(f"{algorithm}: skipped ({e})"))
+                continue
+
+            count = self._run(encoded, opts["threads"], opts["seconds"], opts["pool"])
+            rate = count / opts["seconds"]
+            self.stdout.write(
+                f"{get_hasher(algorithm).algorithm:<16} {rate:8.1f} logins/s total  "
+                f"{rate / cores:8.1f} logins/s/core  ({opts['threads']} threads, {cores} cores)"
+            )
+
+    def _run(self, encoded, threads, seconds, use_pool):
+        deadline = time.perf_counter() + seconds
+        counts = [0] * threads
+        pool = _HashPool(threads, 0) if use_pool else None
+
+        def worker(i):
+            while time.perf_counter() < deadline:
+                if pool is not None:
+                    future = pool.submit(_verify, "bench-Passw0rd!", encoded)
+                    if future is None:
+                        continue
+                    ok, _ = future.result()
+                else:
+                    ok = check_password("bench-Passw0rd!", encoded)
+                if not ok:
+                    raise CommandError("Password verification failed during benchmark.")
+                counts[i] += 1
+
+        ts = [threading.Thread(target=worker, args=(i,)) for i in range(threads)]
+        for t in ts:
+            t.start()
+        for t in ts:
+            t.join()
+        if pool is not None:
+            pool.executor.shutdown()
+        return sum(counts)
@@ -3,14 +3,18 @@ from django.contrib.auth import get_user_model
 from rest_framework import serializers
 from rest_framework_simplejwt.tokens import RefreshToken
 
+from backend.metrics import TimedModelSerializer
+from .authentication import add_user_claims
+from .hashing import verify_login_password
+
 User = get_user_model()
 
-class UserSerializer(serializers.ModelSerializer):
+class UserSerializer(TimedModelSerializer):
     class Meta:
         model = User
         fields = ["id", "username", "email"]
 
-class UserRegistrationSerializer(serializers.ModelSerializer):
+class UserRegistrationSerializer(TimedModelSerializer):
     password = serializers.CharField(write_only=True)
     class Meta:
         model = User
@@ -27,8 +31,9 @@ class UserLoginSerializer(serializers.Serializer):
     password = serializers.CharField(write_only=True)
     def validate(self, data):
         user = User.objects.filter(email=data["email"]).first()
-        if user and user.check_password(data["password"]):
-            refresh = RefreshToken.for_user(user)
+        # Hash verification runs on a bounded pool; may raise LoginBusy (503).
+        if user and verify_login_password(user, data["password"]):
+            refresh = add_user_claims(RefreshToken.for_user(user), user)
             return {
                 "user": UserSerializer(user).data,
                 "refresh": str(refresh),
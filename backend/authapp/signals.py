@@ -0,0 +1,19 @@
+# authapp/signals.py
+from django.contrib.auth import get_user_model
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .authentication import invalidate_cached_user
+
+User = get_user_model()
+
+
+@receiver(post_save, sender=User)
+def drop_cached_user_on_save(sender, instance, **kwargs):
+    # Covers password changes (set_password + save) and deactivation.
+    invalidate_cached_user(instance.pk)
+
+
+@receiver(post_delete, sender=User)
+def drop_cached_user_on_delete(sender, instance, **kwargs):
+    invalidate_cached_user(instance.pk)
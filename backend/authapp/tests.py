@@ -0,0 +1,137 @@
+import threading
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from rest_framework_simplejwt.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.tokens import AccessToken
+
+from backend import throttling
+from backend.throttling import LocalTokenBucketBackend
+
+from . import hashing
+from .authentication import CachedJWTAuthentication
+
+
+@override_settings(THROTTLE_RATES={"login": "2/min", "forgot_password": "2/min"})
+class AuthThrottleTests(TestCase):
+    def setUp(self):
+        throttling._backend = LocalTokenBucketBackend()
+        self.addCleanup(setattr, throttling, "_backend", None)
+        get_user_model().objects.create_user("jane", "jane@example.com", "s3cret-pw")
+
+    def post(self, url, email, ip="10.0.0.1"):
+        return self.client.post(url, {"email": email, "password": "nope"}, REMOTE_ADDR=ip)
+
+    def test_repeated_login_gets_429(self):
+        self.assertEqual(self.post("/api/auth/login/", "jane@example.com").status_code, 400)
+        self.assertEqual(self.post("/api/auth/login/", "jane@example.com").status_code, 400)
+        response = self.post("/api/auth/login/", "jane@example.com")
+        self.assertEqual(response.status_code, 429)
+        self.assertIn("Retry-After", response)
+
+    def test_login_is_throttled_per_email_across_addresses(self):
+        for ip in ("10.0.0.1", "10.0.0.2"):
+            self.assertEqual(self.post("/api/auth/login/", "Jane@example.com", ip).status_code, 400)
+        self.assertEqual(self.post("/api/auth/login/", "jane@example.com ", "10.0.0.3").status_code, 429)
+
+    def test_login_is_throttled_per_address_across_emails(self):
+        for email in ("a@example.com", "b@example.com"):
+            self.assertEqual(self.post("/api/auth/login/", email).status_code, 400)
+        self.assertEqual(self.post("/api/auth/login/", "c@example.com").status_code, 429)
+        self.assertEqual(self.post("/api/auth/login/", "c@example.com", "10.0.0.2").status_code, 400)
+
+    def test_repeated_forgot_password_gets_429(self):
+        for ip in ("10.0.0.1", "10.0.0.2"):
+            self.assertEqual(self.post("/api/auth/forgot-password/", "jane@example.com", ip).status_code, 200)
+        response = self.post("/api/auth/forgot-password/", "jane@example.com", "10.0.0.3")
+        self.assertEqual(response.status_code, 429)
+        self.assertIn("Retry-After", response)
+
+    def test_login_and_forgot_password_buckets_are_separate(self):
+        for _ in range(2):
+            self.post("/api/auth/login/", "jane@example.com")
+        self.assertEqual(self.post("/api/auth/forgot-password/", "jane@example.com").status_code, 200)
+
+
+class CachedJWTAuthenticationTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = get_user_model().objects.create_user("jane", "jane@example.com", "pw")
+        self.token = AccessToken.for_user(self.user)
+        self.auth = CachedJWTAuthentication()
+
+    @override_settings(AUTH_USER_CACHE_TTL=0)
+    def test_no_caching_without_a_ttl(self):
+        for _ in range(2):
+            with self.assertNumQueries(1):
+                self.auth.get_user(self.token)
+
+    @override_settings(AUTH_USER_CACHE_TTL=60)
+    def test_cached_until_the_user_is_saved(self):
+        with self.assertNumQueries(1):
+            self.auth.get_user(self.token)
+        with self.assertNumQueries(0):
+            self.auth.get_user(self.token)
+
+        self.user.is_active = False
+        self.user.save()
+        with self.assertRaises(AuthenticationFailed):
+            self.auth.get_user(self.token)
+
+
+@override_settings(PBKDF2_ITERATIONS=1000, LOGIN_RETRY_AFTER=7)
+class LoginHashingTests(TestCase):
+    def setUp(self):
+        throttling._backend = LocalTokenBucketBackend()
+        self.addCleanup(setattr, throttling, "_backend", None)
+        self.user = get_user_model().objects.create_user("jane", "jane@example.com", "s3cret-pw")
+
+    def login(self):
+        return self.client.post("/api/auth/login/", {"email": "jane@example.com", "password": "s3cret-pw"})
+
+    def test_saturated_pool_answers_503_with_retry_after(self):
+        pool = hashing._HashPool(workers=1, queue_depth=0)
+        release = threading.Event()
+        self.addCleanup(pool.executor.shutdown)
+        self.addCleanup(release.set)
+        self.addCleanup(setattr, hashing, "_pool", None)
+        hashing._pool = pool
+        pool.submit(release.wait)  # the only slot is taken
+
+        response = self.login()
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(response["Retry-After"], "7")
+
+        release.set()
+        pool.executor.shutdown(wait=True)
+        hashing._pool = None
+        self.assertEqual(self.login().status_code, 200)
+
+    def test_outdated_cost_is_rehashed_on_login(self):
+        with override_settings(PBKDF2_ITERATIONS=2000):
+            self.assertEqual(self.login().status_code, 200)
+        self.user.refresh_from_db()
+        self.assertTrue(self.user.password.startswith("pbkdf2_sha256$2000$"))
+        with override_settings(PBKDF2_ITERATIONS=2000):
+            self.assertEqual(self.login().status_code, 200)
+
+    @override_settings(PASSWORD_HASHERS=[
+        "authapp.hashers.TunablePBKDF2PasswordHasher", "django.contrib.auth.hashers.MD5PasswordHasher",
+    ])
+    def test_outdated_algorithm_is_rehashed_on_login(self):
+        self.user.password = make_password("s3cret-pw", hasher="md5")
+        self.user.save(update_fields=["password"])
+
+        self.assertEqual(self.login().status_code, 200)
+        self.user.refresh_from_db()
+        self.assertTrue(self.user.password.startswith("pbkdf2_sha256$1000$"))
+
+    def test_wrong_password_is_not_rehashed(self):
+        before = self.user.password
+        with override_settings(PBKDF2_ITERATIONS=2000):
+            response = self.client.post("/api/auth/login/", {"email": "jane@example.com", "password": "nope"})
+        self.assertEqual(response.status_code, 400)
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.password, before)
@@ -4,7 +4,6 @@ import logging
 from django.conf import settings
 from django.contrib.auth import get_user_model
 from django.contrib.auth.tokens import PasswordResetTokenGenerator
-from django.core.mail import send_mail
 from django.utils.encoding import force_bytes, force_str
 from django.utils.http import urlsafe_base64_encode, urlsafe_base64_decode
 
@@ -12,6 +11,8 @@ from rest_framework import permissions, status
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
+from mailer.queue import enqueue_mail
+from backend.throttling import EmailTokenBucketThrottle, IPTokenBucketThrottle
 from .serializers import (
     UserRegistrationSerializer,
     UserLoginSerializer,
@@ -25,8 +26,29 @@ User = get_user_model()
 token_generator = PasswordResetTokenGenerator()
 
 
+class LoginIPThrottle(IPTokenBucketThrottle):
+    scope = "login"
+
+
+class LoginEmailThrottle(EmailTokenBucketThrottle):
+    scope = "login"
+
+
+class RegisterIPThrottle(IPTokenBucketThrottle):
+    scope = "register"
+
+
+class ForgotPasswordIPThrottle(IPTokenBucketThrottle):
+    scope = "forgot_password"
+
+
+class ForgotPasswordEmailThrottle(EmailTokenBucketThrottle):
+    scope = "forgot_password"
+
+
 class RegisterView(APIView):
     permission_classes = [permissions.AllowAny]
+    throttle_classes = [RegisterIPThrottle]
 
     def post(self, request):
         s = UserRegistrationSerializer(data=request.data)
@@ -38,6 +60,7 @@ class RegisterView(APIView):
 
 class LoginView(APIView):
     permission_classes = [permissions.AllowAny]
+    throttle_classes = [LoginIPThrottle, LoginEmailThrottle]
 
     def post(self, request):
         s = UserLoginSerializer(data=request.data)
@@ -59,6 +82,7 @@ class ForgotPasswordView(APIView):
     Always 200 to avoid email enumeration.
     """
     permission_classes = [permissions.AllowAny]
+    throttle_classes = [ForgotPasswordIPThrottle, ForgotPasswordEmailThrottle]
 
     def post(self, request):
         s = ForgotPasswordSerializer(data=request.data)
@@ -85,15 +109,16 @@ class ForgotPasswordView(APIView):
             """
 
             try:
-                send_mail(
-                    subject=subject,
-                    message=text_message,
+                # Spooled; the mailer worker delivers it over a reused SMTP connection.
+                enqueue_mail(
+                    subject,
+                    text_message,
+                    [email],
+                    html_body=html_message,
                     from_email=getattr(settings, "DEFAULT_FROM_EMAIL", getattr(settings, "EMAIL_HOST_USER", None)),
-                    recipient_list=[email],
-                    html_message=html_message,
-                    fail_silently=False,  # raise so we can log
+                    tag="password_reset",
                 )
-                logger.info("Password reset email sent to %s", email)
+                logger.info("Password reset email queued for %s", email)
             except Exception:
                 logger.exception("Password reset email FAILED for %s", email)
 
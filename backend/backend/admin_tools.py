@@ -0,0 +1,106 @@
+# backend/admin_tools.py
+"""
+Admin helpers for large tables.
+
+- EstimatedCountPaginator: unfiltered changelists use the database's row
+  estimate instead of COUNT(*), which is a full index scan on InnoDB.
+- LargeTableAdmin: ModelAdmin base using it (and skipping the second
+  "x of N total" count on filtered pages).
+- AutocompleteFilter: sidebar filter for a foreign key that searches the
+  related model through the admin autocomplete endpoint instead of listing
+  every related row.
+"""
+from django.conf import settings
+from django.contrib import admin
+from django.core.paginator import Paginator
+from django.db import connections
+from django.urls import reverse
+from django.utils.functional import cached_property
+
+
+def estimated_row_count(model, using="default"):
+    """Table row estimate from the database statistics, or None if unavailable."""
+    connection = connections[using]
+    table = model._meta.db_table
+    if connection.vendor == "mysql":
+        sql = "SELECT TABLE_ROWS FROM information_schema.TABLES WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s"
+    elif connection.vendor == "postgresql":
+        sql = "SELECT reltuples::bigint FROM pg_class WHERE relname = %s"
+    else:
+        return None
+    with connection.cursor() as cursor:
+        cursor.execute(sql, [table])
+        row = cursor.fetchone()
+    if not row or row[0] is None or row[0] < 0:
+        return None
+    return int(row[0])
+
+
+class EstimatedCountPaginator(Paginator):
+    @cached_property
+    def count(self):
+        qs = self.object_list
+        threshold = getattr(settings, "ADMIN_ESTIMATED_COUNT_THRESHOLD", 100_000)
+        # Only an unfiltered queryset matches the table statistics.
+        if hasattr(qs, "query") and not qs.query.where:
+            estimate = estimated_row_count(qs.model, qs.db)
+            if estimate is not None and estimate >= threshold:
+                return estimate
+        return super().count
+
+
+class LargeTableAdmin(admin.ModelAdmin):
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+
+
+class AutocompleteFilter(admin.SimpleListFilter):
+    """
+    Subclass with `title` and `field_name` (a ForeignKey on the admin's model).
+    The related model's admin must define search_fields.
+    """
+    template = "admin/autocomplete_filter.html"
+    field_name = None
+
+    def __init__(self, request, params, model, model_admin):
+        self.parameter_name = f"{self.field_name}__id__exact"
+        self.field = model._meta.get_field(self.field_name)
+        self.source_opts = model._meta
+        super().__init__(request, params, model, model_admin)
+
+    def lookups(self, request, model_admin):
+        return ()
+
+    def has_output(self):
+        return True
+
+    def queryset(self, request, queryset):
+        value = self.value()
+        if value:
+            return queryset.filter(**{self.field.attname: value})
+        return queryset
+
+    def choices(self, changelist):
+        value = self.value()
+        selected = None
+        if value:
+            selected = self.field.related_model._default_manager.filter(pk=value).first()
+        yield {
+            "selected": selected,
+            "value": value or "",
+            "parameter_name": self.parameter_name,
+            "clear_url": changelist.get_query_string(remove=[self.parameter_name]),
+            "ajax_url": reverse("admin:autocomplete"),
+            "app_label": self.source_opts.app_label,
+            "model_name": self.source_opts.model_name,
+            "field_name": self.field_name,
+        }
+
+
+class AutocompleteFilterMixin:
+    """Adds the select2 assets AutocompleteFilter needs to a ModelAdmin's changelist."""
+
+    @property
+    def media(self):
+        from django.contrib.admin.widgets import AutocompleteSelect
+        return super().media + AutocompleteSelect(None, self.admin_site).media
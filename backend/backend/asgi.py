@@ -4,3 +4,8 @@ from django.core.asgi import get_asgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'backend.settings')
 
 application = get_asgi_application()
+
+# Build the autocomplete index now rather than on the first keystroke.
+from catalog.autocomplete import warm  # noqa: E402
+
+warm()
@@ -0,0 +1,135 @@
+# backend/log.py
+"""
+Logging plumbing: JSON records, request-ID correlation, per-logger sampling and
+a queue-backed handler so request threads never wait on stdout.
+
+    request thread:  logger -> AsyncQueueHandler (filters, put_nowait) -> queue
+    listener thread: queue -> StreamHandler -> stdout
+
+When the queue is full the record is dropped and counted instead of blocking.
+"""
+import atexit
+import json
+import logging
+import os
+import queue
+import random
+import sys
+import threading
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+
+# Set per request by backend.middleware.RequestIDMiddleware.
+current_request_id = ContextVar("current_request_id", default="-")
+
+# Attributes every LogRecord has; anything else came in via `extra=`.
+_RESERVED = set(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime", "request_id"}
+
+
+class RequestIDFilter(logging.Filter):
+    def filter(self, record):
+        record.request_id = current_request_id.get()
+        return True
+
+
+class SamplingFilter(logging.Filter):
+    """
+    Keeps only a fraction of records below WARNING for chatty loggers.
+    `rates` maps a logger name (or dotted prefix) to a keep ratio, e.g.
+    {"products.views": 0.1}. The most specific prefix wins.
+    """
+
+    def __init__(self, rates=None):
+        super().__init__()
+        self.rates = dict(rates or {})
+
+    def _rate(self, name):
+        while name:
+            if name in self.rates:
+                return self.rates[name]
+            name = name.rpartition(".")[0]
+        return 1.0
+
+    def filter(self, record):
+        if record.levelno >= logging.WARNING or not self.rates:
+            return True
+        rate = self._rate(record.name)
+        return rate >= 1.0 or random.random() < rate
+
+
+class JSONFormatter(logging.Formatter):
+    def format(self, record):
+        payload = {
+            "ts": datetime.fromtimestamp(record.created, tz=timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+            "request_id": getattr(record, "request_id", "-"),
+        }
+        for key, value in record.__dict__.items():
+            if key not in _RESERVED and not key.startswith("_"):
+                payload[key] = value
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            payload["exc"] = record.exc_text
+        return json.dumps(payload, default=str)
+
+
+class _DelegatingStreamHandler(logging.StreamHandler):
+    """Runs on the listener thread and formats with the owning queue handler's formatter."""
+
+    def __init__(self, owner, stream):
+        super().__init__(stream)
+        self.owner = owner
+
+    def format(self, record):
+        return self.owner.format(record)
+
+
+class AsyncQueueHandler(QueueHandler):
+    """
+    QueueHandler with its own listener thread writing to `stream`.
+    Use it in LOGGING like any handler; its `formatter` is applied on the
+    listener side. Records are dropped (and counted) when the queue is full.
+    """
+
+    def __init__(self, stream=None, maxsize=10000):
+        super().__init__(queue.Queue(maxsize))
+        self.stream = stream or sys.stdout
+        self.dropped = 0
+        self._dropped_lock = threading.Lock()
+        self._start_listener()
+        atexit.register(self._stop_listener)
+        if hasattr(os, "register_at_fork"):
+            # Threads don't survive fork(); give each worker process its own listener.
+            os.register_at_fork(after_in_child=self._start_listener)
+
+    def _start_listener(self):
+        self.listener = QueueListener(self.queue, _DelegatingStreamHandler(self, self.stream))
+        self.listener.start()
+
+    def _stop_listener(self):
+        try:
+            self.listener.stop()
+        except Exception:
+            pass
+
+    def prepare(self, record):
+        # Resolve the message and traceback now (the args/frames may change later),
+        # but leave the actual formatting to the listener thread.
+        record = logging.makeLogRecord(record.__dict__)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            with self._dropped_lock:
+                self.dropped += 1
@@ -0,0 +1,151 @@
+# backend/metrics.py
+"""
+In-process request metrics rendered in the Prometheus text format.
+
+Everything lives in this worker's memory: scrape each worker (or run a single
+worker per container) and let Prometheus do the aggregation.
+"""
+import bisect
+import threading
+import time
+from collections import defaultdict
+from contextvars import ContextVar
+
+from rest_framework import serializers
+from rest_framework.renderers import JSONRenderer
+
+# Per-request scratch space filled by the middleware, the DB wrapper, serializers and the renderer.
+current_request_stats = ContextVar("current_request_stats", default=None)
+
+TIME_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+COUNT_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+
+
+class Histogram:
+    def __init__(self, name, help_text, buckets, labelnames):
+        self.name = name
+        self.help_text = help_text
+        self.buckets = tuple(buckets)
+        self.labelnames = tuple(labelnames)
+        # labels -> [bucket counts..., +Inf count], sum
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value, **labels):
+        key = tuple(labels.get(n, "") for n in self.labelnames)
+        idx = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [[0] * (len(self.buckets) + 1), 0.0]
+            series[0][idx] += 1
+            series[1] += value
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            items = [(k, list(v[0]), v[1]) for k, v in self._series.items()]
+        for key, counts, total in sorted(items):
+            base = _labels(self.labelnames, key)
+            cumulative = 0
+            for bound, count in zip(self.buckets + ("+Inf",), counts):
+                cumulative += count
+                le = bound if bound == "+Inf" else repr(float(bound))
+                lines.append(f'{self.name}_bucket{{{base}{"," if base else ""}le="{le}"}} {cumulative}')
+            lines.append(f"{self.name}_sum{{{base}}} {total}")
+            lines.append(f"{self.name}_count{{{base}}} {cumulative}")
+        return lines
+
+
+class Counter:
+    def __init__(self, name, help_text, labelnames):
+        self.name = name
+        self.help_text = help_text
+        self.labelnames = tuple(labelnames)
+        self._values = defaultdict(float)
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1, **labels):
+        key = tuple(labels.get(n, "") for n in self.labelnames)
+        with self._lock:
+            self._values[key] += amount
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            items = sorted(self._values.items())
+        for key, value in items:
+            lines.append(f"{self.name}{{{_labels(self.labelnames, key)}}} {value}")
+        return lines
+
+
+def _labels(names, values):
+    def esc(v):
+        return str(v).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+    return ",".join(f'{n}="{esc(v)}"' for n, v in zip(names, values))
+
+
+REQUEST_SECONDS = Histogram("http_request_duration_seconds", "Wall time per request.",
+                            TIME_BUCKETS, ("view", "method", "status"))
+DB_QUERIES = Histogram("http_db_queries", "DB queries per request.", COUNT_BUCKETS, ("view",))
+DB_SECONDS = Histogram("http_db_duration_seconds", "Time spent in DB queries per request.", TIME_BUCKETS, ("view",))
+# Building serializer.data, including any queries it triggers (lazy relations).
+SERIALIZE_SECONDS = Histogram("http_serializer_duration_seconds",
+                              "Time spent in serializers turning objects into response data.", TIME_BUCKETS, ("view",))
+# Only the renderer's encoding step of that data into bytes.
+RENDER_SECONDS = Histogram("http_render_duration_seconds",
+                           "Time spent encoding the response body (JSON renderer).", TIME_BUCKETS, ("view",))
+RESPONSE_BYTES = Histogram("http_response_size_bytes", "Response body size (after compression).",
+                           SIZE_BUCKETS, ("view",))
+DUPLICATE_QUERIES = Counter("http_duplicate_queries_total",
+                            "Requests that repeated one SQL statement at least METRICS_DUPLICATE_QUERY_THRESHOLD times "
+                            "(likely N+1).", ("view",))
+
+REGISTRY = [REQUEST_SECONDS, DB_QUERIES, DB_SECONDS, SERIALIZE_SECONDS, RENDER_SECONDS, RESPONSE_BYTES, DUPLICATE_QUERIES]
+
+
+def render_prometheus(extra_lines=()):
+    lines = []
+    for metric in REGISTRY:
+        lines.extend(metric.render())
+    lines.extend(extra_lines)
+    return "\n".join(lines) + "\n"
+
+
+class TimedSerializerMixin:
+    """
+    Adds the time spent in to_representation to the request's serializer total.
+    Nested timed serializers are counted once, by the outermost one; with
+    many=True each item is timed by the child serializer.
+    """
+
+    def to_representation(self, instance):
+        stats = current_request_stats.get()
+        if stats is None or stats["serialize_depth"]:
+            return super().to_representation(instance)
+        stats["serialize_depth"] += 1
+        start = time.perf_counter()
+        try:
+            return super().to_representation(instance)
+        finally:
+            stats["serialize"] += time.perf_counter() - start
+            stats["serialize_depth"] -= 1
+
+
+class TimedModelSerializer(TimedSerializerMixin, serializers.ModelSerializer):
+    """Base for the API's model serializers, so their time shows up per view in the metrics."""
+
+
+class InstrumentedJSONRenderer(JSONRenderer):
+    """JSONRenderer that reports its encoding time to the metrics middleware."""
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        stats = current_request_stats.get()
+        if stats is None:
+            return super().render(data, accepted_media_type, renderer_context)
+        start = time.perf_counter()
+        try:
+            return super().render(data, accepted_media_type, renderer_context)
+        finally:
+            stats["render"] += time.perf_counter() - start
@@ -0,0 +1,357 @@
+# backend/middleware.py
+import gzip
+import hashlib
+import logging
+import os
+import random
+import threading
+import time
+import uuid
+from collections import Counter, OrderedDict
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from django.utils.cache import has_vary_header, patch_vary_headers
+from django.utils.crypto import constant_time_compare
+from django.utils.regex_helper import _lazy_re_compile
+from django.utils.text import compress_sequence, compress_string
+from whitenoise.base import WhiteNoise
+from whitenoise.middleware import WhiteNoiseMiddleware
+
+from .metrics import (
+    DB_QUERIES, DB_SECONDS, DUPLICATE_QUERIES, RENDER_SECONDS, REQUEST_SECONDS, RESPONSE_BYTES, SERIALIZE_SECONDS,
+    current_request_stats,
+)
+from .log import current_request_id
+from .profiling import ProfileWriter, get_sampler
+
+try:
+    import brotli
+except ImportError:  # brotli is optional; fall back to gzip only
+    brotli = None
+
+logger = logging.getLogger(__name__)
+
+re_accepts_gzip = _lazy_re_compile(r"\bgzip\b")
+re_accepts_br = _lazy_re_compile(r"\bbr\b")
+
+# Already-compressed or incremental formats that shouldn't be re-encoded.
+SKIP_CONTENT_TYPES = (
+    "image/", "video/", "audio/", "application/pdf", "application/zip",
+    "application/gzip", "application/vnd.openxmlformats", "text/event-stream",
+)
+
+
+class _CompressedBodyCache:
+    """
+    Small thread-safe LRU of compressed bodies, keyed by (encoding, sha1 of body).
+    Identical catalog payloads are compressed once per worker instead of per request.
+    """
+
+    def __init__(self, max_entries, max_bytes):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._data = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            value = self._data.get(key)
+            if value is not None:
+                self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        if len(value) > self.max_bytes:
+            return
+        with self._lock:
+            old = self._data.pop(key, None)
+            if old is not None:
+                self._size -= len(old)
+            self._data[key] = value
+            self._size += len(value)
+            while self._data and (len(self._data) > self.max_entries or self._size > self.max_bytes):
+                _, evicted = self._data.popitem(last=False)
+                self._size -= len(evicted)
+
+
+re_request_id = _lazy_re_compile(r"^[A-Za-z0-9._-]{1,64}$")
+
+
+class RequestIDMiddleware:
+    """
+    Tags the request with an ID for log correlation: the caller's X-Request-ID
+    when it looks sane, otherwise a fresh one. Echoed back in the response.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        supplied = request.META.get("HTTP_X_REQUEST_ID", "")
+        request_id = supplied if re_request_id.match(supplied) else uuid.uuid4().hex
+        request.request_id = request_id
+        token = current_request_id.set(request_id)
+        try:
+            response = self.get_response(request)
+        finally:
+            current_request_id.reset(token)
+        response.headers["X-Request-ID"] = request_id
+        return response
+
+
+class CompressionMiddleware:
+    """
+    Negotiated brotli/gzip compression for API responses.
+
+    - Bodies smaller than COMPRESSION_MIN_SIZE are left alone.
+    - brotli is preferred when the client accepts it and the package is installed.
+    - Compressed bodies of public GET responses are cached in-process, so large
+      catalog lists are compressed once, not per request. A response is public
+      when the request has no Authorization header and no session/CSRF cookie,
+      and the response neither sets cookies nor varies on them.
+    - Everything else is compressed fresh. Requests carrying the session or CSRF
+      cookie (which browsers attach to attacker-initiated requests too) get gzip
+      with Django's BREACH padding even when brotli is accepted, as brotli has none.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.min_size = getattr(settings, "COMPRESSION_MIN_SIZE", 1024)
+        self.brotli_quality = getattr(settings, "COMPRESSION_BROTLI_QUALITY", 5)
+        self.cache = _CompressedBodyCache(
+            getattr(settings, "COMPRESSION_CACHE_ENTRIES", 256),
+            getattr(settings, "COMPRESSION_CACHE_BYTES", 16 * 1024 * 1024),
+        )
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        return self.process_response(request, response)
+
+    @staticmethod
+    def _has_credential_cookie(request):
+        cookies = request.COOKIES
+        return settings.SESSION_COOKIE_NAME in cookies or settings.CSRF_COOKIE_NAME in cookies
+
+    def _pick_encoding(self, request, padded=False):
+        ae = request.META.get("HTTP_ACCEPT_ENCODING", "")
+        if padded and re_accepts_gzip.search(ae):
+            return "gzip"
+        if brotli is not None and re_accepts_br.search(ae):
+            return "br"
+        if re_accepts_gzip.search(ae):
+            return "gzip"
+        return None
+
+    def _compress(self, encoding, content):
+        if encoding == "br":
+            return brotli.compress(content, quality=self.brotli_quality)
+        return gzip.compress(content, compresslevel=6, mtime=0)
+
+    def process_response(self, request, response):
+        if response.has_header("Content-Encoding"):
+            return response
+        content_type = response.get("Content-Type", "")
+        if content_type.startswith(SKIP_CONTENT_TYPES):
+            return response
+        if not response.streaming and len(response.content) < self.min_size:
+            return response
+
+        patch_vary_headers(response, ("Accept-Encoding",))
+
+        ambient_credentials = self._has_credential_cookie(request)
+        encoding = self._pick_encoding(request, padded=ambient_credentials or bool(response.cookies))
+        if encoding is None:
+            return response
+
+        if response.streaming:
+            if response.is_async or encoding != "gzip":
+                # Only the sync gzip path is streamed; leave the rest untouched.
+                return response
+            response.streaming_content = compress_sequence(response.streaming_content, max_random_bytes=100)
+            del response.headers["Content-Length"]
+        else:
+            content = response.content
+            cacheable = (
+                request.method in ("GET", "HEAD")
+                and "HTTP_AUTHORIZATION" not in request.META
+                and not ambient_credentials
+                and not response.cookies
+                and not has_vary_header(response, "Cookie")
+            )
+            if cacheable:
+                key = (encoding, hashlib.sha1(content).digest())
+                compressed = self.cache.get(key)
+                if compressed is None:
+                    compressed = self._compress(encoding, content)
+                    self.cache.set(key, compressed)
+            elif encoding == "gzip":
+                compressed = compress_string(content, max_random_bytes=100)
+            else:
+                compressed = self._compress(encoding, content)
+
+            # Return the compressed content only if it's actually shorter.
+            if len(compressed) >= len(content):
+                return response
+            response.content = compressed
+            response.headers["Content-Length"] = str(len(compressed))
+
+        etag = response.get("ETag")
+        if etag and etag.startswith('"'):
+            response.headers["ETag"] = "W/" + etag
+        response.headers["Content-Encoding"] = encoding
+        return response
+
+
+class RequestMetricsMiddleware:
+    """
+    Records per-view wall time, DB query count/time, serializer and render time
+    and response size into the histograms in backend.metrics (served at /api/metrics/).
+
+    A request that runs the same SQL statement METRICS_DUPLICATE_QUERY_THRESHOLD
+    times or more is counted and logged as a probable N+1.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.enabled = getattr(settings, "METRICS_ENABLED", True)
+        self.dup_threshold = getattr(settings, "METRICS_DUPLICATE_QUERY_THRESHOLD", 5)
+
+    def __call__(self, request):
+        if not self.enabled:
+            return self.get_response(request)
+
+        stats = {"queries": 0, "db": 0.0, "serialize": 0.0, "serialize_depth": 0, "render": 0.0, "sql": Counter()}
+        token = current_request_stats.set(stats)
+        start = time.perf_counter()
+        try:
+            with ExitStack() as stack:
+                for conn in connections.all():
+                    stack.enter_context(conn.execute_wrapper(self._db_wrapper))
+                response = self.get_response(request)
+        finally:
+            current_request_stats.reset(token)
+        elapsed = time.perf_counter() - start
+
+        match = getattr(request, "resolver_match", None)
+        view = (match.url_name or match._func_path) if match else "unresolved"
+
+        REQUEST_SECONDS.observe(elapsed, view=view, method=request.method, status=response.status_code)
+        DB_QUERIES.observe(stats["queries"], view=view)
+        DB_SECONDS.observe(stats["db"], view=view)
+        SERIALIZE_SECONDS.observe(stats["serialize"], view=view)
+        RENDER_SECONDS.observe(stats["render"], view=view)
+        if not response.streaming:
+            RESPONSE_BYTES.observe(len(response.content), view=view)
+
+        if stats["sql"]:
+            sql, repeats = stats["sql"].most_common(1)[0]
+            if repeats >= self.dup_threshold:
+                DUPLICATE_QUERIES.inc(view=view)
+                logger.warning("Possible N+1 in %s: %d x %s", view, repeats, sql[:300])
+        return response
+
+    @staticmethod
+    def _db_wrapper(execute, sql, params, many, context):
+        stats = current_request_stats.get()
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            if stats is not None:
+                stats["queries"] += 1
+                stats["db"] += time.perf_counter() - start
+                # Params are passed separately, so equal SQL text means the same statement shape.
+                stats["sql"][sql] += 1
+
+
+class SamplingProfilerMiddleware:
+    """
+    Samples the stack of selected requests and writes collapsed stacks to
+    PROFILER_DIR (see backend.profiling). Requests are selected by path prefix
+    plus PROFILER_SAMPLE_RATE, or explicitly with an "X-Profile" header equal to
+    PROFILER_TOKEN; the latter also gets the file name back in X-Profile-File.
+    """
+
+    def __init__(self, get_response):
+        if not getattr(settings, "PROFILER_ENABLED", False):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.paths = tuple(getattr(settings, "PROFILER_PATHS", ()))
+        self.rate = getattr(settings, "PROFILER_SAMPLE_RATE", 0.0)
+        self.token = getattr(settings, "PROFILER_TOKEN", "")
+        self.writer = ProfileWriter(
+            settings.PROFILER_DIR,
+            getattr(settings, "PROFILER_MAX_FILES", 200),
+            getattr(settings, "PROFILER_MAX_BYTES", 50 * 1024 * 1024),
+        )
+
+    def _requested(self, request):
+        supplied = request.META.get("HTTP_X_PROFILE")
+        return bool(supplied and self.token and constant_time_compare(supplied, self.token))
+
+    def __call__(self, request):
+        requested = self._requested(request)
+        sampled = (
+            not requested
+            and self.rate > 0
+            and request.path.startswith(self.paths)
+            and random.random() < self.rate
+        )
+        if not (requested or sampled):
+            return self.get_response(request)
+
+        sampler = get_sampler()
+        ident = threading.get_ident()
+        sampler.start(ident)
+        try:
+            response = self.get_response(request)
+        finally:
+            stacks = sampler.stop(ident)
+
+        match = getattr(request, "resolver_match", None)
+        label = (match.url_name or match._func_path) if match else request.path
+        if stacks:
+            try:
+                path = self.writer.write(label, stacks)
+            except OSError:
+                logger.exception("Could not write profile for %s", request.path)
+            else:
+                if requested:
+                    response.headers["X-Profile-File"] = os.path.basename(path)
+        return response
+
+
+class SnapshotFilesMiddleware:
+    """
+    Serves the catalog snapshots (catalog.snapshots) in SNAPSHOT_ROOT at
+    SNAPSHOT_URL through WhiteNoise, including the pre-compressed variants.
+    Snapshots are written while the app runs, so files are looked up on disk
+    per request instead of being indexed at startup. Hashed names are cached as
+    immutable, manifest.json for SNAPSHOT_MANIFEST_MAX_AGE seconds. A front
+    proxy serving the same directory at the same URL takes these requests
+    before they get here; set SNAPSHOT_SERVE=False then.
+    """
+
+    def __init__(self, get_response):
+        if not getattr(settings, "SNAPSHOT_SERVE", True):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.prefix = settings.SNAPSHOT_URL
+        self.files = WhiteNoise(
+            None,
+            autorefresh=True,
+            max_age=settings.SNAPSHOT_MANIFEST_MAX_AGE,
+            immutable_file_test=r"\.[0-9a-f]{16}\.json$",
+        )
+        self.files.add_files(settings.SNAPSHOT_ROOT, prefix=self.prefix)
+
+    def __call__(self, request):
+        if request.path_info.startswith(self.prefix):
+            static_file = self.files.find_file(request.path_info)
+            if static_file is not None:
+                return WhiteNoiseMiddleware.serve(static_file, request)
+        return self.get_response(request)
@@ -0,0 +1,130 @@
+# backend/profiling.py
+"""
+Opt-in sampling profiler for individual requests.
+
+A single daemon thread wakes every PROFILER_INTERVAL_MS, grabs the current
+stack of each thread that is serving a profiled request (sys._current_frames)
+and counts it. When the request finishes its stacks are written as collapsed
+"frame;frame;frame count" lines, which flamegraph.pl, speedscope and inferno
+read directly.
+
+Selection (backend.middleware.SamplingProfilerMiddleware):
+  - PROFILER_PATHS: path prefixes to sample, e.g. "/api/checkout/".
+  - PROFILER_SAMPLE_RATE: fraction (0..1) of those requests to profile.
+  - "X-Profile: <PROFILER_TOKEN>" header: always profile this request.
+With PROFILER_ENABLED off the middleware removes itself at startup.
+"""
+import itertools
+import os
+import sys
+import threading
+import time
+from collections import Counter
+
+from django.conf import settings
+
+
+def _frame_label(frame):
+    code = frame.f_code
+    module = frame.f_globals.get("__name__", "?")
+    return f"{module}:{code.co_name}"
+
+
+def collapse_stack(frame, max_depth=128):
+    """Root-first 'a;b;c' string for a frame."""
+    labels = []
+    while frame is not None and len(labels) < max_depth:
+        labels.append(_frame_label(frame))
+        frame = frame.f_back
+    return ";".join(reversed(labels))
+
+
+class Sampler:
+    """One background thread sampling every thread registered via start()/stop()."""
+
+    def __init__(self, interval):
+        self.interval = interval
+        self._active = {}  # thread ident -> Counter of collapsed stacks
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._thread = None
+
+    def start(self, ident):
+        with self._lock:
+            self._active[ident] = Counter()
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="request-sampler", daemon=True)
+                self._thread.start()
+        self._wake.set()
+
+    def stop(self, ident):
+        with self._lock:
+            return self._active.pop(ident, Counter())
+
+    def _run(self):
+        while True:
+            with self._lock:
+                idle = not self._active
+                if idle:
+                    self._wake.clear()
+            if idle:
+                self._wake.wait()
+                continue
+            time.sleep(self.interval)
+            frames = sys._current_frames()
+            with self._lock:
+                for ident, stacks in self._active.items():
+                    frame = frames.get(ident)
+                    if frame is not None:
+                        stacks[collapse_stack(frame)] += 1
+
+
+class ProfileWriter:
+    """Writes one .folded file per profiled request and keeps the directory bounded."""
+
+    def __init__(self, directory, max_files, max_bytes):
+        self.directory = directory
+        self.max_files = max_files
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._seq = itertools.count()
+
+    def write(self, label, stacks):
+        os.makedirs(self.directory, exist_ok=True)
+        safe = "".join(c if c.isalnum() or c in "-_" else "_" for c in label)[:80]
+        name = f"{time.strftime('%Y%m%d-%H%M%S')}-{os.getpid()}-{next(self._seq)}-{safe}.folded"
+        path = os.path.join(self.directory, name)
+        with open(path, "w") as fh:
+            for stack, count in stacks.most_common():
+                fh.write(f"{stack} {count}\n")
+        self._prune()
+        return path
+
+    def _prune(self):
+        with self._lock:
+            try:
+                entries = [e for e in os.scandir(self.directory) if e.name.endswith(".folded")]
+            except FileNotFoundError:
+                return
+            entries.sort(key=lambda e: e.stat().st_mtime, reverse=True)
+            total = 0
+            for i, entry in enumerate(entries):
+                total += entry.stat().st_size
+                if i >= self.max_files or total > self.max_bytes:
+                    try:
+                        os.remove(entry.path)
+                    except FileNotFoundError:
+                        pass
+
+
+_sampler = None
+_sampler_lock = threading.Lock()
+
+
+def get_sampler():
+    global _sampler
+    if _sampler is None:
+        with _sampler_lock:
+            if _sampler is None:
+                _sampler = Sampler(getattr(settings, "PROFILER_INTERVAL_MS", 5) / 1000)
+    return _sampler
@@ -1,6 +1,7 @@
 import os
 from pathlib import Path
 from dotenv import load_dotenv
+from corsheaders.defaults import default_headers
 
 BASE_DIR = Path(__file__).resolve().parent.parent
 load_dotenv(BASE_DIR / ".env")
@@ -18,12 +19,18 @@ INSTALLED_APPS = [
     "storages", "audio.apps.AudioConfig", "accessories.apps.AccessoriesConfig",
     "televisions", "mkopa", "reallaptops.apps.ReallaptopsConfig",
     "offers", "budgetsmartphones", "dialphones", "newiphones", "heroes",
+    "mailer", "reports", "catalog",
 ]
 
 MIDDLEWARE = [
+    "backend.middleware.RequestIDMiddleware",
     "corsheaders.middleware.CorsMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "whitenoise.middleware.WhiteNoiseMiddleware",
+    "backend.middleware.SnapshotFilesMiddleware",
+    "backend.middleware.SamplingProfilerMiddleware",
+    "backend.middleware.RequestMetricsMiddleware",
+    "backend.middleware.CompressionMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
@@ -49,20 +56,29 @@ TEMPLATES = [{
 WSGI_APPLICATION = "backend.wsgi.application"
 
 # --- Database ---
-DATABASES = {
-    "default": {
-        "ENGINE": "django.db.backends.mysql",
-        "NAME": os.getenv("MYSQL_NAME", "techshop"),
-        "USER": os.getenv("MYSQL_USER", "techuser"),
-        "PASSWORD": os.getenv("MYSQL_PASSWORD", "StrongPassw0rd!"),
-        "HOST": os.getenv("MYSQL_HOST", "127.0.0.1"),
-        "PORT": os.getenv("MYSQL_PORT", "3306"),
-        "OPTIONS": {
-            "init_command": "SET sql_mode='STRICT_TRANS_TABLES'",
-            "charset": "utf8mb4"
-        },
+if os.getenv("DJANGO_DB_ENGINE", "mysql") == "sqlite":
+    # Local benchmarking / quick experiments without a MySQL server.
+    DATABASES = {
+        "default": {
+            "ENGINE": "django.db.backends.sqlite3",
+            "NAME": os.getenv("SQLITE_PATH", str(BASE_DIR / "db.sqlite3")),
+        }
+    }
+else:
+    DATABASES = {
+        "default": {
+            "ENGINE": "django.db.backends.mysql",
+            "NAME": os.getenv("MYSQL_NAME", "techshop"),
+            "USER": os.getenv("MYSQL_USER", "techuser"),
+            "PASSWORD": os.getenv("MYSQL_PASSWORD", "StrongPassw0rd!"),
+            "HOST": os.getenv("MYSQL_HOST", "127.0.0.1"),
+            "PORT": os.getenv("MYSQL_PORT", "3306"),
+            "OPTIONS": {
+                "init_command": "SET sql_mode='STRICT_TRANS_TABLES'",
+                "charset": "utf8mb4"
+            },
+        }
     }
-}
 
 DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 
@@ -73,6 +89,29 @@ AUTH_PASSWORD_VALIDATORS = [
     {"NAME": "django.contrib.auth.password_validation.NumericPasswordValidator"},
 ]
 
+# --- Password hashing ---
+# PASSWORD_HASHER picks the hasher for new hashes: "pbkdf2" (default) or the
+# memory-hard "scrypt" / "argon2" (argon2 needs argon2-cffi). The others stay
+# listed so existing hashes still verify and are upgraded on next login.
+_HASHERS = {
+    "pbkdf2": "authapp.hashers.TunablePBKDF2PasswordHasher",
+    "scrypt": "authapp.hashers.TunableScryptPasswordHasher",
+    "argon2": "django.contrib.auth.hashers.Argon2PasswordHasher",
+}
+_primary_hasher = _HASHERS.get(os.getenv("PASSWORD_HASHER", "pbkdf2").lower(), _HASHERS["pbkdf2"])
+PASSWORD_HASHERS = [_primary_hasher] + [h for h in _HASHERS.values() if h != _primary_hasher] + [
+    "django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher",
+]
+PBKDF2_ITERATIONS = int(os.getenv("PBKDF2_ITERATIONS", "600000"))
+SCRYPT_WORK_FACTOR = int(os.getenv("SCRYPT_WORK_FACTOR", str(2**14)))
+SCRYPT_BLOCK_SIZE = int(os.getenv("SCRYPT_BLOCK_SIZE", "8"))
+SCRYPT_PARALLELISM = int(os.getenv("SCRYPT_PARALLELISM", "1"))
+
+# Login hash verification pool (authapp.hashing)
+LOGIN_HASH_WORKERS = int(os.getenv("LOGIN_HASH_WORKERS", str(os.cpu_count() or 2)))
+LOGIN_HASH_QUEUE_DEPTH = int(os.getenv("LOGIN_HASH_QUEUE_DEPTH", "32"))
+LOGIN_RETRY_AFTER = int(os.getenv("LOGIN_RETRY_AFTER", "2"))
+
 LANGUAGE_CODE = "en-us"
 TIME_ZONE = "UTC"
 USE_I18N = True
@@ -86,12 +125,159 @@ STATIC_ROOT = BASE_DIR / "staticfiles"
 MEDIA_URL = "/media/"
 MEDIA_ROOT = BASE_DIR / "media"
 
+# collectstatic writes .gz (and .br when brotli is installed) next to each file;
+# WhiteNoise serves the pre-compressed variant that matches Accept-Encoding.
+STORAGES = {
+    "default": {"BACKEND": "django.core.files.storage.FileSystemStorage"},
+    "staticfiles": {"BACKEND": "whitenoise.storage.CompressedStaticFilesStorage"},
+}
+
+# --- Response compression (API JSON) ---
+COMPRESSION_MIN_SIZE = int(os.getenv("COMPRESSION_MIN_SIZE", "1024"))
+COMPRESSION_BROTLI_QUALITY = int(os.getenv("COMPRESSION_BROTLI_QUALITY", "5"))
+COMPRESSION_CACHE_ENTRIES = int(os.getenv("COMPRESSION_CACHE_ENTRIES", "256"))
+COMPRESSION_CACHE_BYTES = int(os.getenv("COMPRESSION_CACHE_BYTES", str(16 * 1024 * 1024)))
+
 # --- DRF / Auth ---
 REST_FRAMEWORK = {
-    "DEFAULT_AUTHENTICATION_CLASSES": ("rest_framework_simplejwt.authentication.JWTAuthentication",),
+    "DEFAULT_AUTHENTICATION_CLASSES": ("authapp.authentication.CachedJWTAuthentication",),
+    "DEFAULT_RENDERER_CLASSES": (
+        "backend.metrics.InstrumentedJSONRenderer",
+        "rest_framework.renderers.BrowsableAPIRenderer",
+    ),
+    # Reverse proxies in front of Django. Per-IP throttles key on the address that
+    # many hops back in X-Forwarded-For; 0 ignores the header (clients can forge it).
+    "NUM_PROXIES": int(os.getenv("NUM_PROXIES", "0")),
 }
 SIMPLE_JWT = {"AUTH_HEADER_TYPES": ("Bearer",)}
 AUTH_USER_MODEL = "authapp.User"
+# How long CachedJWTAuthentication keeps a user row before re-reading it (seconds).
+# User saves drop the entry, which only reaches other worker processes through a
+# shared cache; so the default is 60 with CACHE_REDIS_URL set and 0 (no caching) without.
+AUTH_USER_CACHE_TTL = int(os.getenv("AUTH_USER_CACHE_TTL") or ("60" if os.getenv("CACHE_REDIS_URL") else "0"))
+
+# --- Throttling (backend.throttling token buckets) ---
+# "local" keeps buckets per process; "redis" shares them across workers.
+THROTTLE_BACKEND = os.getenv("THROTTLE_BACKEND", "local")
+THROTTLE_REDIS_URL = os.getenv("THROTTLE_REDIS_URL", "redis://127.0.0.1:6379/0")
+THROTTLE_RATES = {
+    "login": os.getenv("THROTTLE_LOGIN", "10/min"),
+    "register": os.getenv("THROTTLE_REGISTER", "5/hour"),
+    "forgot_password": os.getenv("THROTTLE_FORGOT_PASSWORD", "5/hour"),
+    "receipt_email": os.getenv("THROTTLE_RECEIPT_EMAIL", "5/hour"),
+}
+
+# --- Stock reservations (products.inventory) ---
+# With expiry enabled, unpaid (non-COD) orders are cancelled, their stock released
+# and the customer emailed after STOCK_RESERVATION_MINUTES by
+# `manage.py release_expired_reservations`. Keep it off until a payment path
+# (e.g. an M-Pesa/card callback) marks orders PAID, or every such order lapses.
+STOCK_RESERVATION_EXPIRY_ENABLED = os.getenv("STOCK_RESERVATION_EXPIRY_ENABLED", "False").lower() == "true"
+STOCK_RESERVATION_MINUTES = int(os.getenv("STOCK_RESERVATION_MINUTES", "30"))
+
+# --- Catalog change feed (catalog.feed) ---
+# Feed entries younger than this aren't served yet, so in-flight lower seqs can't be skipped.
+CATALOG_FEED_SETTLE_SECONDS = int(os.getenv("CATALOG_FEED_SETTLE_SECONDS", "2"))
+
+# --- Catalog snapshots (catalog.snapshots, manage.py publish_catalog_snapshots) ---
+# Pre-rendered list responses with content-hashed names; point a front proxy at
+# SNAPSHOT_ROOT under SNAPSHOT_URL (and set SNAPSHOT_SERVE=False) or let
+# backend.middleware.SnapshotFilesMiddleware serve them.
+SNAPSHOT_ROOT = os.getenv("SNAPSHOT_ROOT", str(BASE_DIR / "snapshots"))
+SNAPSHOT_URL = "/snapshots/"
+SNAPSHOT_SERVE = os.getenv("SNAPSHOT_SERVE", "True").lower() == "true"
+# Origin the public uses for this API; image URLs inside snapshots are built against it.
+SNAPSHOT_PUBLIC_URL = os.getenv("SNAPSHOT_PUBLIC_URL", "http://localhost:8000")
+SNAPSHOT_MANIFEST_MAX_AGE = int(os.getenv("SNAPSHOT_MANIFEST_MAX_AGE", "10"))
+# Republish once the catalog has been quiet this long, but never later than the max delay.
+SNAPSHOT_DEBOUNCE_SECONDS = float(os.getenv("SNAPSHOT_DEBOUNCE_SECONDS", "5"))
+SNAPSHOT_MAX_DELAY_SECONDS = float(os.getenv("SNAPSHOT_MAX_DELAY_SECONDS", "60"))
+# Superseded snapshot files are kept this long for clients holding an older manifest.
+SNAPSHOT_RETENTION_SECONDS = int(os.getenv("SNAPSHOT_RETENTION_SECONDS", "3600"))
+
+# --- Autocomplete (catalog.autocomplete) ---
+# How often each process picks up catalog changes made by other processes.
+AUTOCOMPLETE_SYNC_SECONDS = float(os.getenv("AUTOCOMPLETE_SYNC_SECONDS", "2"))
+
+# --- Similar products (catalog.similarity, manage.py refresh_similar_products) ---
+# Neighbours stored per row (also the endpoint's max limit).
+SIMILAR_PRODUCTS_K = int(os.getenv("SIMILAR_PRODUCTS_K", "12"))
+# Incremental refreshes keep older rows' distances; recompute everything this often.
+SIMILAR_PRODUCTS_FULL_REBUILD_SECONDS = int(os.getenv("SIMILAR_PRODUCTS_FULL_REBUILD_SECONDS", "86400"))
+
+# --- Cleanup (manage.py cleanup_stale_data) ---
+# Carts nobody has touched for this many days are deleted.
+CART_IDLE_DAYS = int(os.getenv("CART_IDLE_DAYS", "60"))
+
+# --- Receipt readiness push (products.receipt_events) ---
+# Serve under ASGI (uvicorn backend.asgi:application): under WSGI (runserver,
+# gunicorn sync workers) every open stream or long poll holds a worker thread.
+# Readiness is published here so waiters in every process are woken, whichever
+# one rendered the PDF; defaults to CACHE_REDIS_URL, empty = same process only.
+RECEIPT_EVENTS_REDIS_URL = os.getenv("RECEIPT_EVENTS_REDIS_URL") or os.getenv("CACHE_REDIS_URL", "")
+# Safety-net re-check of the order row while waiting, in case a notification is missed.
+RECEIPT_WAIT_POLL_SECONDS = float(os.getenv("RECEIPT_WAIT_POLL_SECONDS", "15"))
+RECEIPT_SSE_HEARTBEAT_SECONDS = float(os.getenv("RECEIPT_SSE_HEARTBEAT_SECONDS", "15"))
+RECEIPT_SSE_MAX_SECONDS = float(os.getenv("RECEIPT_SSE_MAX_SECONDS", "120"))
+RECEIPT_LONG_POLL_MAX_SECONDS = float(os.getenv("RECEIPT_LONG_POLL_MAX_SECONDS", "25"))
+
+# --- Guest carts (products.guest_cart) ---
+# Signed cart tokens older than this are treated as an empty cart.
+GUEST_CART_MAX_AGE_DAYS = int(os.getenv("GUEST_CART_MAX_AGE_DAYS", "30"))
+
+# --- Checkout idempotency (products.idempotency) ---
+# An unfinished Idempotency-Key older than this is assumed abandoned and may be taken over.
+IDEMPOTENCY_LOCK_TIMEOUT = int(os.getenv("IDEMPOTENCY_LOCK_TIMEOUT", "120"))
+# Stored responses are kept this long (purged by the cleanup job).
+IDEMPOTENCY_KEY_TTL_HOURS = int(os.getenv("IDEMPOTENCY_KEY_TTL_HOURS", "24"))
+
+# --- Admin ---
+# Unfiltered changelists show the table-statistics row estimate above this size instead of COUNT(*).
+ADMIN_ESTIMATED_COUNT_THRESHOLD = int(os.getenv("ADMIN_ESTIMATED_COUNT_THRESHOLD", "100000"))
+
+# --- Request metrics (backend.middleware.RequestMetricsMiddleware) ---
+def _access_token(name):
+    """A shared-secret setting; empty (no token access) when unset or left at the old "change-me" placeholder."""
+    value = os.getenv(name, "").strip()
+    return "" if value == "change-me" else value
+
+
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "True").lower() == "true"
+# X-Metrics-Token for scrapers; empty = staff sessions (or DEBUG) only.
+METRICS_TOKEN = _access_token("METRICS_TOKEN")
+METRICS_DUPLICATE_QUERY_THRESHOLD = int(os.getenv("METRICS_DUPLICATE_QUERY_THRESHOLD", "5"))
+
+# --- Sampling profiler (backend.middleware.SamplingProfilerMiddleware) ---
+# Off by default; when off the middleware is dropped from the stack entirely.
+PROFILER_ENABLED = os.getenv("PROFILER_ENABLED", "False").lower() == "true"
+PROFILER_PATHS = [p.strip() for p in os.getenv("PROFILER_PATHS", "").split(",") if p.strip()]
+PROFILER_SAMPLE_RATE = float(os.getenv("PROFILER_SAMPLE_RATE", "0"))
+# X-Profile value that forces profiling of one request; empty = on-demand profiling off.
+PROFILER_TOKEN = _access_token("PROFILER_TOKEN")
+PROFILER_INTERVAL_MS = float(os.getenv("PROFILER_INTERVAL_MS", "5"))
+PROFILER_DIR = os.getenv("PROFILER_DIR", str(BASE_DIR / "profiles"))
+PROFILER_MAX_FILES = int(os.getenv("PROFILER_MAX_FILES", "200"))
+PROFILER_MAX_BYTES = int(os.getenv("PROFILER_MAX_BYTES", str(50 * 1024 * 1024)))
+
+# --- Cache ---
+# CACHE_REDIS_URL shares the cache between worker processes (and containers);
+# without it each process keeps its own LocMemCache.
+CACHE_REDIS_URL = os.getenv("CACHE_REDIS_URL", "")
+if CACHE_REDIS_URL:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "LOCATION": CACHE_REDIS_URL,
+            "KEY_PREFIX": "techshop",
+        }
+    }
+else:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+            "LOCATION": "techshop",
+        }
+    }
 
 # --- Frontend origin (CORS/CSRF) ---
 FRONTEND_URL = os.getenv("FRONTEND_URL", "http://localhost:5173").rstrip("/")
@@ -102,6 +288,7 @@ if DEBUG:
     CORS_ALLOW_ALL_ORIGINS = True
 else:
     CORS_ALLOW_ALL_ORIGINS = False
+CORS_ALLOW_HEADERS = (*default_headers, "idempotency-key", "x-cart-token")
 
 # --- Email ---
 EMAIL_BACKEND = os.getenv("EMAIL_BACKEND") or (
@@ -120,15 +307,49 @@ if _default_from.startswith('"') and _default_from.endswith('"'):
 DEFAULT_FROM_EMAIL = _default_from or EMAIL_HOST_USER
 SERVER_EMAIL = os.getenv("SERVER_EMAIL", DEFAULT_FROM_EMAIL)
 
+# Outbound mail spool (mailer app). Run `manage.py send_queued_mail --loop` as a worker;
+# set MAIL_QUEUE_ENABLED=False to send inline from the request instead.
+MAIL_QUEUE_ENABLED = os.getenv("MAIL_QUEUE_ENABLED", "True").lower() == "true"
+MAIL_MAX_ATTEMPTS = int(os.getenv("MAIL_MAX_ATTEMPTS", "6"))
+MAIL_RETRY_BASE_SECONDS = int(os.getenv("MAIL_RETRY_BASE_SECONDS", "30"))
+MAIL_RETRY_MAX_SECONDS = int(os.getenv("MAIL_RETRY_MAX_SECONDS", "3600"))
+
 PASSWORD_RESET_TIMEOUT = int(os.getenv("PASSWORD_RESET_TIMEOUT", "3600"))
 
+# --- Logging ---
+# Records go through a bounded queue to a listener thread (backend.log.AsyncQueueHandler),
+# so request threads never block on stdout. LOG_FORMAT=text for local readability.
+LOG_FORMAT = os.getenv("LOG_FORMAT", "json")
+LOG_QUEUE_SIZE = int(os.getenv("LOG_QUEUE_SIZE", "10000"))
+# Keep ratio for sub-WARNING records of hot loggers, e.g. "products.views=0.1,mailer=0.5"
+LOG_SAMPLE_RATES = {
+    name.strip(): float(rate)
+    for name, _, rate in (item.partition("=") for item in os.getenv("LOG_SAMPLE_RATES", "").split(","))
+    if name.strip() and rate
+}
+
 LOGGING = {
     "version": 1,
     "disable_existing_loggers": False,
-    "handlers": {"console": {"class": "logging.StreamHandler"}},
+    "filters": {
+        "request_id": {"()": "backend.log.RequestIDFilter"},
+        "sample": {"()": "backend.log.SamplingFilter", "rates": LOG_SAMPLE_RATES},
+    },
+    "formatters": {
+        "json": {"()": "backend.log.JSONFormatter"},
+        "text": {"format": "%(asctime)s %(levelname)s %(name)s [%(request_id)s] %(message)s"},
+    },
+    "handlers": {
+        "console": {
+            "()": "backend.log.AsyncQueueHandler",
+            "maxsize": LOG_QUEUE_SIZE,
+            "formatter": LOG_FORMAT,
+            "filters": ["request_id", "sample"],
+        },
+    },
     "root": {"handlers": ["console"], "level": "INFO"},
     "loggers": {
-        "products": {"handlers": ["console"], "level": "DEBUG"},
-        "django.request": {"handlers": ["console"], "level": "INFO"},
+        "products": {"level": os.getenv("LOG_LEVEL_PRODUCTS", "INFO")},
+        "django.request": {"level": "INFO"},
     },
 }
@@ -0,0 +1,204 @@
+import gzip
+import io
+import logging
+from collections import Counter
+from unittest import mock, skipIf
+
+from django.contrib.auth import get_user_model
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase, TestCase, override_settings
+from rest_framework.test import APIRequestFactory
+
+from products.models import Cart, CartItem, Product
+from products.serializers import CartSerializer
+
+from . import throttling
+from .log import AsyncQueueHandler
+from .metrics import SERIALIZE_SECONDS, current_request_stats
+from .middleware import CompressionMiddleware, brotli
+from .throttling import IPTokenBucketThrottle, LocalTokenBucketBackend, RedisTokenBucketBackend
+
+try:
+    import fakeredis
+except ImportError:  # Redis backend tests are optional
+    fakeredis = None
+
+
+@override_settings(DEBUG=False)
+class MetricsAccessTests(TestCase):
+    def test_no_token_configured_means_no_token_access(self):
+        with override_settings(METRICS_TOKEN=""):
+            self.assertEqual(self.client.get("/api/metrics/", HTTP_X_METRICS_TOKEN="").status_code, 403)
+
+    @override_settings(METRICS_TOKEN="s3cret-token")
+    def test_token_access(self):
+        self.assertEqual(self.client.get("/api/metrics/", HTTP_X_METRICS_TOKEN="wrong").status_code, 403)
+        response = self.client.get("/api/metrics/", HTTP_X_METRICS_TOKEN="s3cret-token")
+        self.assertEqual(response.status_code, 200)
+        self.assertIn(b"http_render_duration_seconds", response.content)
+        self.assertIn(b"http_serializer_duration_seconds", response.content)
+
+
+class SerializerTimingTests(TestCase):
+    def _observations(self, view):
+        series = SERIALIZE_SECONDS._series.get((view,))
+        return sum(series[0]) if series else 0
+
+    def test_recorded_per_view(self):
+        Product.objects.create(name="Phone", price=100)
+        before = self._observations("product-list")
+        with mock.patch.object(SERIALIZE_SECONDS, "observe", wraps=SERIALIZE_SECONDS.observe) as observe:
+            self.assertEqual(self.client.get("/api/products/").status_code, 200)
+        self.assertEqual(self._observations("product-list"), before + 1)
+        seconds, = observe.call_args.args
+        self.assertGreater(seconds, 0)
+
+    def test_nested_serializers_are_counted_once(self):
+        user = get_user_model().objects.create_user("jane", "jane@example.com", "pw")
+        cart = Cart.objects.create(user=user)
+        CartItem.objects.create(cart=cart, product=Product.objects.create(name="Phone", price=100), quantity=1)
+        stats = {"serialize": 0.0, "serialize_depth": 0, "queries": 0, "db": 0.0, "render": 0.0, "sql": Counter()}
+        token = current_request_stats.set(stats)
+        try:
+            with mock.patch("backend.metrics.time.perf_counter", side_effect=[10.0, 12.5]):
+                CartSerializer(cart).data
+        finally:
+            current_request_stats.reset(token)
+        # Only the outer CartSerializer read the clock; the nested item/product serializers didn't.
+        self.assertEqual(stats["serialize"], 2.5)
+        self.assertEqual(stats["serialize_depth"], 0)
+
+
+class AsyncQueueHandlerTests(SimpleTestCase):
+    def make_handler(self, **kwargs):
+        handler = AsyncQueueHandler(stream=io.StringIO(), **kwargs)
+        self.addCleanup(handler._stop_listener)
+        handler.setFormatter(logging.Formatter("%(levelname)s %(message)s"))
+        return handler
+
+    def record(self, msg, *args):
+        return logging.LogRecord("backend.tests", logging.INFO, __file__, 1, msg, args, None)
+
+    def test_records_reach_the_stream(self):
+        handler = self.make_handler()
+        handler.handle(self.record("order %s paid", 7))
+        handler._stop_listener()  # joins the listener after it drains the queue
+        self.assertEqual(handler.stream.getvalue(), "INFO order 7 paid\n")
+        self.assertEqual(handler.dropped, 0)
+
+    def test_full_queue_drops_and_counts(self):
+        handler = self.make_handler(maxsize=2)
+        handler._stop_listener()  # nothing drains the queue from here on
+        for i in range(5):
+            handler.handle(self.record("line %s", i))
+
+        self.assertEqual(handler.dropped, 3)
+        self.assertEqual([handler.queue.get_nowait().msg for _ in range(2)], ["line 0", "line 1"])
+        self.assertTrue(handler.queue.empty())
+        self.assertEqual(handler.stream.getvalue(), "")
+
+
+class CompressionMiddlewareTests(SimpleTestCase):
+    body = b'{"items": [' + b'{"name": "Phone", "price": "100.00"},' * 200 + b"{}]}"
+
+    def setUp(self):
+        self.factory = RequestFactory()
+
+    def _run(self, request, set_cookie=False, vary_cookie=False):
+        def view(request):
+            response = HttpResponse(self.body, content_type="application/json")
+            if set_cookie:
+                response.set_cookie("csrftoken", "abc")
+            if vary_cookie:
+                response["Vary"] = "Cookie"
+            return response
+
+        middleware = CompressionMiddleware(view)
+        return middleware, middleware(request)
+
+    def test_public_get_is_cached(self):
+        middleware, response = self._run(self.factory.get("/api/x/", HTTP_ACCEPT_ENCODING="gzip"))
+        self.assertEqual(response["Content-Encoding"], "gzip")
+        self.assertEqual(len(middleware.cache._data), 1)
+
+    def test_session_cookie_gets_padded_gzip_and_no_cache(self):
+        request = self.factory.get("/admin/", HTTP_ACCEPT_ENCODING="gzip, br")
+        request.COOKIES["sessionid"] = "s"
+        middleware, response = self._run(request)
+        self.assertEqual(response["Content-Encoding"], "gzip")
+        self.assertEqual(gzip.decompress(response.content), self.body)
+        self.assertEqual(len(middleware.cache._data), 0)
+
+    def test_responses_setting_or_varying_on_cookies_are_not_cached(self):
+        for kwargs in ({"set_cookie": True}, {"vary_cookie": True}):
+            middleware, response = self._run(self.factory.get("/api/x/", HTTP_ACCEPT_ENCODING="gzip"), **kwargs)
+            self.assertEqual(response["Content-Encoding"], "gzip")
+            self.assertEqual(len(middleware.cache._data), 0)
+
+    def test_brotli_still_used_without_credentials(self):
+        if brotli is None:
+            self.skipTest("brotli is not installed")
+        _, response = self._run(self.factory.get("/api/x/", HTTP_ACCEPT_ENCODING="gzip, br"))
+        self.assertEqual(response["Content-Encoding"], "br")
+
+
+class TokenBucketCases:
+    """Shared checks; subclasses provide make_backend()."""
+
+    def test_bucket_empties_then_refills(self):
+        backend = self.make_backend()
+        # 2 tokens, refilled at 1 per second.
+        self.assertEqual(backend.consume("k", 2, 1, now=100), (True, 0.0))
+        self.assertEqual(backend.consume("k", 2, 1, now=100), (True, 0.0))
+        self.assertEqual(backend.consume("k", 2, 1, now=100), (False, 1.0))
+        self.assertEqual(backend.consume("k", 2, 1, now=100.5), (False, 0.5))
+        self.assertEqual(backend.consume("k", 2, 1, now=101.5), (True, 0.0))
+
+    def test_keys_are_independent(self):
+        backend = self.make_backend()
+        self.assertTrue(backend.consume("a", 1, 1, now=100)[0])
+        self.assertFalse(backend.consume("a", 1, 1, now=100)[0])
+        self.assertTrue(backend.consume("b", 1, 1, now=100)[0])
+
+
+class LocalTokenBucketTests(TokenBucketCases, SimpleTestCase):
+    def make_backend(self):
+        return LocalTokenBucketBackend()
+
+
+@skipIf(fakeredis is None, "fakeredis is not installed")
+class RedisTokenBucketTests(TokenBucketCases, SimpleTestCase):
+    def make_backend(self):
+        return RedisTokenBucketBackend(client=fakeredis.FakeRedis())
+
+    def test_shared_between_backend_instances(self):
+        server = fakeredis.FakeServer()
+        first = RedisTokenBucketBackend(client=fakeredis.FakeRedis(server=server))
+        second = RedisTokenBucketBackend(client=fakeredis.FakeRedis(server=server))
+        self.assertTrue(first.consume("k", 1, 1, now=100)[0])
+        self.assertFalse(second.consume("k", 1, 1, now=100)[0])
+
+
+@override_settings(THROTTLE_RATES={"test": "1/min"})
+class IPThrottleTests(SimpleTestCase):
+    class Throttle(IPTokenBucketThrottle):
+        scope = "test"
+
+    def setUp(self):
+        self.factory = APIRequestFactory()
+        throttling._backend = LocalTokenBucketBackend()
+        self.addCleanup(setattr, throttling, "_backend", None)
+
+    def _allowed(self, forwarded_for):
+        request = self.factory.post("/", REMOTE_ADDR="10.0.0.1", HTTP_X_FORWARDED_FOR=forwarded_for)
+        return self.Throttle().allow_request(request, None)
+
+    def test_forged_forwarded_for_is_ignored_without_proxies(self):
+        self.assertTrue(self._allowed("1.1.1.1"))
+        self.assertFalse(self._allowed("2.2.2.2"))
+
+    @override_settings(REST_FRAMEWORK={"NUM_PROXIES": 1})
+    def test_client_address_is_taken_from_the_proxy_hop(self):
+        self.assertTrue(self._allowed("forged, 1.1.1.1"))
+        self.assertFalse(self._allowed("other-forged, 1.1.1.1"))
+        self.assertTrue(self._allowed("2.2.2.2"))
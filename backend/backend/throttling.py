@@ -0,0 +1,190 @@
+# backend/throttling.py
+"""
+Token-bucket throttling for DRF views.
+
+Each scope has a rate like "5/min": a bucket holds up to 5 tokens and refills
+at 5 tokens per minute. A request costs one token; when the bucket is empty the
+view answers 429 with Retry-After set to the time until the next token.
+
+Backends (settings.THROTTLE_BACKEND):
+  - "local": per-process dict, O(1) per check, no I/O.
+  - "redis": shared across workers; one atomic Lua call per check
+    (any Redis-compatible server works, e.g. fakeredis in tests).
+"""
+import threading
+import time
+from collections import OrderedDict, defaultdict
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from rest_framework.throttling import BaseThrottle
+
+_PERIODS = {"s": 1, "m": 60, "h": 3600, "d": 86400}
+
+
+def parse_rate(rate):
+    """'5/min' -> (capacity=5, refill_per_second=5/60)."""
+    num, period = rate.split("/")
+    capacity = int(num)
+    seconds = _PERIODS[period.strip()[0]]
+    return capacity, capacity / seconds
+
+
+class LocalTokenBucketBackend:
+    def __init__(self, max_keys=100_000):
+        self.max_keys = max_keys
+        self._buckets = OrderedDict()
+        self._lock = threading.Lock()
+
+    def consume(self, key, capacity, refill, now=None):
+        """Return (allowed, retry_after_seconds)."""
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            tokens, ts = self._buckets.pop(key, (capacity, now))
+            tokens = min(capacity, tokens + (now - ts) * refill)
+            if tokens >= 1:
+                tokens -= 1
+                allowed, wait = True, 0.0
+            else:
+                allowed, wait = False, (1 - tokens) / refill
+            self._buckets[key] = (tokens, now)
+            if len(self._buckets) > self.max_keys:
+                # Oldest-touched buckets are the ones that have refilled the longest.
+                self._buckets.popitem(last=False)
+        return allowed, wait
+
+
+_REDIS_SCRIPT = """
+local capacity = tonumber(ARGV[1])
+local refill = tonumber(ARGV[2])
+local now = tonumber(ARGV[3])
+local ttl = tonumber(ARGV[4])
+local b = redis.call('HMGET', KEYS[1], 't', 'ts')
+local tokens = tonumber(b[1])
+local ts = tonumber(b[2])
+if tokens == nil then
+  tokens = capacity
+  ts = now
+end
+tokens = math.min(capacity, tokens + math.max(0, now - ts) * refill)
+local allowed = 0
+local wait = 0
+if tokens >= 1 then
+  tokens = tokens - 1
+  allowed = 1
+else
+  wait = (1 - tokens) / refill
+end
+redis.call('HSET', KEYS[1], 't', tostring(tokens), 'ts', tostring(now))
+redis.call('EXPIRE', KEYS[1], ttl)
+return {allowed, tostring(wait)}
+"""
+
+
+class RedisTokenBucketBackend:
+    def __init__(self, url=None, client=None, prefix="throttle:"):
+        if client is None:
+            try:
+                import redis
+            except ImportError:
+                raise ImproperlyConfigured("THROTTLE_BACKEND='redis' requires the 'redis' package.")
+            client = redis.Redis.from_url(url)
+        self.client = client
+        self.prefix = prefix
+        self._script = client.register_script(_REDIS_SCRIPT)
+
+    def consume(self, key, capacity, refill, now=None):
+        now = time.time() if now is None else now
+        ttl = int(capacity / refill) + 1  # a full refill; after that the bucket is back to default
+        allowed, wait = self._script(keys=[self.prefix + key], args=[capacity, refill, now, ttl])
+        return bool(int(allowed)), float(wait)
+
+
+_backend = None
+_backend_lock = threading.Lock()
+
+
+def get_backend():
+    global _backend
+    if _backend is None:
+        with _backend_lock:
+            if _backend is None:
+                kind = getattr(settings, "THROTTLE_BACKEND", "local")
+                if kind == "redis":
+                    _backend = RedisTokenBucketBackend(settings.THROTTLE_REDIS_URL)
+                elif kind == "local":
+                    _backend = LocalTokenBucketBackend()
+                else:
+                    raise ImproperlyConfigured(f"Unknown THROTTLE_BACKEND {kind!r}.")
+    return _backend
+
+
+# scope -> {"allowed": n, "throttled": n}
+_stats = defaultdict(lambda: {"allowed": 0, "throttled": 0})
+_stats_lock = threading.Lock()
+
+
+def throttle_stats():
+    with _stats_lock:
+        return {scope: dict(counts) for scope, counts in _stats.items()}
+
+
+class TokenBucketThrottle(BaseThrottle):
+    """
+    Base class; subclasses set `scope` (a key of settings.THROTTLE_RATES) and
+    implement get_key(). A None key skips throttling for that request.
+    """
+    scope = None
+    key_kind = None
+
+    def __init__(self):
+        self._wait = None
+
+    def get_key(self, request, view):
+        raise NotImplementedError
+
+    def allow_request(self, request, view):
+        rate = settings.THROTTLE_RATES.get(self.scope)
+        if not rate:
+            return True
+        ident = self.get_key(request, view)
+        if ident is None:
+            return True
+
+        capacity, refill = parse_rate(rate)
+        allowed, self._wait = get_backend().consume(f"{self.scope}:{self.key_kind}:{ident}", capacity, refill)
+
+        label = f"{self.scope}:{self.key_kind}"
+        with _stats_lock:
+            _stats[label]["allowed" if allowed else "throttled"] += 1
+        return allowed
+
+    def wait(self):
+        return self._wait
+
+
+class IPTokenBucketThrottle(TokenBucketThrottle):
+    key_kind = "ip"
+
+    def get_key(self, request, view):
+        return self.get_ident(request)
+
+
+class UserTokenBucketThrottle(TokenBucketThrottle):
+    key_kind = "user"
+
+    def get_key(self, request, view):
+        if request.user and request.user.is_authenticated:
+            return str(request.user.pk)
+        return None
+
+
+class EmailTokenBucketThrottle(TokenBucketThrottle):
+    """Keys on the `email` field of the request body (login, forgot-password)."""
+    key_kind = "email"
+
+    def get_key(self, request, view):
+        email = request.data.get("email") if hasattr(request.data, "get") else None
+        if not isinstance(email, str) or not email.strip():
+            return None
+        return email.strip().lower()
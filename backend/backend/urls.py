@@ -5,6 +5,8 @@ from django.conf import settings
 from django.conf.urls.static import static
 from django.http import JsonResponse
 
+from .views import ThrottleStatsView, metrics
+
 # Health check
 def health(_request): 
     return JsonResponse({"ok": True})
@@ -26,7 +28,11 @@ urlpatterns = [
     path("api/", include("dialphones.urls")),
     path("api/", include("newiphones.urls")),
     path("api/", include("heroes.urls")),
+    path("api/", include("reports.urls")),
+    path("api/", include("catalog.urls")),
     path("api/health/", health),
+    path("api/metrics/", metrics, name="metrics"),
+    path("api/throttle/stats/", ThrottleStatsView.as_view(), name="throttle-stats"),
 ]
 
 # For image/media uploads in DEBUG
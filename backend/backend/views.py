@@ -0,0 +1,46 @@
+# backend/views.py
+from django.conf import settings
+from django.http import HttpResponse, HttpResponseForbidden
+from django.utils.crypto import constant_time_compare
+from rest_framework.permissions import IsAdminUser
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from .metrics import render_prometheus
+from .throttling import throttle_stats
+
+
+class ThrottleStatsView(APIView):
+    """
+    GET /api/throttle/stats/ (staff only)
+    Allowed/throttled counters per "<scope>:<key kind>" for this process.
+    """
+    permission_classes = [IsAdminUser]
+
+    def get(self, request):
+        return Response(throttle_stats())
+
+
+def metrics(request):
+    """
+    GET /api/metrics/ — Prometheus text format.
+    Allowed with a matching X-Metrics-Token header (settings.METRICS_TOKEN),
+    for logged-in staff (admin session), or for anyone when DEBUG is on.
+    """
+    token = getattr(settings, "METRICS_TOKEN", "")
+    supplied = request.headers.get("X-Metrics-Token", "")
+    allowed = (
+        settings.DEBUG
+        or (token and constant_time_compare(supplied, token))
+        or (request.user.is_authenticated and request.user.is_staff)
+    )
+    if not allowed:
+        return HttpResponseForbidden("Forbidden")
+
+    extra = ["# HELP throttle_decisions_total Token-bucket throttle decisions.",
+             "# TYPE throttle_decisions_total counter"]
+    for label, counts in sorted(throttle_stats().items()):
+        scope, kind = label.split(":", 1)
+        for decision, n in sorted(counts.items()):
+            extra.append(f'throttle_decisions_total{{scope="{scope}",key="{kind}",decision="{decision}"}} {n}')
+    return HttpResponse(render_prometheus(extra), content_type="text/plain; version=0.0.4; charset=utf-8")
@@ -2,6 +2,7 @@ from django.shortcuts import render
 
 # Create your views here.
 from rest_framework import generics, filters
+from catalog.specs import SpecFilterBackend
 from .models import BudgetSmartphone
 from .serializers import BudgetSmartphoneSerializer
 
@@ -13,10 +14,11 @@ class BudgetSmartphoneListView(generics.ListAPIView):
       - badge=<text>  (e.g., OPEN or OPEN HOT)
       - search=<text> (name/specs/brand/badge)
       - ordering=created_at|price_min_ksh|price_max_ksh|name  (prefix with '-' for desc)
+      - ram_gb, storage_gb, battery_mah, camera_mp, display_inches (=, _min=, _max=; see catalog.specs)
     """
     serializer_class = BudgetSmartphoneSerializer
     queryset = BudgetSmartphone.objects.all()
-    filter_backends = [filters.SearchFilter, filters.OrderingFilter]
+    filter_backends = [filters.SearchFilter, filters.OrderingFilter, SpecFilterBackend]
     search_fields = ["name", "specs_text", "brand", "badge"]
     ordering_fields = ["created_at", "price_min_ksh", "price_max_ksh", "name"]
     ordering = ["brand", "name"]
@@ -0,0 +1,17 @@
+from django.contrib import admin
+
+from backend.admin_tools import LargeTableAdmin
+from .models import CatalogChange
+
+
+@admin.register(CatalogChange)
+class CatalogChangeAdmin(LargeTableAdmin):
+    list_display = ("seq", "category", "object_id", "op", "created_at")
+    list_filter = ("op", "category")
+    ordering = ("-seq",)
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
@@ -0,0 +1,213 @@
+# catalog/autocomplete.py
+"""
+Typeahead suggestions from an in-process prefix index.
+
+Every catalog row contributes a few normalized terms: each word-suffix of
+"<brand> <name>" ("samsung galaxy a15", "galaxy a15", "a15") and its slug.
+The terms live in one sorted list, so a query is a bisect to the first term
+with that prefix plus a short forward scan; no database access.
+
+Each process builds the index once: from the compact snapshot that
+manage.py publish_catalog_snapshots writes next to the list snapshots
+(manifest key "autocomplete"), or from the database when there is none. After
+that it stays current from two sides: this process's own saves apply on
+commit (catalog.signals), and rows changed elsewhere are read from the catalog
+change feed at most every AUTOCOMPLETE_SYNC_SECONDS.
+"""
+import bisect
+import json
+import logging
+import re
+import threading
+import time
+from collections import defaultdict
+
+from django.conf import settings
+from django.db.models import Max
+
+from .feed import settled
+from .models import CatalogChange
+from .registry import BY_KEY, CATEGORIES
+from .snapshots import read_manifest, snapshot_path
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_KEY = "autocomplete"
+MAX_LIMIT = 20
+SCAN_LIMIT = 200  # distinct rows looked at per query before ranking
+SYNC_BATCH = 1000
+
+_non_word = re.compile(r"[\W_]+")
+
+
+def normalize(text):
+    return _non_word.sub(" ", (text or "").casefold()).strip()
+
+
+def _terms(name, brand, slug):
+    words = normalize(f"{brand} {name}").split()
+    terms = {" ".join(words[i:]) for i in range(len(words))}
+    terms.add(normalize(slug))
+    terms.discard("")
+    return terms
+
+
+def _rows(category, ids=None):
+    has_brand = any(f.name == "brand" for f in category.model._meta.fields)
+    qs = category.model.objects.order_by("pk")
+    if ids is not None:
+        qs = qs.filter(pk__in=ids)
+    for pk, name, slug, *brand in qs.values_list("pk", "name", "slug", *(["brand"] if has_brand else [])):
+        yield [category.key, pk, name, brand[0] if brand else "", slug]
+
+
+class PrefixIndex:
+    def __init__(self, rows=(), seq=0):
+        self.seq = seq  # catalog change feed position the index reflects
+        self.synced_at = time.monotonic()
+        self._items = {}  # (category, id) -> (name, brand, slug, terms, normalized name)
+        self._keys = []   # sorted (term, category, id)
+        self._lock = threading.Lock()
+        self._sync_lock = threading.Lock()
+        for category, pk, name, brand, slug in rows:
+            terms = _terms(name, brand, slug)
+            self._items[(category, pk)] = (name, brand, slug, terms, normalize(name))
+            self._keys.extend((term, category, pk) for term in terms)
+        self._keys.sort()
+
+    def __len__(self):
+        return len(self._items)
+
+    def _drop(self, key):
+        item = self._items.pop(key, None)
+        if item is None:
+            return
+        for term in item[3]:
+            i = bisect.bisect_left(self._keys, (term, *key))
+            if i < len(self._keys) and self._keys[i] == (term, *key):
+                del self._keys[i]
+
+    def upsert(self, category, pk, name, brand, slug):
+        terms = _terms(name, brand, slug)
+        with self._lock:
+            self._drop((category, pk))
+            self._items[(category, pk)] = (name, brand, slug, terms, normalize(name))
+            for term in terms:
+                bisect.insort(self._keys, (term, category, pk))
+
+    def remove(self, category, pk):
+        with self._lock:
+            self._drop((category, pk))
+
+    def search(self, query, limit=8):
+        q = normalize(query)
+        if not q:
+            return []
+        matches = {}
+        with self._lock:
+            i = bisect.bisect_left(self._keys, (q,))
+            while i < len(self._keys) and len(matches) < SCAN_LIMIT:
+                term, category, pk = self._keys[i]
+                if not term.startswith(q):
+                    break
+                matches.setdefault((category, pk), self._items[(category, pk)])
+                i += 1
+        ranked = sorted(
+            matches.items(),
+            # Names that start with the query first, then the shortest (closest) names.
+            key=lambda kv: (not kv[1][4].startswith(q), len(kv[1][0]), kv[1][0]),
+        )
+        return [
+            {"category": category, "id": pk, "name": name, "brand": brand, "slug": slug}
+            for (category, pk), (name, brand, slug, *_) in ranked[:limit]
+        ]
+
+    def sync(self):
+        """Apply catalog feed entries past self.seq (settled ones only, as catalog.feed serves them)."""
+        if not self._sync_lock.acquire(blocking=False):
+            return  # another thread is already on it
+        try:
+            entries = list(
+                settled().filter(seq__gt=self.seq)
+                .order_by("seq").values_list("seq", "category", "object_id")[:SYNC_BATCH]
+            )
+            changed = defaultdict(set)
+            for _, key, pk in entries:
+                changed[key].add(pk)
+            for key, ids in changed.items():
+                category = BY_KEY.get(key)
+                if category is None:
+                    continue
+                found = set()
+                for row in _rows(category, ids):
+                    self.upsert(*row)
+                    found.add(row[1])
+                for pk in ids - found:
+                    self.remove(key, pk)
+            if entries:
+                self.seq = entries[-1][0]
+            self.synced_at = time.monotonic()
+        finally:
+            self._sync_lock.release()
+
+
+def snapshot():
+    """The compact snapshot the index is built from: {"seq": n, "rows": [[category, id, name, brand, slug], ...]}."""
+    # Read the feed position first: anything changed while rows are read gets replayed, never missed.
+    seq = CatalogChange.objects.aggregate(m=Max("seq"))["m"] or 0
+    return {"seq": seq, "rows": [row for category in CATEGORIES for row in _rows(category)]}
+
+
+def _load():
+    name = read_manifest().get(SNAPSHOT_KEY)
+    if name:
+        try:
+            data = json.loads(snapshot_path(name).read_bytes())
+            return PrefixIndex(data["rows"], data["seq"])
+        except (OSError, ValueError, KeyError):
+            logger.warning("Unreadable autocomplete snapshot %s; building from the database", name)
+    data = snapshot()
+    return PrefixIndex(data["rows"], data["seq"])
+
+
+_index = None
+_index_lock = threading.Lock()
+
+
+def get_index():
+    global _index
+    if _index is None:
+        with _index_lock:
+            if _index is None:
+                start = time.perf_counter()
+                _index = _load()
+                logger.info("Autocomplete index: %d rows in %.0f ms", len(_index), (time.perf_counter() - start) * 1000)
+    return _index
+
+
+def warm():
+    """Build the index at process start so the first keystroke doesn't pay for it."""
+    try:
+        get_index()
+    except Exception:  # e.g. database not migrated yet; the first query retries
+        logger.exception("Could not build the autocomplete index at startup")
+
+
+def suggest(query, limit=8):
+    index = get_index()
+    if time.monotonic() - index.synced_at >= settings.AUTOCOMPLETE_SYNC_SECONDS:
+        index.sync()
+    return index.search(query, limit)
+
+
+def apply_saved(instance):
+    """Reflect a save from this process right away (called on commit by catalog.signals)."""
+    if _index is None:
+        return
+    category = BY_KEY[instance._meta.app_label]
+    _index.upsert(category.key, instance.pk, instance.name, getattr(instance, "brand", "") or "", instance.slug)
+
+
+def apply_deleted(key, pk):
+    if _index is not None:
+        _index.remove(key, pk)
@@ -0,0 +1,68 @@
+# catalog/feed.py
+"""
+Catalog change feed.
+
+Every save or delete of a category row appends a CatalogChange (after the
+surrounding transaction commits) and drops the row's older entries, so
+reading the feed from any `since` yields each changed row once, at its latest
+state. Entries younger than CATALOG_FEED_SETTLE_SECONDS are held back: an
+auto-increment value is allocated before its transaction commits, and the
+delay keeps a reader from skipping past a lower seq that is still in flight.
+"""
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from .models import CatalogChange
+from .registry import BY_KEY
+
+
+def record_change(category, object_id, op):
+    with transaction.atomic():
+        CatalogChange.objects.filter(category=category, object_id=object_id).delete()
+        CatalogChange.objects.create(category=category, object_id=object_id, op=op)
+
+
+def settled():
+    """Feed entries old enough to read past: no lower seq can still be in flight."""
+    cutoff = timezone.now() - timedelta(seconds=settings.CATALOG_FEED_SETTLE_SECONDS)
+    return CatalogChange.objects.filter(created_at__lte=cutoff)
+
+
+def changes_since(since, limit=500, categories=None, request=None):
+    """
+    Up to `limit` changes with seq > since, as
+    {"changes": [{seq, category, id, op, data}], "next": <seq to pass next time>, "has_more": bool}.
+    `data` is the row as its category list endpoint serializes it (None for deletes).
+    """
+    qs = settled().filter(seq__gt=since).order_by("seq")
+    if categories:
+        qs = qs.filter(category__in=categories)
+    entries = list(qs.values_list("seq", "category", "object_id", "op")[:limit + 1])
+    has_more = len(entries) > limit
+    entries = entries[:limit]
+
+    wanted = {}
+    for _, category, object_id, op in entries:
+        if op == CatalogChange.OP_UPSERT:
+            wanted.setdefault(category, set()).add(object_id)
+
+    rows = {}
+    for key, ids in wanted.items():
+        category = BY_KEY.get(key)
+        if category is None:
+            continue
+        objs = category.model.objects.select_related("product").filter(pk__in=ids)
+        for data in category.serializer_class(objs, many=True, context={"request": request}).data:
+            rows[(key, data["id"])] = data
+
+    changes = []
+    for seq, category, object_id, op in entries:
+        data = rows.get((category, object_id)) if op == CatalogChange.OP_UPSERT else None
+        if op == CatalogChange.OP_UPSERT and data is None:
+            op = CatalogChange.OP_DELETE  # deleted after it was logged; its tombstone follows later
+        changes.append({"seq": seq, "category": category, "id": object_id, "op": op, "data": data})
+
+    return {"changes": changes, "next": entries[-1][0] if entries else since, "has_more": has_more}
@@ -0,0 +1,80 @@
+# catalog/management/commands/extract_specs.py
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+import django
+from django.core.management.base import BaseCommand
+
+from catalog.models import ExtractedSpecs
+from catalog.registry import BY_KEY, CATEGORIES
+from catalog.specs import extract_batch, fields_for, save
+
+
+class Command(BaseCommand):
+    help = (
+        "Backfill ExtractedSpecs for the whole catalog (see catalog.specs). Rows are read in "
+        "primary-key chunks and parsed in worker processes; saves keep rows current afterwards."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--category", action="append", choices=sorted(BY_KEY),
+                            help="Only these categories (repeatable).")
+        parser.add_argument("--workers", type=int, default=os.cpu_count() or 1,
+                            help="Parser processes; 0 parses in this process.")
+        parser.add_argument("--chunk-size", type=int, default=2000)
+
+    def handle(self, *args, **opts):
+        categories = [BY_KEY[k] for k in opts["category"]] if opts["category"] else CATEGORIES
+        chunk_size = opts["chunk_size"]
+
+        if opts["workers"] <= 0:
+            for category in categories:
+                self._run(category, chunk_size, pool=None, workers=1)
+            return
+        # Regex matching holds the GIL, so parse in processes; the DB work stays in this one.
+        with ProcessPoolExecutor(max_workers=opts["workers"], initializer=django.setup) as pool:
+            for category in categories:
+                self._run(category, chunk_size, pool, opts["workers"])
+
+    def _chunks(self, category, chunk_size):
+        fields = fields_for(category.key)
+        qs = category.model.objects.order_by("pk").values("pk", *fields)
+        last_pk = 0
+        while True:
+            rows = list(qs.filter(pk__gt=last_pk)[:chunk_size])
+            if not rows:
+                return
+            last_pk = rows[-1]["pk"]
+            yield [(row["pk"], {f: row[f] for f in fields}) for row in rows]
+
+    def _run(self, category, chunk_size, pool, workers):
+        start = time.perf_counter()
+        done = 0
+        pending = set()
+        for chunk in self._chunks(category, chunk_size):
+            if pool is None:
+                save(category.key, extract_batch(category.key, chunk))
+                done += len(chunk)
+                continue
+            pending.add(pool.submit(extract_batch, category.key, chunk))
+            if len(pending) >= workers * 2:  # bound the rows held in memory
+                finished, pending = wait(pending, return_when=FIRST_COMPLETED)
+                done += self._save(category.key, finished)
+        done += self._save(category.key, pending)
+
+        stale = ExtractedSpecs.objects.filter(category=category.key).exclude(
+            object_id__in=category.model.objects.values("pk"),
+        ).delete()[0]
+        self.stdout.write(
+            f"{category.key}: {done} row(s) extracted, {stale} stale removed "
+            f"in {time.perf_counter() - start:.2f}s."
+        )
+
+    def _save(self, key, futures):
+        count = 0
+        for future in futures:
+            results = future.result()
+            save(key, results)
+            count += len(results)
+        return count
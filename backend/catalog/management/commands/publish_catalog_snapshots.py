@@ -0,0 +1,65 @@
+# catalog/management/commands/publish_catalog_snapshots.py
+import json
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+from django.db.models import Max
+
+from catalog import autocomplete
+from catalog.feed import settled
+from catalog.snapshots import prune, publish, publish_file
+
+
+class Command(BaseCommand):
+    help = (
+        "Write pre-rendered, pre-compressed catalog list snapshots (see catalog.snapshots). "
+        "With --loop, follow the catalog change feed and republish only the categories "
+        "that changed, once edits have been quiet for SNAPSHOT_DEBOUNCE_SECONDS. Also writes the "
+        "compact autocomplete snapshot (catalog.autocomplete)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--category", action="append", help="Only these categories (repeatable).")
+        parser.add_argument("--loop", action="store_true", help="Keep running and republish on catalog changes.")
+        parser.add_argument("--poll-interval", type=float, default=1.0)
+
+    def handle(self, *args, **opts):
+        # Only settled entries move last_seq (catalog.feed): a lower seq still in flight
+        # would otherwise be skipped for good. Replaying a few after the publish is harmless.
+        last_seq = settled().aggregate(m=Max("seq"))["m"] or 0
+        self._publish(opts["category"])
+        if not opts["loop"]:
+            return
+
+        dirty, first_change, last_change = set(), None, None
+        while True:
+            time.sleep(opts["poll_interval"])
+            close_old_connections()
+            rows = list(settled().filter(seq__gt=last_seq).values_list("seq", "category"))
+            now = time.monotonic()
+            if rows:
+                last_seq = max(seq for seq, _ in rows)
+                dirty.update(c for _, c in rows if not opts["category"] or c in opts["category"])
+                first_change = first_change or now
+                last_change = now
+            if not dirty:
+                first_change = last_change = None
+                continue
+            quiet = now - last_change >= settings.SNAPSHOT_DEBOUNCE_SECONDS
+            overdue = now - first_change >= settings.SNAPSHOT_MAX_DELAY_SECONDS
+            if quiet or overdue:
+                self._publish(sorted(dirty))
+                dirty, first_change, last_change = set(), None, None
+
+    def _publish(self, categories):
+        start = time.perf_counter()
+        written = publish(categories)
+        # The compact row list web processes build their autocomplete index from at startup.
+        publish_file(autocomplete.SNAPSHOT_KEY, json.dumps(autocomplete.snapshot(), separators=(",", ":")).encode())
+        removed = prune()
+        self.stdout.write(
+            f"Published {len(written)} snapshot(s) for {', '.join(categories) if categories else 'all categories'} "
+            f"in {time.perf_counter() - start:.1f}s; pruned {removed} old file(s)."
+        )
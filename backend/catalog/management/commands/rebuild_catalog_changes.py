@@ -0,0 +1,28 @@
+# catalog/management/commands/rebuild_catalog_changes.py
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from catalog.models import CatalogChange
+from catalog.registry import CATEGORIES
+
+
+class Command(BaseCommand):
+    help = (
+        "Log every existing catalog row as an upsert at the head of the change feed "
+        "(run once after installing the catalog app, or to force clients to refresh)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=1000)
+
+    def handle(self, *args, **opts):
+        for category in CATEGORIES:
+            ids = list(category.model.objects.order_by("pk").values_list("pk", flat=True))
+            for i in range(0, len(ids), opts["batch_size"]):
+                chunk = ids[i:i + opts["batch_size"]]
+                with transaction.atomic():
+                    CatalogChange.objects.filter(category=category.key, object_id__in=chunk).delete()
+                    CatalogChange.objects.bulk_create(
+                        [CatalogChange(category=category.key, object_id=pk, op=CatalogChange.OP_UPSERT) for pk in chunk]
+                    )
+            self.stdout.write(f"{category.key}: {len(ids)} row(s)")
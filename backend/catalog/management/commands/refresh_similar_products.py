@@ -0,0 +1,68 @@
+# catalog/management/commands/refresh_similar_products.py
+import time
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.core.management.base import BaseCommand, CommandError
+from django.db import close_old_connections
+from django.db.models import Max
+
+from catalog.feed import settled
+from catalog.registry import BY_KEY
+from catalog.similarity import FEATURES, rebuild, refresh
+
+
+class Command(BaseCommand):
+    help = (
+        "Precompute the \"similar products\" neighbour lists (see catalog.similarity). "
+        "With --loop, follow the catalog change feed and recompute only the rows a change "
+        "can affect, with a full rebuild every SIMILAR_PRODUCTS_FULL_REBUILD_SECONDS."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--category", action="append", choices=sorted(FEATURES),
+                            help="Only these categories (repeatable).")
+        parser.add_argument("--loop", action="store_true", help="Keep running and refresh on catalog changes.")
+        parser.add_argument("--poll-interval", type=float, default=2.0)
+
+    def handle(self, *args, **opts):
+        keys = opts["category"] or sorted(FEATURES)
+        # Only settled feed entries move last_seq (catalog.feed), so a lower seq still in
+        # flight isn't skipped; entries replayed after a rebuild just recompute again.
+        last_seq = settled().aggregate(m=Max("seq"))["m"] or 0
+        self._rebuild(keys)
+        if not opts["loop"]:
+            return
+
+        last_full = time.monotonic()
+        while True:
+            time.sleep(opts["poll_interval"])
+            close_old_connections()
+            if time.monotonic() - last_full >= settings.SIMILAR_PRODUCTS_FULL_REBUILD_SECONDS:
+                last_seq = settled().aggregate(m=Max("seq"))["m"] or last_seq
+                self._rebuild(keys)
+                last_full = time.monotonic()
+                continue
+
+            rows = settled().filter(seq__gt=last_seq, category__in=keys)
+            changed = defaultdict(set)
+            for seq, key, object_id in rows.values_list("seq", "category", "object_id"):
+                last_seq = max(last_seq, seq)
+                changed[key].add(object_id)
+            for key, ids in sorted(changed.items()):
+                start = time.perf_counter()
+                count = refresh(BY_KEY[key], ids)
+                self.stdout.write(
+                    f"{key}: {len(ids)} changed row(s), {count} neighbour list(s) recomputed "
+                    f"in {time.perf_counter() - start:.2f}s."
+                )
+
+    def _rebuild(self, keys):
+        for key in keys:
+            start = time.perf_counter()
+            try:
+                count = rebuild(BY_KEY[key])
+            except ImproperlyConfigured as e:
+                raise CommandError(str(e))
+            self.stdout.write(f"{key}: {count} row(s) rebuilt in {time.perf_counter() - start:.2f}s.")
@@ -0,0 +1,28 @@
+# Generated by Django 4.2.4 on 2026-10-19 18:54
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CatalogChange',
+            fields=[
+                ('seq', models.BigAutoField(primary_key=True, serialize=False)),
+                ('category', models.CharField(max_length=40)),
+                ('object_id', models.PositiveIntegerField()),
+                ('op', models.CharField(choices=[('upsert', 'Added or updated'), ('delete', 'Removed')], max_length=6)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'ordering': ['seq'],
+                'indexes': [models.Index(fields=['category', 'object_id'], name='catalog_change_obj_idx'), models.Index(fields=['category', 'seq'], name='catalog_change_cat_seq_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 4.2.4 on 2026-10-19 19:03
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('catalog', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SimilarItem',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('category', models.CharField(max_length=40)),
+                ('object_id', models.PositiveIntegerField()),
+                ('rank', models.PositiveSmallIntegerField()),
+                ('neighbor_id', models.PositiveIntegerField()),
+                ('distance', models.FloatField()),
+            ],
+            options={
+                'ordering': ['category', 'object_id', 'rank'],
+                'indexes': [models.Index(fields=['category', 'neighbor_id'], name='similar_item_neighbor_idx')],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='similaritem',
+            constraint=models.UniqueConstraint(fields=('category', 'object_id', 'rank'), name='uniq_similar_item_rank'),
+        ),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 4.2.4 on 2026-10-19 19:06
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('catalog', '0002_similaritem'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ExtractedSpecs',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('category', models.CharField(max_length=40)),
+                ('object_id', models.PositiveIntegerField()),
+                ('ram_gb', models.DecimalField(blank=True, decimal_places=3, max_digits=9, null=True)),
+                ('storage_gb', models.DecimalField(blank=True, decimal_places=3, max_digits=10, null=True)),
+                ('battery_mah', models.PositiveIntegerField(blank=True, null=True)),
+                ('camera_mp', models.DecimalField(blank=True, decimal_places=1, max_digits=5, null=True)),
+                ('display_inches', models.DecimalField(blank=True, decimal_places=1, max_digits=4, null=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name_plural': 'extracted specs',
+                'indexes': [models.Index(fields=['category', 'ram_gb'], name='specs_ram_idx'), models.Index(fields=['category', 'storage_gb'], name='specs_storage_idx'), models.Index(fields=['category', 'battery_mah'], name='specs_battery_idx'), models.Index(fields=['category', 'camera_mp'], name='specs_camera_idx'), models.Index(fields=['category', 'display_inches'], name='specs_display_idx')],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='extractedspecs',
+            constraint=models.UniqueConstraint(fields=('category', 'object_id'), name='uniq_extracted_specs_row'),
+        ),
+    ]
@@ -0,0 +1,86 @@
+# catalog/models.py
+from django.db import models
+
+
+class CatalogChange(models.Model):
+    """
+    One entry of the catalog change feed. `seq` only ever grows; a client that
+    has seen everything up to N asks for seq > N. Only the newest entry per
+    (category, object_id) is kept, so the log stays about as large as the
+    catalog itself (plus tombstones for deleted rows).
+    """
+    OP_UPSERT = "upsert"
+    OP_DELETE = "delete"
+    OP_CHOICES = [(OP_UPSERT, "Added or updated"), (OP_DELETE, "Removed")]
+
+    seq = models.BigAutoField(primary_key=True)
+    category = models.CharField(max_length=40)
+    object_id = models.PositiveIntegerField()
+    op = models.CharField(max_length=6, choices=OP_CHOICES)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ["seq"]
+        indexes = [
+            models.Index(fields=["category", "object_id"], name="catalog_change_obj_idx"),
+            models.Index(fields=["category", "seq"], name="catalog_change_cat_seq_idx"),
+        ]
+
+    def __str__(self):
+        return f"#{self.seq} {self.op} {self.category}:{self.object_id}"
+
+
+class SimilarItem(models.Model):
+    """
+    One precomputed "similar products" neighbour (catalog.similarity): within
+    `category`, row `object_id`'s rank-th nearest row by spec features and price.
+    """
+    category = models.CharField(max_length=40)
+    object_id = models.PositiveIntegerField()
+    rank = models.PositiveSmallIntegerField()
+    neighbor_id = models.PositiveIntegerField()
+    distance = models.FloatField()
+
+    class Meta:
+        ordering = ["category", "object_id", "rank"]
+        constraints = [
+            models.UniqueConstraint(fields=["category", "object_id", "rank"], name="uniq_similar_item_rank"),
+        ]
+        indexes = [
+            models.Index(fields=["category", "neighbor_id"], name="similar_item_neighbor_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.category}:{self.object_id} #{self.rank} -> {self.neighbor_id}"
+
+
+class ExtractedSpecs(models.Model):
+    """
+    Typed spec attributes of one catalog row, parsed from its freeform text by
+    catalog.specs (structured columns win where the category has them). One
+    index per attribute, so spec filters are range lookups.
+    """
+    category = models.CharField(max_length=40)
+    object_id = models.PositiveIntegerField()
+    ram_gb = models.DecimalField(max_digits=9, decimal_places=3, null=True, blank=True)
+    storage_gb = models.DecimalField(max_digits=10, decimal_places=3, null=True, blank=True)
+    battery_mah = models.PositiveIntegerField(null=True, blank=True)
+    camera_mp = models.DecimalField(max_digits=5, decimal_places=1, null=True, blank=True)
+    display_inches = models.DecimalField(max_digits=4, decimal_places=1, null=True, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name_plural = "extracted specs"
+        constraints = [
+            models.UniqueConstraint(fields=["category", "object_id"], name="uniq_extracted_specs_row"),
+        ]
+        indexes = [
+            models.Index(fields=["category", "ram_gb"], name="specs_ram_idx"),
+            models.Index(fields=["category", "storage_gb"], name="specs_storage_idx"),
+            models.Index(fields=["category", "battery_mah"], name="specs_battery_idx"),
+            models.Index(fields=["category", "camera_mp"], name="specs_camera_idx"),
+            models.Index(fields=["category", "display_inches"], name="specs_display_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.category}:{self.object_id} specs"
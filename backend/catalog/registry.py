@@ -0,0 +1,53 @@
+# catalog/registry.py
+"""
+The category apps, in one place: which model backs each category and which
+serializer and list endpoint the storefront uses for it. The key is the app
+label; reports, the feed and seed_catalog all iterate this list.
+"""
+from dataclasses import dataclass
+from functools import cached_property
+
+from django.apps import apps
+from django.utils.module_loading import import_string
+
+
+@dataclass(frozen=True)
+class Category:
+    key: str
+    model_path: str
+    serializer_path: str
+    list_path: str  # under /api/
+    filter_field: str = "brand"  # the list endpoint's exact-match filter; one snapshot per value
+
+    @cached_property
+    def model(self):
+        return apps.get_model(self.model_path)
+
+    @cached_property
+    def serializer_class(self):
+        return import_string(self.serializer_path)
+
+
+CATEGORIES = [
+    Category("smartphones", "smartphones.Smartphone", "smartphones.serializers.SmartphoneSerializer", "smartphones/"),
+    Category("tablets", "tablets.Tablet", "tablets.serializers.TabletSerializer", "tablets/"),
+    Category("storages", "storages.StorageDevice", "storages.serializers.StorageDeviceSerializer", "storages/"),
+    Category("audio", "audio.AudioDevice", "audio.serializers.AudioDeviceSerializer", "audio-devices/"),
+    Category("accessories", "accessories.MobileAccessory", "accessories.serializers.MobileAccessorySerializer",
+             "mobile-accessories/"),
+    Category("televisions", "televisions.Television", "televisions.serializers.TelevisionSerializer", "televisions/"),
+    Category("mkopa", "mkopa.MkopaItem", "mkopa.serializers.MkopaItemSerializer", "mkopa-items/"),
+    Category("reallaptops", "reallaptops.RealLaptop", "reallaptops.serializers.RealLaptopSerializer", "reallaptops/"),
+    Category("offers", "offers.LatestOffer", "offers.serializers.LatestOfferSerializer", "latest-offers/"),
+    Category("budgetsmartphones", "budgetsmartphones.BudgetSmartphone",
+             "budgetsmartphones.serializers.BudgetSmartphoneSerializer", "budget-smartphones/"),
+    Category("dialphones", "dialphones.DialPhoneDeal", "dialphones.serializers.DialPhoneDealSerializer", "dial-phones/"),
+    Category("newiphones", "newiphones.NewIphone", "newiphones.serializers.NewIphoneSerializer", "new-iphones/",
+             filter_field="badge"),
+]
+BY_KEY = {c.key: c for c in CATEGORIES}
+
+
+def category_for_model(model):
+    category = BY_KEY.get(model._meta.app_label)
+    return category if category is not None and category.model is model else None
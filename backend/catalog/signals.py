@@ -0,0 +1,44 @@
+# catalog/signals.py
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+
+from .autocomplete import apply_deleted, apply_saved
+from .feed import record_change
+from .models import CatalogChange, ExtractedSpecs
+from .registry import CATEGORIES
+from .specs import extract_instance
+
+
+def _log_save(sender, instance, raw=False, **kwargs):
+    if raw:  # loaddata
+        return
+    key, pk = sender._meta.app_label, instance.pk
+    # Robust (here and below): the row is already committed, so a failed feed, spec or
+    # index update is logged rather than turning the save into a 500 and skipping
+    # the other callbacks; rebuild_catalog_changes / extract_specs catch up.
+    transaction.on_commit(lambda: record_change(key, pk, CatalogChange.OP_UPSERT), robust=True)
+    transaction.on_commit(lambda: apply_saved(instance), robust=True)
+
+
+def _log_delete(sender, instance, **kwargs):
+    key, pk = sender._meta.app_label, instance.pk
+    transaction.on_commit(lambda: record_change(key, pk, CatalogChange.OP_DELETE), robust=True)
+    transaction.on_commit(lambda: apply_deleted(key, pk), robust=True)
+
+
+def _extract_specs(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    transaction.on_commit(lambda: extract_instance(instance), robust=True)
+
+
+def _drop_specs(sender, instance, **kwargs):
+    key, pk = sender._meta.app_label, instance.pk
+    transaction.on_commit(lambda: ExtractedSpecs.objects.filter(category=key, object_id=pk).delete(), robust=True)
+
+
+for _category in CATEGORIES:
+    post_save.connect(_log_save, sender=_category.model_path, dispatch_uid=f"catalog_feed_save:{_category.key}")
+    post_delete.connect(_log_delete, sender=_category.model_path, dispatch_uid=f"catalog_feed_delete:{_category.key}")
+    post_save.connect(_extract_specs, sender=_category.model_path, dispatch_uid=f"catalog_specs_save:{_category.key}")
+    post_delete.connect(_drop_specs, sender=_category.model_path, dispatch_uid=f"catalog_specs_delete:{_category.key}")
@@ -0,0 +1,166 @@
+# catalog/similarity.py
+"""
+"Similar products" for the categories with structured specs.
+
+Each category's rows become one feature matrix: price and spec columns, the
+skewed ones log-scaled, each standardized to mean 0 / std 1 and multiplied by
+its weight; a missing value sits at the column mean. Neighbours are the k
+closest rows by Euclidean distance, computed in blocks of BLOCK_ROWS rows
+against the whole matrix, and stored as SimilarItem rows so the endpoint is a
+single indexed lookup.
+
+rebuild() recomputes a whole category. refresh() takes the ids that changed
+(saved or deleted) and recomputes only the rows they can affect: the changed
+rows themselves, rows that listed one of them, and rows that a changed row is
+now closer to than their current k-th neighbour. Untouched rows keep
+distances measured against the previous column statistics, so
+manage.py refresh_similar_products runs a full rebuild now and then
+(SIMILAR_PRODUCTS_FULL_REBUILD_SECONDS).
+"""
+from collections import namedtuple
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.db import transaction
+
+from .models import SimilarItem
+from .registry import BY_KEY
+
+try:
+    import numpy as np
+except ImportError:  # numpy is only needed to compute neighbours, not to serve them
+    np = None
+
+Feature = namedtuple("Feature", "field weight log", defaults=(1.0, False))
+
+_PRICE = Feature("price_min_ksh", 2.0, True)
+
+FEATURES = {
+    "smartphones": (
+        _PRICE, Feature("ram_gb", 1.0, True), Feature("storage_gb", 1.0, True),
+        Feature("battery_mah", 0.5), Feature("camera_mp", 0.5, True), Feature("display_inches", 0.5),
+    ),
+    "tablets": (
+        _PRICE, Feature("ram_gb", 1.0, True), Feature("storage_gb", 1.0, True), Feature("display_inches", 1.0),
+    ),
+    "reallaptops": (
+        _PRICE, Feature("ram_gb", 1.0, True), Feature("storage_gb", 1.0, True), Feature("display_inches", 0.5),
+    ),
+    "televisions": (_PRICE, Feature("screen_size_inches", 1.5), Feature("refresh_rate_hz", 0.5)),
+    "storages": (Feature("price_min_ksh", 1.0, True), Feature("capacity_gb", 2.0, True)),
+}
+
+BLOCK_ROWS = 512  # distance rows per block: BLOCK_ROWS x catalog size floats in memory
+WRITE_BATCH = 1000
+
+
+def _require_numpy():
+    if np is None:
+        raise ImproperlyConfigured("Computing similar products requires the 'numpy' package.")
+
+
+def feature_matrix(category):
+    """(ids, X): the category's primary keys and their weighted, standardized feature rows."""
+    _require_numpy()
+    features = FEATURES[category.key]
+    rows = list(category.model.objects.order_by("pk").values_list("pk", *(f.field for f in features)))
+    ids = np.fromiter((r[0] for r in rows), dtype=np.int64, count=len(rows))
+    X = np.array(
+        [[np.nan if v is None else float(v) for v in r[1:]] for r in rows], dtype=np.float64,
+    ).reshape(len(rows), len(features))
+
+    for j, feature in enumerate(features):
+        if feature.log:
+            X[:, j] = np.log1p(X[:, j])
+    present = ~np.isnan(X)
+    count = np.maximum(present.sum(axis=0), 1)
+    mean = np.where(present, X, 0.0).sum(axis=0) / count
+    std = np.sqrt(np.where(present, (X - mean) ** 2, 0.0).sum(axis=0) / count)
+    std[std == 0] = 1.0
+    X = np.where(present, (X - mean) / std, 0.0)
+    X *= np.array([f.weight for f in features])
+    return ids, X
+
+
+def _sq_distances(X, sq, rows):
+    """Squared distances from X[rows] to every row of X (len(rows) x len(X))."""
+    d = sq[rows, None] + sq[None, :] - 2.0 * (X[rows] @ X.T)
+    return np.maximum(d, 0.0, out=d)
+
+
+def nearest(X, rows, k):
+    """Yield (row, [(distance, neighbour_row), ...]) for each of `rows`, the k nearest other rows, closest first."""
+    k = min(k, len(X) - 1)
+    if k <= 0:
+        return
+    sq = np.einsum("ij,ij->i", X, X)
+    for start in range(0, len(rows), BLOCK_ROWS):
+        block = rows[start:start + BLOCK_ROWS]
+        d = _sq_distances(X, sq, block)
+        d[np.arange(len(block)), block] = np.inf
+        part = np.argpartition(d, k - 1, axis=1)[:, :k]
+        dist = np.sqrt(np.take_along_axis(d, part, axis=1))
+        for i, row in enumerate(block.tolist()):
+            # Sorting the (distance, row) pairs breaks ties by row, so results are stable across runs.
+            yield row, sorted(zip(dist[i].tolist(), part[i].tolist()))
+
+
+def _items(key, ids, X, rows, k):
+    for row, neighbours in nearest(X, rows, k):
+        for rank, (distance, other) in enumerate(neighbours):
+            yield SimilarItem(category=key, object_id=int(ids[row]), rank=rank,
+                              neighbor_id=int(ids[other]), distance=distance)
+
+
+def rebuild(category, k=None):
+    """Recompute the whole category's neighbour lists. Returns the number of rows processed."""
+    k = k or settings.SIMILAR_PRODUCTS_K
+    ids, X = feature_matrix(category)
+    items = list(_items(category.key, ids, X, np.arange(len(ids)), k))
+    with transaction.atomic():
+        SimilarItem.objects.filter(category=category.key).delete()
+        SimilarItem.objects.bulk_create(items, batch_size=WRITE_BATCH)
+    return len(ids)
+
+
+def refresh(category, changed_ids, k=None):
+    """
+    Recompute only the neighbour lists that the saved or deleted rows `changed_ids`
+    can affect (see the module docstring). Returns the number of rows recomputed.
+    """
+    k = k or settings.SIMILAR_PRODUCTS_K
+    changed = set(changed_ids)
+    ids, X = feature_matrix(category)
+    position = {pk: i for i, pk in enumerate(ids.tolist())}
+    stored = SimilarItem.objects.filter(category=category.key)
+
+    affected = set(stored.filter(neighbor_id__in=changed).values_list("object_id", flat=True))
+    live = np.array(sorted(position[pk] for pk in changed if pk in position), dtype=np.int64)
+    k_eff = min(k, len(ids) - 1)
+    if len(live) and k_eff > 0:
+        kth = dict(stored.filter(rank=k_eff - 1).values_list("object_id", "distance"))
+        kth = np.array([kth.get(pk, np.inf) for pk in ids.tolist()]) ** 2
+        sq = np.einsum("ij,ij->i", X, X)
+        for start in range(0, len(live), BLOCK_ROWS):
+            closer = (_sq_distances(X, sq, live[start:start + BLOCK_ROWS]) < kth).any(axis=0)
+            affected.update(ids[closer].tolist())
+        affected.update(ids[live].tolist())
+
+    rows = np.array(sorted(position[pk] for pk in affected if pk in position), dtype=np.int64)
+    items = list(_items(category.key, ids, X, rows, k))
+    with transaction.atomic():
+        stored.filter(object_id__in=affected | changed).delete()
+        SimilarItem.objects.bulk_create(items, batch_size=WRITE_BATCH)
+    return len(rows)
+
+
+def similar_ids(key, object_id, limit):
+    """Neighbour ids of one row, closest first (empty until its category has been computed)."""
+    return list(
+        SimilarItem.objects.filter(category=key, object_id=object_id)
+        .order_by("rank").values_list("neighbor_id", flat=True)[:limit]
+    )
+
+
+def categories():
+    return [BY_KEY[key] for key in FEATURES]
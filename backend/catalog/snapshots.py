@@ -0,0 +1,182 @@
+# catalog/snapshots.py
+"""
+Pre-rendered catalog list snapshots.
+
+For every category list endpoint, and for each value of its filter (brand), the
+publisher renders the response exactly as the live view would for an
+anonymous GET and writes it under SNAPSHOT_ROOT as
+
+    <category>[.<value>].<sha256[:16]>.json   (+ .json.gz, + .json.br with brotli)
+
+Names change whenever the content does, so they can be served with a
+one-year immutable Cache-Control by a front proxy or by
+backend.middleware.SnapshotFilesMiddleware (WhiteNoise), without reaching
+Django views. manifest.json maps "<category>" and "<category>?<field>=<value>"
+to the current file names; it is the only file that needs a short max-age.
+publish_file() adds other hashed files to it, such as the compact
+"autocomplete" row list (catalog.autocomplete).
+"""
+import fcntl
+import gzip
+import hashlib
+import json
+import os
+import tempfile
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from urllib.parse import urlencode, urlsplit
+
+from django.conf import settings
+from django.http import HttpRequest, QueryDict
+from django.urls import resolve
+from django.utils.text import slugify
+
+from .registry import CATEGORIES, BY_KEY
+
+try:
+    import brotli
+except ImportError:  # brotli is optional; .gz variants are always written
+    brotli = None
+
+MANIFEST = "manifest.json"
+
+
+def _root():
+    return Path(settings.SNAPSHOT_ROOT)
+
+
+def _request(path, params):
+    """An anonymous GET as the public sees it, so absolute image URLs come out right."""
+    public = urlsplit(settings.SNAPSHOT_PUBLIC_URL)
+    request = HttpRequest()
+    request.method = "GET"
+    request.path = request.path_info = path
+    request.GET = QueryDict(urlencode(params))
+    request.META = {
+        "SERVER_NAME": public.hostname,
+        "SERVER_PORT": str(public.port or (443 if public.scheme == "https" else 80)),
+        "HTTP_HOST": public.netloc,
+        "QUERY_STRING": urlencode(params),
+        "HTTP_ACCEPT": "application/json",
+    }
+    if public.scheme == "https":
+        request.META["HTTPS"] = "on"
+        request.is_secure = lambda: True
+    return request
+
+
+def render_list(category, params=None):
+    """Bytes of GET /api/<list_path>?<params> for an anonymous client."""
+    params = params or {}
+    path = f"/api/{category.list_path}"
+    match = resolve(path)
+    response = match.func(_request(path, params), *match.args, **match.kwargs)
+    response.render()
+    if response.status_code != 200:
+        raise RuntimeError(f"{path} answered {response.status_code}")
+    return response.content
+
+
+def _write_atomic(path, data):
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=".tmp-")
+    try:
+        with os.fdopen(fd, "wb") as fh:
+            fh.write(data)
+        os.chmod(tmp, 0o644)
+        os.replace(tmp, path)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.unlink(tmp)
+        raise
+
+
+def _write_snapshot(stem, body):
+    name = f"{stem}.{hashlib.sha256(body).hexdigest()[:16]}.json"
+    path = _root() / name
+    if not path.exists():
+        # Variants first: a server must never see the .json without its .gz/.br.
+        _write_atomic(path.with_name(name + ".gz"), gzip.compress(body, compresslevel=9, mtime=0))
+        if brotli is not None:
+            _write_atomic(path.with_name(name + ".br"), brotli.compress(body, quality=11))
+        _write_atomic(path, body)
+    return name
+
+
+@contextmanager
+def _manifest_lock():
+    with open(_root() / ".manifest.lock", "w") as fh:
+        fcntl.flock(fh, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(fh, fcntl.LOCK_UN)
+
+
+def snapshot_path(name):
+    return _root() / name
+
+
+def read_manifest():
+    try:
+        return json.loads((_root() / MANIFEST).read_text())
+    except (FileNotFoundError, ValueError):
+        return {}
+
+
+def publish(keys=None):
+    """Render and write snapshots for the given categories (all by default); returns the manifest entries written."""
+    _root().mkdir(parents=True, exist_ok=True)
+    categories = [BY_KEY[k] for k in keys] if keys else CATEGORIES
+    written = {}
+    for category in categories:
+        written[category.key] = _write_snapshot(category.key, render_list(category))
+        field = category.filter_field
+        values = (
+            category.model.objects.exclude(**{field: ""}).order_by(field)
+            .values_list(field, flat=True).distinct()
+        )
+        for value in values:
+            stem = f"{category.key}.{slugify(value) or field}"
+            written[f"{category.key}?{field}={value}"] = _write_snapshot(stem, render_list(category, {field: value}))
+
+    with _manifest_lock():
+        manifest = read_manifest()
+        for category in categories:
+            # Drop filter entries that no longer exist before adding the fresh ones.
+            for entry in [e for e in manifest if e == category.key or e.startswith(f"{category.key}?")]:
+                del manifest[entry]
+        manifest.update(written)
+        _write_atomic(_root() / MANIFEST, json.dumps(manifest, sort_keys=True, indent=0).encode())
+    return written
+
+
+def publish_file(key, body):
+    """Write one more hashed snapshot (e.g. the autocomplete index) and point manifest entry `key` at it."""
+    _root().mkdir(parents=True, exist_ok=True)
+    name = _write_snapshot(key, body)
+    with _manifest_lock():
+        manifest = read_manifest()
+        manifest[key] = name
+        _write_atomic(_root() / MANIFEST, json.dumps(manifest, sort_keys=True, indent=0).encode())
+    return name
+
+
+def prune(max_age_seconds=None):
+    """Delete snapshot files no longer in the manifest, once clients can't still be holding the old one."""
+    max_age_seconds = settings.SNAPSHOT_RETENTION_SECONDS if max_age_seconds is None else max_age_seconds
+    root = _root()
+    if not root.is_dir():
+        return 0
+    with _manifest_lock():
+        live = set(read_manifest().values())
+        cutoff = time.time() - max_age_seconds
+        removed = 0
+        for path in root.glob("*.json*"):
+            base = path.name.removesuffix(".gz").removesuffix(".br")
+            if path.name == MANIFEST or base in live:
+                continue
+            if path.stat().st_mtime < cutoff:
+                path.unlink(missing_ok=True)
+                removed += 1
+    return removed
@@ -0,0 +1,191 @@
+# catalog/specs.py
+"""
+Typed spec attributes parsed out of freeform text.
+
+Most categories only describe RAM, storage, battery, camera and screen size in
+`specs_text` (LatestOffer has no specs_text, so its name is parsed instead).
+parse() runs a fixed set of precompiled patterns over the text; structured
+columns, where a category has them, win over parsed values. The result is kept
+in ExtractedSpecs, one row per catalog row with an index per attribute, so
+SpecFilterBackend turns ?ram_gb_min=4 into an index range lookup instead of a
+LIKE scan.
+
+Rows are extracted on save (catalog.signals); manage.py extract_specs
+backfills the whole catalog across worker processes.
+"""
+import re
+from decimal import Decimal, InvalidOperation
+
+from django.db import connection, transaction
+from rest_framework.exceptions import ValidationError
+from rest_framework.filters import BaseFilterBackend
+
+from .models import ExtractedSpecs
+from .registry import category_for_model
+
+ATTRIBUTES = ("ram_gb", "storage_gb", "battery_mah", "camera_mp", "display_inches")
+
+# Catalog fields parsed per category (default: name and specs_text).
+SOURCE_FIELDS = {"offers": ("name",)}
+DEFAULT_SOURCE_FIELDS = ("name", "specs_text")
+
+# attribute -> structured column, for categories that have one.
+STRUCTURED = {
+    "smartphones": {"ram_gb": "ram_gb", "storage_gb": "storage_gb", "battery_mah": "battery_mah",
+                    "camera_mp": "camera_mp", "display_inches": "display_inches"},
+    "tablets": {"ram_gb": "ram_gb", "storage_gb": "storage_gb", "display_inches": "display_inches"},
+    "reallaptops": {"ram_gb": "ram_gb", "storage_gb": "storage_gb", "display_inches": "display_inches"},
+    "storages": {"storage_gb": "capacity_gb"},
+    "televisions": {"display_inches": "screen_size_inches"},
+}
+
+_NUM = r"(\d+(?:[.,]\d+)?)"
+_RAM = [
+    re.compile(rf"{_NUM}\s*(GB|MB)\s*(?:of\s+)?(?:LP)?(?:DDR\w*\s+)?RAM\b", re.I),  # 8GB RAM, 16GB DDR4 RAM
+    re.compile(rf"\bRAM\s*[:=-]?\s*{_NUM}\s*(GB|MB)\b", re.I),  # RAM: 8GB
+]
+_STORAGE = [
+    re.compile(rf"{_NUM}\s*(TB|GB|MB)\s*(?:of\s+)?(?:internal\s+)?(?:storage|ROM|memory|SSD|HDD|eMMC|UFS)\b", re.I),
+    re.compile(rf"\b(?:storage|ROM|SSD|HDD)\s*[:=-]?\s*{_NUM}\s*(TB|GB|MB)\b", re.I),
+]
+_RAM_STORAGE = re.compile(rf"\b{_NUM}\s*(?:GB)?\s*[/+]\s*{_NUM}\s*(TB|GB)\b", re.I)  # 8/256GB, 8GB+128GB
+_BARE_SIZE = re.compile(rf"{_NUM}\s*(TB|GB)\b", re.I)  # 128GB on its own: storage if nothing else says so
+_BATTERY = re.compile(r"(\d{1,2}[,\s]\d{3}|\d{3,5})\s*mAh\b", re.I)
+_CAMERA = re.compile(rf"{_NUM}\s*MP\b", re.I)
+_DISPLAY = re.compile(rf"{_NUM}\s*(?:\"|''|”|-?\s*inch(?:es)?\b)", re.I)
+
+_GB_PER_UNIT = {"mb": Decimal(1) / 1024, "gb": Decimal(1), "tb": Decimal(1000)}
+_MIN_BARE_STORAGE_GB = 16  # smaller bare sizes are as likely to be RAM
+# Anything above these is a typo or a misread, and wouldn't fit the columns anyway.
+_MAX = {"ram_gb": 4096, "storage_gb": 1000000, "battery_mah": 1000000, "camera_mp": 9999, "display_inches": 120}
+
+
+def _number(text):
+    return Decimal(text.replace(",", "."))
+
+
+def _gb(value, unit):
+    return (_number(value) * _GB_PER_UNIT[unit.lower()]).quantize(Decimal("0.001"))
+
+
+def _overlaps(match, spans):
+    return any(match.start() < end and start < match.end() for start, end in spans)
+
+
+def parse(text):
+    """{attribute: value} for whatever the text states; missing attributes are left out."""
+    found = {}
+    taken = []  # spans already read as RAM or storage
+
+    for pattern in _RAM:
+        m = pattern.search(text)
+        if m:
+            found["ram_gb"] = _gb(*m.groups())
+            taken.append(m.span())
+            break
+    for pattern in _STORAGE:
+        m = next((m for m in pattern.finditer(text) if not _overlaps(m, taken)), None)
+        if m:
+            found["storage_gb"] = _gb(*m.groups())
+            taken.append(m.span())
+            break
+    m = _RAM_STORAGE.search(text)
+    if m:
+        ram, storage = _gb(m.group(1), "gb"), _gb(m.group(2), m.group(3))
+        if ram < storage:
+            found.setdefault("ram_gb", ram)
+            found.setdefault("storage_gb", storage)
+            taken.append(m.span())
+    if "storage_gb" not in found:
+        sizes = [
+            _gb(*m.groups()) for m in _BARE_SIZE.finditer(text)
+            if not _overlaps(m, taken)
+        ]
+        sizes = [s for s in sizes if s >= _MIN_BARE_STORAGE_GB]
+        if sizes:
+            found["storage_gb"] = max(sizes)
+
+    m = _BATTERY.search(text)
+    if m:
+        found["battery_mah"] = int(re.sub(r"[,\s]", "", m.group(1)))
+    cameras = [_number(v) for v in _CAMERA.findall(text)]
+    if cameras:
+        found["camera_mp"] = max(cameras).quantize(Decimal("0.1"))  # the main camera
+    for m in _DISPLAY.finditer(text):
+        inches = _number(m.group(1))
+        if 1 <= inches <= 120:
+            found["display_inches"] = inches.quantize(Decimal("0.1"))
+            break
+    return {attr: value for attr, value in found.items() if 0 < value <= _MAX[attr]}
+
+
+def fields_for(key):
+    """Catalog columns extract() reads for this category."""
+    return tuple(SOURCE_FIELDS.get(key, DEFAULT_SOURCE_FIELDS)) + tuple(STRUCTURED.get(key, {}).values())
+
+
+def extract(key, row):
+    """
+    Typed attributes of one catalog row; `row` maps fields_for(key) to values.
+    Returns a dict with every attribute (None where unknown).
+    """
+    text = " ".join(str(row[f]) for f in SOURCE_FIELDS.get(key, DEFAULT_SOURCE_FIELDS) if row.get(f))
+    values = dict.fromkeys(ATTRIBUTES)
+    values.update(parse(text))
+    for attr, field in STRUCTURED.get(key, {}).items():
+        if row.get(field) is not None:
+            values[attr] = row[field]
+    return values
+
+
+def extract_batch(key, rows):
+    """[(pk, attributes)] for rows of (pk, {field: value}); picklable, run in worker processes."""
+    return [(pk, extract(key, row)) for pk, row in rows]
+
+
+def save(key, results):
+    """Upsert ExtractedSpecs rows for [(object_id, attributes)] from extract_batch()."""
+    objs = [ExtractedSpecs(category=key, object_id=pk, **values) for pk, values in results]
+    # MySQL's ON DUPLICATE KEY UPDATE can't name a conflict target (and needn't: the
+    # (category, object_id) constraint is the only unique key besides the PK).
+    target = ["category", "object_id"] if connection.features.supports_update_conflicts_with_target else None
+    with transaction.atomic():
+        ExtractedSpecs.objects.bulk_create(
+            objs, batch_size=1000, update_conflicts=True,
+            unique_fields=target, update_fields=list(ATTRIBUTES) + ["updated_at"],
+        )
+
+
+def extract_instance(instance):
+    key = instance._meta.app_label
+    save(key, [(instance.pk, extract(key, {f: getattr(instance, f) for f in fields_for(key)}))])
+
+
+class SpecFilterBackend(BaseFilterBackend):
+    """
+    Filters a category list on the extracted attributes:
+    ?<attribute>=<n>, ?<attribute>_min=<n>, ?<attribute>_max=<n> for
+    ram_gb, storage_gb, battery_mah, camera_mp, display_inches.
+    Rows that haven't been extracted yet don't match any spec filter.
+    """
+    LOOKUPS = {"": "exact", "_min": "gte", "_max": "lte"}
+
+    def filter_queryset(self, request, queryset, view):
+        conditions = {}
+        for attr in ATTRIBUTES:
+            for suffix, lookup in self.LOOKUPS.items():
+                raw = request.query_params.get(attr + suffix)
+                if raw in (None, ""):
+                    continue
+                try:
+                    value = Decimal(raw)
+                except InvalidOperation:
+                    value = None
+                if value is None or not value.is_finite():
+                    raise ValidationError({attr + suffix: "Must be a number."})
+                conditions[f"{attr}__{lookup}"] = value
+        category = category_for_model(queryset.model)
+        if not conditions or category is None:
+            return queryset
+        matching = ExtractedSpecs.objects.filter(category=category.key, **conditions).values("object_id")
+        return queryset.filter(pk__in=matching)
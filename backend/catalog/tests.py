@@ -0,0 +1,221 @@
+import gzip
+import hashlib
+import json
+import os
+import tempfile
+import time
+from collections import defaultdict
+from datetime import timedelta
+from decimal import Decimal
+from pathlib import Path
+from unittest import mock, skipIf
+
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from audio.models import AudioDevice
+from storages.models import StorageDevice
+
+from . import similarity, snapshots
+from .autocomplete import PrefixIndex
+from .feed import record_change, settled
+from .models import CatalogChange, ExtractedSpecs, SimilarItem
+from .registry import BY_KEY
+from .specs import ATTRIBUTES, parse, save
+
+
+class SpecsSaveTests(TestCase):
+    def test_saving_the_same_row_twice_updates_it(self):
+        values = dict.fromkeys(ATTRIBUTES)
+        save("audio", [(7, {**values, "ram_gb": Decimal("4"), "battery_mah": 5000})])
+        save("audio", [(7, {**values, "ram_gb": Decimal("8")})])
+
+        row = ExtractedSpecs.objects.get(category="audio", object_id=7)
+        self.assertEqual(ExtractedSpecs.objects.count(), 1)
+        self.assertEqual(row.ram_gb, Decimal("8"))
+        self.assertIsNone(row.battery_mah)
+
+    def test_same_object_id_in_another_category_is_a_separate_row(self):
+        values = dict.fromkeys(ATTRIBUTES)
+        save("audio", [(7, values)])
+        save("tablets", [(7, values)])
+        self.assertEqual(ExtractedSpecs.objects.filter(object_id=7).count(), 2)
+
+
+class SpecsParseTests(TestCase):
+    def test_common_forms(self):
+        self.assertEqual(parse("8GB/256GB"), {"ram_gb": Decimal("8.000"), "storage_gb": Decimal("256.000")})
+        self.assertEqual(parse("RAM: 512MB ROM: 4GB")["storage_gb"], Decimal("4.000"))
+        self.assertEqual(parse("5,000mAh 50MP+2MP")["camera_mp"], Decimal("50.0"))
+        self.assertEqual(parse('6.7" display')["display_inches"], Decimal("6.7"))
+        self.assertEqual(parse("6 in 1 USB hub"), {})
+
+
+@override_settings(CATALOG_FEED_SETTLE_SECONDS=2)
+class FeedSettleTests(TestCase):
+    def test_fresh_entries_are_held_back(self):
+        record_change("audio", 1, CatalogChange.OP_UPSERT)
+        record_change("audio", 2, CatalogChange.OP_UPSERT)
+        self.assertFalse(settled().exists())
+
+        CatalogChange.objects.filter(object_id=1).update(created_at=timezone.now() - timedelta(seconds=3))
+        self.assertEqual(list(settled().values_list("object_id", flat=True)), [1])
+
+
+class CatalogSignalTests(TestCase):
+    def test_failing_feed_update_does_not_fail_the_save(self):
+        with mock.patch("catalog.signals.record_change", side_effect=RuntimeError("boom")):
+            # captureOnCommitCallbacks logs robust failures as "django.test".
+            with self.assertLogs("django.test", "ERROR"):
+                with self.captureOnCommitCallbacks(execute=True):
+                    device = AudioDevice.objects.create(
+                        name="Buds", brand="JBL", category="Buds", price_min_ksh=1000,
+                        specs_text="5000mAh", image="audio/buds.jpg",
+                    )
+        # The spec extraction registered after the failing callback still ran.
+        self.assertEqual(ExtractedSpecs.objects.get(category="audio", object_id=device.pk).battery_mah, 5000)
+
+
+class SnapshotTests(TestCase):
+    def setUp(self):
+        root = tempfile.TemporaryDirectory()
+        self.addCleanup(root.cleanup)
+        self.root = Path(root.name)
+        self.enterContext(override_settings(SNAPSHOT_ROOT=root.name))
+        for name, brand in (("Ultra 64GB", "SanDisk"), ("Elements 1TB", "WD")):
+            StorageDevice.objects.create(name=name, brand=brand, price_min_ksh=1000, image="storages/x.jpg")
+
+    def test_publish_writes_hashed_files_and_manifest(self):
+        written = snapshots.publish(["storages"])
+
+        self.assertEqual(set(written), {"storages", "storages?brand=SanDisk", "storages?brand=WD"})
+        self.assertEqual(snapshots.read_manifest(), written)
+        for name in written.values():
+            body = (self.root / name).read_bytes()
+            self.assertTrue(name.endswith(f".{hashlib.sha256(body).hexdigest()[:16]}.json"))
+            self.assertEqual(gzip.decompress((self.root / f"{name}.gz").read_bytes()), body)
+        names = [row["name"] for row in json.loads((self.root / written["storages?brand=WD"]).read_bytes())]
+        self.assertEqual(names, ["Elements 1TB"])
+
+    def test_unchanged_content_keeps_its_name(self):
+        first = snapshots.publish(["storages"])
+        self.assertEqual(snapshots.publish(["storages"]), first)
+        StorageDevice.objects.filter(brand="WD").update(price_min_ksh=2000)
+        second = snapshots.publish(["storages"])
+        self.assertEqual(second["storages?brand=SanDisk"], first["storages?brand=SanDisk"])
+        self.assertNotEqual(second["storages?brand=WD"], first["storages?brand=WD"])
+
+    def test_prune_keeps_live_files(self):
+        first = snapshots.publish(["storages"])
+        StorageDevice.objects.filter(brand="WD").delete()
+        live = snapshots.publish(["storages"])
+        old = time.time() - 7200
+        for path in self.root.glob("*.json*"):
+            os.utime(path, (old, old))
+
+        removed = snapshots.prune(max_age_seconds=3600)
+
+        stale = {first["storages"], first["storages?brand=WD"]}
+        self.assertEqual(removed, len(stale) * (3 if snapshots.brotli else 2))  # .json, .gz (, .br)
+        remaining = {p.name for p in self.root.glob("*.json*")}
+        for name in live.values():
+            self.assertIn(name, remaining)
+            self.assertIn(f"{name}.gz", remaining)
+        for name in stale:
+            self.assertNotIn(name, remaining)
+        self.assertIn(snapshots.MANIFEST, remaining)
+
+
+@skipIf(similarity.np is None, "numpy is not installed")
+class SimilarityRefreshTests(TestCase):
+    # Only capacity varies, so neighbour order doesn't depend on the column statistics,
+    # which refresh() leaves as they were for the rows it doesn't recompute.
+    CAPACITIES = [11, 23, 61, 137, 290, 733, 1499, 3301, 6997, 15013, 40009, 90001]
+
+    def setUp(self):
+        self.category = BY_KEY["storages"]
+        self.ids = [
+            StorageDevice.objects.create(
+                name=f"Drive {gb}", brand="WD", price_min_ksh=5000, capacity_gb=gb, image="storages/x.jpg",
+            ).pk
+            for gb in self.CAPACITIES
+        ]
+        similarity.rebuild(self.category, k=3)
+
+    def lists(self):
+        lists = defaultdict(list)
+        rows = SimilarItem.objects.filter(category="storages").order_by("object_id", "rank")
+        for object_id, neighbor_id in rows.values_list("object_id", "neighbor_id"):
+            lists[object_id].append(neighbor_id)
+        return dict(lists)
+
+    def assert_refresh_matches_rebuild(self, changed):
+        similarity.refresh(self.category, changed, k=3)
+        refreshed = self.lists()
+        similarity.rebuild(self.category, k=3)
+        self.assertEqual(refreshed, self.lists())
+
+    def test_changed_row(self):
+        StorageDevice.objects.filter(pk=self.ids[2]).update(capacity_gb=20000)
+        self.assert_refresh_matches_rebuild([self.ids[2]])
+
+    def test_deleted_row(self):
+        StorageDevice.objects.filter(pk=self.ids[5]).delete()
+        self.assert_refresh_matches_rebuild([self.ids[5]])
+        self.assertNotIn(self.ids[5], {n for neighbours in self.lists().values() for n in neighbours})
+
+
+class PrefixIndexTests(TestCase):
+    ROWS = [
+        ["smartphones", 1, "Galaxy A15", "Samsung", "samsung-galaxy-a15"],
+        ["smartphones", 2, "Galaxy A15 5G Ultra Edition", "Samsung", "samsung-galaxy-a15-5g"],
+        ["tablets", 1, "Tab A9", "Samsung", "samsung-tab-a9"],
+        ["audio", 3, "Buds for Galaxy", "JBL", "jbl-buds"],
+    ]
+
+    def names(self, index, query, limit=8):
+        return [hit["name"] for hit in index.search(query, limit)]
+
+    def test_ranking(self):
+        index = PrefixIndex(self.ROWS)
+        # Names starting with the query first, shortest first; word-suffix matches after.
+        self.assertEqual(self.names(index, "galaxy"), ["Galaxy A15", "Galaxy A15 5G Ultra Edition", "Buds for Galaxy"])
+        self.assertEqual(self.names(index, "Samsung Tab"), ["Tab A9"])
+        self.assertEqual(self.names(index, "a15"), ["Galaxy A15", "Galaxy A15 5G Ultra Edition"])
+        self.assertEqual(self.names(index, "GALAXY", limit=1), ["Galaxy A15"])
+        self.assertEqual(index.search("  "), [])
+        self.assertEqual(index.search("galaxy")[0], {
+            "category": "smartphones", "id": 1, "name": "Galaxy A15", "brand": "Samsung", "slug": "samsung-galaxy-a15",
+        })
+
+    def test_upsert_and_remove(self):
+        index = PrefixIndex(self.ROWS)
+        index.upsert("smartphones", 1, "Redmi Note 13", "Xiaomi", "xiaomi-redmi-note-13")
+        self.assertEqual(self.names(index, "a15"), ["Galaxy A15 5G Ultra Edition"])
+        self.assertEqual(self.names(index, "xiaomi"), ["Redmi Note 13"])
+        self.assertEqual(len(index), 4)
+
+        index.remove("smartphones", 1)
+        index.remove("smartphones", 99)  # unknown rows are ignored
+        self.assertEqual(self.names(index, "redmi"), [])
+        self.assertEqual(len(index), 3)
+
+    @override_settings(CATALOG_FEED_SETTLE_SECONDS=2)
+    def test_sync_applies_settled_feed_entries(self):
+        index = PrefixIndex(seq=0)
+        kept = StorageDevice.objects.create(name="Ultra Fit", brand="SanDisk", price_min_ksh=900, image="storages/x.jpg")
+        gone = StorageDevice.objects.create(name="Ultra Dual", brand="SanDisk", price_min_ksh=900, image="storages/x.jpg")
+        gone_pk = gone.pk
+        index.upsert("storages", gone_pk, gone.name, gone.brand, gone.slug)
+        gone.delete()
+        record_change("storages", kept.pk, CatalogChange.OP_UPSERT)
+        record_change("storages", gone_pk, CatalogChange.OP_DELETE)
+
+        index.sync()  # both entries are still settling
+        self.assertEqual(self.names(index, "ultra"), ["Ultra Dual"])
+        self.assertEqual(index.seq, 0)
+
+        CatalogChange.objects.update(created_at=timezone.now() - timedelta(seconds=3))
+        index.sync()
+        self.assertEqual(self.names(index, "ultra"), ["Ultra Fit"])
+        self.assertEqual(index.seq, CatalogChange.objects.latest("seq").seq)
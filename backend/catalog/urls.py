@@ -0,0 +1,9 @@
+from django.urls import path
+
+from .views import AutocompleteView, CatalogChangesView, SimilarProductsView
+
+urlpatterns = [
+    path("catalog/changes/", CatalogChangesView.as_view(), name="catalog-changes"),
+    path("catalog/autocomplete/", AutocompleteView.as_view(), name="catalog-autocomplete"),
+    path("catalog/<str:category>/<int:pk>/similar/", SimilarProductsView.as_view(), name="catalog-similar"),
+]
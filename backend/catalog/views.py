@@ -0,0 +1,94 @@
+# catalog/views.py
+from django.conf import settings
+from rest_framework import status
+from rest_framework.permissions import AllowAny
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from .autocomplete import MAX_LIMIT as SUGGEST_MAX_LIMIT, suggest
+from .feed import changes_since
+from .registry import BY_KEY
+from .similarity import FEATURES, similar_ids
+
+MAX_LIMIT = 1000
+
+
+class CatalogChangesView(APIView):
+    """
+    GET /api/catalog/changes/?since=<seq>
+    Optional query params:
+      - limit=<n>            (default 500, max 1000)
+      - category=smartphones,tablets,...   (app labels, see catalog.registry)
+    Start with since=0 for a full copy, then keep passing back `next`;
+    fetch again right away while `has_more` is true.
+    """
+    authentication_classes = []
+    permission_classes = [AllowAny]
+
+    def get(self, request, *args, **kwargs):
+        try:
+            since = max(0, int(request.query_params.get("since", 0)))
+            limit = min(MAX_LIMIT, max(1, int(request.query_params.get("limit", 500))))
+        except ValueError:
+            return Response({"detail": "since and limit must be integers."}, status=status.HTTP_400_BAD_REQUEST)
+
+        categories = [c for c in request.query_params.get("category", "").split(",") if c]
+        unknown = [c for c in categories if c not in BY_KEY]
+        if unknown:
+            return Response({"detail": f"Unknown category: {', '.join(unknown)}."},
+                            status=status.HTTP_400_BAD_REQUEST)
+
+        response = Response(changes_since(since, limit, categories, request))
+        # Same URL, same answer for everyone for a few seconds: let edge caches absorb the polling.
+        response["Cache-Control"] = "public, max-age=5"
+        return response
+
+
+class SimilarProductsView(APIView):
+    """
+    GET /api/catalog/<category>/<id>/similar/?limit=<n>
+    Rows of the same category closest in price and specs, closest first, serialized
+    like the category list. Served from the SimilarItem table that
+    manage.py refresh_similar_products keeps up to date; empty until it has run.
+    """
+    authentication_classes = []
+    permission_classes = [AllowAny]
+
+    def get(self, request, category, pk, *args, **kwargs):
+        if category not in FEATURES:
+            return Response({"detail": f"No similar products for {category}."}, status=status.HTTP_404_NOT_FOUND)
+        try:
+            limit = min(settings.SIMILAR_PRODUCTS_K, max(1, int(request.query_params.get("limit", 8))))
+        except ValueError:
+            return Response({"detail": "limit must be an integer."}, status=status.HTTP_400_BAD_REQUEST)
+
+        ids = similar_ids(category, pk, limit)
+        model = BY_KEY[category].model
+        objs = model.objects.select_related("product").in_bulk(ids)
+        rows = [objs[i] for i in ids if i in objs]
+        data = BY_KEY[category].serializer_class(rows, many=True, context={"request": request}).data
+
+        response = Response(data)
+        response["Cache-Control"] = "public, max-age=60"
+        return response
+
+
+class AutocompleteView(APIView):
+    """
+    GET /api/catalog/autocomplete/?q=<prefix>&limit=<n>   (default 8, max 20)
+    Rows across all categories whose name, brand + name or slug has a word
+    starting with the query. Answered from the in-process index in
+    catalog.autocomplete, without database queries.
+    """
+    authentication_classes = []
+    permission_classes = [AllowAny]
+
+    def get(self, request, *args, **kwargs):
+        q = request.query_params.get("q", "")[:100]
+        try:
+            limit = min(SUGGEST_MAX_LIMIT, max(1, int(request.query_params.get("limit", 8))))
+        except ValueError:
+            return Response({"detail": "limit must be an integer."}, status=status.HTTP_400_BAD_REQUEST)
+        response = Response({"query": q, "results": suggest(q, limit)})
+        response["Cache-Control"] = "public, max-age=30"
+        return response
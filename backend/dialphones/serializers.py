@@ -1,8 +1,9 @@
 # dialphones/serializers.py
 from rest_framework import serializers
+from backend.metrics import TimedModelSerializer
 from .models import DialPhoneDeal
 
-class DialPhoneDealSerializer(serializers.ModelSerializer):
+class DialPhoneDealSerializer(TimedModelSerializer):
     price_display = serializers.SerializerMethodField()
     image = serializers.SerializerMethodField()
     product_id = serializers.IntegerField(source="product.id", read_only=True)
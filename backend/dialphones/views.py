@@ -1,5 +1,6 @@
 # dialphones/views.py
 from rest_framework import generics, filters
+from catalog.specs import SpecFilterBackend
 from .models import DialPhoneDeal
 from .serializers import DialPhoneDealSerializer
 
@@ -11,10 +12,11 @@ class DialPhoneDealListView(generics.ListAPIView):
       - badge=<badge>
       - search=<text>
       - ordering=created_at|price_min_ksh|price_max_ksh|name (prefix with '-' for desc)
+      - ram_gb, storage_gb, battery_mah, camera_mp, display_inches (=, _min=, _max=; see catalog.specs)
     """
     serializer_class = DialPhoneDealSerializer
     queryset = DialPhoneDeal.objects.all()
-    filter_backends = [filters.SearchFilter, filters.OrderingFilter]
+    filter_backends = [filters.SearchFilter, filters.OrderingFilter, SpecFilterBackend]
     search_fields = ["name", "specs_text", "brand", "badge"]
     ordering_fields = ["created_at", "price_min_ksh", "price_max_ksh", "name"]
     ordering = ["brand", "name"]
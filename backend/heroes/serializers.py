@@ -1,8 +1,9 @@
 # heroes/serializers.py
 from rest_framework import serializers
+from backend.metrics import TimedModelSerializer
 from .models import Hero
 
-class HeroSerializer(serializers.ModelSerializer):
+class HeroSerializer(TimedModelSerializer):
     image = serializers.ImageField(use_url=True)
 
     class Meta:
@@ -0,0 +1,23 @@
+# mailer/admin.py
+from django.contrib import admin
+from django.utils import timezone
+
+from backend.admin_tools import LargeTableAdmin
+
+from .models import OutboundEmail
+
+
+@admin.register(OutboundEmail)
+class OutboundEmailAdmin(LargeTableAdmin):
+    list_display = ("id", "subject", "tag", "status", "attempts", "next_attempt_at", "sent_at", "created_at")
+    list_filter = ("status",)
+    search_fields = ("=tag", "subject")
+    readonly_fields = ("attempts", "last_error", "sent_at", "created_at")
+    actions = ["retry_now"]
+
+    @admin.action(description="Retry selected now")
+    def retry_now(self, request, queryset):
+        n = queryset.exclude(status=OutboundEmail.STATUS_SENT).update(
+            status=OutboundEmail.STATUS_QUEUED, next_attempt_at=timezone.now()
+        )
+        self.message_user(request, f"{n} message(s) re-queued.")
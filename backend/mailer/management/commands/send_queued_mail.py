@@ -0,0 +1,81 @@
+# mailer/management/commands/send_queued_mail.py
+import logging
+import time
+
+from django.core.mail import get_connection
+from django.core.management.base import BaseCommand, CommandError
+from django.db import close_old_connections
+
+from mailer.sender import has_due_mail, send_batch
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    help = (
+        "Deliver spooled emails over one reused SMTP connection. "
+        "Use --loop to run as a worker. For local testing point EMAIL_HOST/EMAIL_PORT "
+        "at an SMTP sink, e.g. `python -m aiosmtpd -n -l localhost:1025` with EMAIL_USE_TLS=False."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--loop", action="store_true", help="Keep running and poll for new mail.")
+        parser.add_argument("--batch-size", type=int, default=50)
+        parser.add_argument("--poll-interval", type=float, default=2.0,
+                            help="Seconds to sleep when the queue is empty (with --loop).")
+        parser.add_argument("--idle-close", type=float, default=60.0,
+                            help="Close the SMTP connection after this many idle seconds (with --loop).")
+
+    def handle(self, *args, **opts):
+        connection = None
+        idle_since = None
+        total = 0
+        try:
+            while True:
+                close_old_connections()
+                # Don't open SMTP/TLS just to find an empty queue.
+                if connection is None and not has_due_mail():
+                    if not opts["loop"]:
+                        break
+                    time.sleep(opts["poll_interval"])
+                    continue
+                try:
+                    if connection is None:
+                        connection = get_connection(fail_silently=False)
+                        connection.open()
+                    handled = send_batch(connection, opts["batch_size"])
+                except Exception as e:
+                    self._close(connection)
+                    connection = None
+                    if not opts["loop"]:
+                        raise CommandError(f"SMTP connection error: {e}")
+                    logger.exception("SMTP connection error; reconnecting.")
+                    time.sleep(opts["poll_interval"])
+                    continue
+                total += handled
+
+                if handled:
+                    idle_since = None
+                    continue
+                if not opts["loop"]:
+                    break
+
+                idle_since = idle_since or time.monotonic()
+                if connection is not None and time.monotonic() - idle_since > opts["idle_close"]:
+                    self._close(connection)
+                    connection = None
+                time.sleep(opts["poll_interval"])
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self._close(connection)
+        self.stdout.write(f"Handled {total} message(s).")
+
+    @staticmethod
+    def _close(connection):
+        if connection is None:
+            return
+        try:
+            connection.close()
+        except Exception:
+            logger.debug("Ignoring error while closing SMTP connection", exc_info=True)
@@ -0,0 +1,59 @@
+# mailer/queue.py
+import logging
+
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.core.mail import EmailMultiAlternatives
+from django.utils import timezone
+
+from .models import OutboundEmail
+from .signals import email_sent
+
+logger = logging.getLogger(__name__)
+
+
+def build_message(email: OutboundEmail, connection=None) -> EmailMultiAlternatives:
+    """Turn a spooled row into an EmailMessage, reading attachments from storage."""
+    msg = EmailMultiAlternatives(
+        subject=email.subject,
+        body=email.body,
+        from_email=email.from_email or None,
+        to=list(email.to),
+        connection=connection,
+    )
+    if email.html_body:
+        msg.attach_alternative(email.html_body, "text/html")
+    for att in email.attachments or []:
+        with default_storage.open(att["path"], "rb") as f:
+            msg.attach(att.get("filename") or att["path"].split("/")[-1], f.read(), att.get("mimetype"))
+    return msg
+
+
+def enqueue_mail(subject, body, to, *, html_body="", from_email=None, attachments=None, tag=""):
+    """
+    Spool a message for the sender worker and return the OutboundEmail row.
+
+    With MAIL_QUEUE_ENABLED=False the message is sent inline instead (the old
+    behaviour), which is handy for local runs without a worker.
+    """
+    email = OutboundEmail(
+        subject=subject[:255],
+        body=body,
+        html_body=html_body or "",
+        from_email=from_email or settings.DEFAULT_FROM_EMAIL or settings.EMAIL_HOST_USER,
+        to=list(to),
+        attachments=attachments or [],
+        tag=tag,
+    )
+    if not getattr(settings, "MAIL_QUEUE_ENABLED", True):
+        build_message(email).send(fail_silently=False)
+        email.status = OutboundEmail.STATUS_SENT
+        email.sent_at = timezone.now()
+        email.attempts = 1
+        email.save()
+        email_sent.send(sender=OutboundEmail, email=email, tag=email.tag)
+        return email
+
+    email.save()
+    logger.info("Queued email %s (%s) to %s", email.pk, tag or "-", ", ".join(email.to))
+    return email
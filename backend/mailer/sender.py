@@ -0,0 +1,106 @@
+# mailer/sender.py
+import logging
+import smtplib
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from .models import OutboundEmail
+from .queue import build_message
+from .signals import email_sent
+
+logger = logging.getLogger(__name__)
+
+
+def _backoff(attempts: int) -> timedelta:
+    base = getattr(settings, "MAIL_RETRY_BASE_SECONDS", 30)
+    cap = getattr(settings, "MAIL_RETRY_MAX_SECONDS", 3600)
+    return timedelta(seconds=min(cap, base * (2 ** max(0, attempts - 1))))
+
+
+def has_due_mail() -> bool:
+    return OutboundEmail.objects.filter(
+        status=OutboundEmail.STATUS_QUEUED, next_attempt_at__lte=timezone.now()
+    ).exists()
+
+
+def claim_batch(batch_size: int):
+    """
+    Mark up to `batch_size` due messages as SENDING and return them.
+    SKIP LOCKED lets several workers run without handing out the same row.
+    Rows stuck in SENDING (worker crashed mid-batch) are picked up again
+    after MAIL_SENDING_TIMEOUT seconds.
+    """
+    now = timezone.now()
+    stale = now - timedelta(seconds=getattr(settings, "MAIL_SENDING_TIMEOUT", 600))
+    with transaction.atomic():
+        due = (
+            OutboundEmail.objects
+            .select_for_update(skip_locked=True)
+            .filter(status=OutboundEmail.STATUS_QUEUED, next_attempt_at__lte=now)
+            .order_by("next_attempt_at", "id")[:batch_size]
+        )
+        ids = list(due.values_list("id", flat=True))
+        if len(ids) < batch_size:
+            ids += list(
+                OutboundEmail.objects
+                .select_for_update(skip_locked=True)
+                .filter(status=OutboundEmail.STATUS_SENDING, next_attempt_at__lte=stale)
+                .values_list("id", flat=True)[:batch_size - len(ids)]
+            )
+        if not ids:
+            return []
+        # next_attempt_at doubles as "claimed at" while SENDING.
+        OutboundEmail.objects.filter(id__in=ids).update(status=OutboundEmail.STATUS_SENDING, next_attempt_at=now)
+    return list(OutboundEmail.objects.filter(id__in=ids).order_by("id"))
+
+
+def send_batch(connection, batch_size: int) -> int:
+    """
+    Deliver one batch over an already-open connection. Returns the number of
+    messages handled (sent or rescheduled). Connection-level errors are
+    re-raised after the batch is rescheduled, so the caller can reconnect.
+    """
+    batch = claim_batch(batch_size)
+    max_attempts = getattr(settings, "MAIL_MAX_ATTEMPTS", 6)
+
+    for i, email in enumerate(batch):
+        try:
+            build_message(email, connection=connection).send(fail_silently=False)
+        except Exception as e:
+            email.attempts += 1
+            email.last_error = f"{type(e).__name__}: {e}"[:2000]
+            if email.attempts >= max_attempts:
+                email.status = OutboundEmail.STATUS_FAILED
+                logger.error("Email %s failed permanently after %s attempts: %s", email.pk, email.attempts, e)
+            else:
+                email.status = OutboundEmail.STATUS_QUEUED
+                email.next_attempt_at = timezone.now() + _backoff(email.attempts)
+                logger.warning("Email %s failed (attempt %s), retrying at %s: %s",
+                               email.pk, email.attempts, email.next_attempt_at, e)
+            email.save(update_fields=["attempts", "last_error", "status", "next_attempt_at"])
+
+            if _is_connection_error(e):
+                # The rest of the batch goes back to the queue untouched.
+                rest = [m.pk for m in batch[i + 1:]]
+                OutboundEmail.objects.filter(id__in=rest).update(status=OutboundEmail.STATUS_QUEUED)
+                raise
+            continue
+
+        email.attempts += 1
+        email.status = OutboundEmail.STATUS_SENT
+        email.sent_at = timezone.now()
+        email.last_error = ""
+        email.save(update_fields=["attempts", "status", "sent_at", "last_error"])
+        try:
+            email_sent.send(sender=OutboundEmail, email=email, tag=email.tag)
+        except Exception:
+            logger.exception("email_sent receiver failed for email %s", email.pk)
+
+    return len(batch)
+
+
+def _is_connection_error(exc) -> bool:
+    return isinstance(exc, (smtplib.SMTPServerDisconnected, smtplib.SMTPConnectError, ConnectionError, TimeoutError))
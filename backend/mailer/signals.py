@@ -0,0 +1,6 @@
+# mailer/signals.py
+from django.dispatch import Signal
+
+# Sent by the sender worker after a message is delivered.
+# Receivers get `email` (OutboundEmail) and `tag`.
+email_sent = Signal()
@@ -0,0 +1,127 @@
+import smtplib
+from datetime import timedelta
+from unittest import mock
+
+from django.core import mail
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from .models import OutboundEmail
+from .queue import enqueue_mail
+from .sender import send_batch
+from .signals import email_sent
+
+
+class SignalRecorder:
+    def __init__(self, testcase):
+        self.tags = []
+        email_sent.connect(self, dispatch_uid="mailer-tests")
+        testcase.addCleanup(email_sent.disconnect, dispatch_uid="mailer-tests")
+
+    def __call__(self, sender, email, tag, **kwargs):
+        self.tags.append(tag)
+
+
+class FailingConnection:
+    """Email backend stand-in whose every send raises `exc`."""
+
+    def __init__(self, exc):
+        self.exc = exc
+
+    def send_messages(self, messages):
+        raise self.exc
+
+
+class EnqueueTests(TestCase):
+    def test_queued_by_default(self):
+        email = enqueue_mail("Hello", "Body", ["jane@example.com"], tag="test:1")
+        self.assertEqual(email.status, OutboundEmail.STATUS_QUEUED)
+        self.assertEqual(mail.outbox, [])
+
+    @override_settings(MAIL_QUEUE_ENABLED=False)
+    def test_inline_send_when_the_queue_is_off(self):
+        sent = SignalRecorder(self)
+        email = enqueue_mail("Hello", "Body", ["jane@example.com"], tag="test:1")
+        self.assertEqual(email.status, OutboundEmail.STATUS_SENT)
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertEqual(sent.tags, ["test:1"])
+
+
+class SendBatchTests(TestCase):
+    def setUp(self):
+        self.connection = mail.get_connection()  # locmem in tests
+
+    def test_delivers_queued_mail_with_attachments(self):
+        path = default_storage.save("mailer-tests/receipt.pdf", ContentFile(b"%PDF-1.4"))
+        self.addCleanup(default_storage.delete, path)
+        enqueue_mail("Receipt", "Body", ["jane@example.com"], tag="receipt:0",
+                     attachments=[{"path": path, "filename": "receipt.pdf", "mimetype": "application/pdf"}])
+        sent = SignalRecorder(self)
+
+        self.assertEqual(send_batch(self.connection, 10), 1)
+        email = OutboundEmail.objects.get()
+        self.assertEqual((email.status, email.attempts), (OutboundEmail.STATUS_SENT, 1))
+        self.assertEqual(mail.outbox[0].attachments, [("receipt.pdf", b"%PDF-1.4", "application/pdf")])
+        self.assertEqual(sent.tags, ["receipt:0"])
+        self.assertEqual(send_batch(self.connection, 10), 0)
+
+    def test_not_due_yet_is_left_alone(self):
+        email = enqueue_mail("Hello", "Body", ["jane@example.com"])
+        OutboundEmail.objects.filter(pk=email.pk).update(next_attempt_at=timezone.now() + timedelta(minutes=5))
+        self.assertEqual(send_batch(self.connection, 10), 0)
+
+    @override_settings(MAIL_MAX_ATTEMPTS=2, MAIL_RETRY_BASE_SECONDS=30)
+    def test_rejected_message_is_retried_then_failed(self):
+        enqueue_mail("Hello", "Body", ["nobody@example.com"])
+        refused = FailingConnection(smtplib.SMTPRecipientsRefused({"nobody@example.com": (550, b"No such user")}))
+
+        before = timezone.now()
+        send_batch(refused, 10)
+        email = OutboundEmail.objects.get()
+        self.assertEqual((email.status, email.attempts), (OutboundEmail.STATUS_QUEUED, 1))
+        self.assertGreaterEqual(email.next_attempt_at, before + timedelta(seconds=30))
+        self.assertIn("SMTPRecipientsRefused", email.last_error)
+
+        OutboundEmail.objects.update(next_attempt_at=timezone.now())
+        send_batch(refused, 10)
+        email.refresh_from_db()
+        self.assertEqual((email.status, email.attempts), (OutboundEmail.STATUS_FAILED, 2))
+
+    def test_connection_error_requeues_the_rest_of_the_batch(self):
+        first = enqueue_mail("One", "Body", ["a@example.com"])
+        second = enqueue_mail("Two", "Body", ["b@example.com"])
+        with self.assertRaises(smtplib.SMTPServerDisconnected):
+            send_batch(FailingConnection(smtplib.SMTPServerDisconnected("gone")), 10)
+
+        first.refresh_from_db()
+        second.refresh_from_db()
+        self.assertEqual((first.status, first.attempts), (OutboundEmail.STATUS_QUEUED, 1))
+        self.assertEqual((second.status, second.attempts), (OutboundEmail.STATUS_QUEUED, 0))
+
+
+@override_settings(
+    EMAIL_BACKEND="django.core.mail.backends.smtp.EmailBackend",
+    EMAIL_HOST="smtp.test", EMAIL_PORT=25, EMAIL_USE_TLS=False, EMAIL_HOST_USER="", EMAIL_HOST_PASSWORD="",
+    DEFAULT_FROM_EMAIL="shop@example.com",
+)
+class SendQueuedMailCommandTests(TestCase):
+    @mock.patch("smtplib.SMTP")
+    def test_one_smtp_connection_per_run(self, smtp):
+        smtp.return_value.sendmail.return_value = {}
+        for i in range(3):
+            enqueue_mail(f"Hello {i}", "Body", [f"user{i}@example.com"])
+
+        call_command("send_queued_mail", "--batch-size", "2", stdout=mock.Mock())
+
+        self.assertEqual(smtp.call_count, 1)
+        self.assertEqual(smtp.call_args.args, ("smtp.test", 25))
+        self.assertEqual(smtp.return_value.sendmail.call_count, 3)
+        self.assertEqual(OutboundEmail.objects.filter(status=OutboundEmail.STATUS_SENT).count(), 3)
+
+    @mock.patch("smtplib.SMTP")
+    def test_empty_queue_opens_no_connection(self, smtp):
+        call_command("send_queued_mail", stdout=mock.Mock())
+        smtp.assert_not_called()
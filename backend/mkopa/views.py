@@ -1,4 +1,5 @@
 from rest_framework import generics, filters
+from catalog.specs import SpecFilterBackend
 from .models import MkopaItem
 from .serializers import MkopaItemSerializer
 
@@ -11,10 +12,11 @@ class MkopaItemListView(generics.ListAPIView):
       - search=<text>   (searches name/specs_text/brand/category)
       - ordering=created_at|price_min_ksh|price_max_ksh|name|weekly_ksh|deposit_ksh|term_weeks
         (prefix with '-' for desc)
+      - ram_gb, storage_gb, battery_mah, camera_mp, display_inches (=, _min=, _max=; see catalog.specs)
     """
     serializer_class = MkopaItemSerializer
     queryset = MkopaItem.objects.all()
-    filter_backends = [filters.SearchFilter, filters.OrderingFilter]
+    filter_backends = [filters.SearchFilter, filters.OrderingFilter, SpecFilterBackend]
     search_fields = ["name", "specs_text", "brand", "category"]
     ordering_fields = ["created_at", "price_min_ksh", "price_max_ksh", "name", "weekly_ksh", "deposit_ksh", "term_weeks"]
     ordering = ["brand", "name"]
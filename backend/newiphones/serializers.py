@@ -1,7 +1,8 @@
 from rest_framework import serializers
+from backend.metrics import TimedModelSerializer
 from .models import NewIphone, NewIphoneBanner
 
-class NewIphoneSerializer(serializers.ModelSerializer):
+class NewIphoneSerializer(TimedModelSerializer):
     price_display = serializers.SerializerMethodField()
     image = serializers.SerializerMethodField()
     banner_image = serializers.SerializerMethodField()
@@ -39,7 +40,7 @@ class NewIphoneSerializer(serializers.ModelSerializer):
         return None
 
 
-class NewIphoneBannerSerializer(serializers.ModelSerializer):
+class NewIphoneBannerSerializer(TimedModelSerializer):
     banner_image = serializers.SerializerMethodField()
 
     class Meta:
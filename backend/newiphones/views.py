@@ -1,4 +1,5 @@
 from rest_framework import generics, filters, status
+from catalog.specs import SpecFilterBackend
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
@@ -8,7 +9,7 @@ from .serializers import NewIphoneSerializer, NewIphoneBannerSerializer
 class NewIphoneListView(generics.ListAPIView):
     serializer_class = NewIphoneSerializer
     queryset = NewIphone.objects.all()
-    filter_backends = [filters.SearchFilter, filters.OrderingFilter]
+    filter_backends = [filters.SearchFilter, filters.OrderingFilter, SpecFilterBackend]
     search_fields = ["name", "specs_text"]
     ordering_fields = ["created_at", "new_price_ksh", "old_price_ksh", "name"]
     ordering = ["-created_at"]
@@ -1,7 +1,8 @@
 from rest_framework import serializers
+from backend.metrics import TimedModelSerializer
 from .models import LatestOffer
 
-class LatestOfferSerializer(serializers.ModelSerializer):
+class LatestOfferSerializer(TimedModelSerializer):
     brand_display = serializers.CharField(source="get_brand_display", read_only=True)
     category_display = serializers.CharField(source="get_category_display", read_only=True)
     price_display = serializers.SerializerMethodField()
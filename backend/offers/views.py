@@ -1,4 +1,5 @@
 from rest_framework import generics, filters
+from catalog.specs import SpecFilterBackend
 from .models import LatestOffer
 from .serializers import LatestOfferSerializer
 
@@ -11,10 +12,11 @@ class LatestOfferListView(generics.ListAPIView):
       - search (name/brand/category/labels)
       - ordering: created_at|price_min_ksh|price_max_ksh|name  (prefix with '-' for desc)
       - page, page_size (if pagination is enabled globally)
+      - ram_gb, storage_gb, battery_mah, camera_mp, display_inches (=, _min=, _max=; see catalog.specs)
     """
     serializer_class = LatestOfferSerializer
     queryset = LatestOffer.objects.all()
-    filter_backends = [filters.SearchFilter, filters.OrderingFilter]
+    filter_backends = [filters.SearchFilter, filters.OrderingFilter, SpecFilterBackend]
     search_fields = ["name", "brand", "category", "labels_csv"]
     ordering_fields = ["created_at", "price_min_ksh", "price_max_ksh", "name"]
     ordering = ["-created_at", "name"]
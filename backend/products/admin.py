@@ -1,27 +1,72 @@
 from django.contrib import admin
-from .models import Product, Cart, CartItem, Order, OrderItem
+
+from backend.admin_tools import AutocompleteFilter, AutocompleteFilterMixin, LargeTableAdmin
+from .models import Product, Cart, CartItem, Order, OrderItem, StockReservation
+
+
+class CartFilter(AutocompleteFilter):
+    title = "cart"
+    field_name = "cart"
+
+
+class ProductFilter(AutocompleteFilter):
+    title = "product"
+    field_name = "product"
+
+
+class UserFilter(AutocompleteFilter):
+    title = "customer"
+    field_name = "user"
+
+
+def _search_by_pk(model_admin, request, queryset, search_term, search):
+    """Run the normal search and also match a numeric term (optionally "#123") against the pk."""
+    base = queryset
+    queryset, may_have_duplicates = search(request, queryset, search_term)
+    term = search_term.strip().lstrip("#")
+    if term.isdigit():
+        queryset |= base.filter(pk=int(term))
+    return queryset, may_have_duplicates
 
 @admin.register(Product)
-class ProductAdmin(admin.ModelAdmin):
-    list_display = ("name", "brand", "price", "old_price", "discount")
-    search_fields = ("name", "brand")
+class ProductAdmin(LargeTableAdmin):
+    list_display = ("name", "brand", "price", "old_price", "discount", "stock")
+    list_editable = ("stock",)
+    ordering = ("-id",)
+    # Prefix searches can use the name/brand indexes; "#123" / "123" finds by id.
+    search_fields = ("^name", "^brand")
+
+    def get_search_results(self, request, queryset, search_term):
+        return _search_by_pk(self, request, queryset, search_term, super().get_search_results)
 
 
 class CartItemInline(admin.TabularInline):
     model = CartItem
     extra = 1
+    autocomplete_fields = ("product",)
+
+    def get_queryset(self, request):
+        return super().get_queryset(request).select_related("product")
 
 
 @admin.register(Cart)
-class CartAdmin(admin.ModelAdmin):
+class CartAdmin(LargeTableAdmin):
     list_display = ("id", "user", "created_at", )
+    list_select_related = ("user",)
+    search_fields = ("^user__email",)
+    raw_id_fields = ("user",)
     inlines = [CartItemInline]
 
+    def get_search_results(self, request, queryset, search_term):
+        return _search_by_pk(self, request, queryset, search_term, super().get_search_results)
+
 
 @admin.register(CartItem)
-class CartItemAdmin(admin.ModelAdmin):
+class CartItemAdmin(AutocompleteFilterMixin, LargeTableAdmin):
     list_display = ("cart", "product", "quantity")
-    list_filter = ("cart", "product")
+    list_select_related = ("cart__user", "product")
+    list_filter = (CartFilter, ProductFilter)
+    autocomplete_fields = ("cart", "product")
 
 
 class OrderItemInline(admin.TabularInline):
@@ -29,10 +74,26 @@ class OrderItemInline(admin.TabularInline):
     extra = 0
     readonly_fields = ("product", "name", "unit_price", "quantity", "line_total")
 
+    def get_queryset(self, request):
+        return super().get_queryset(request).select_related("product")
+
 
 @admin.register(Order)
-class OrderAdmin(admin.ModelAdmin):
+class OrderAdmin(AutocompleteFilterMixin, LargeTableAdmin):
     list_display = ("id", "user", "status", "payment_method", "total", "receipt_number", "receipt_generated_at", "receipt_sent_at", "created_at")
-    list_filter = ("status", "payment_method", "created_at")
-    search_fields = ("id", "user__username", "user__email", "ship_full_name", "ship_phone", "receipt_number")
+    list_select_related = ("user",)
+    list_filter = ("status", "payment_method", "created_at", UserFilter)
+    # Exact/prefix lookups only, each backed by an index ("#123" / "123" finds by order id).
+    search_fields = ("=receipt_number", "^user__email", "=ship_phone", "^ship_full_name")
+    raw_id_fields = ("user",)
     inlines = [OrderItemInline]
+
+    def get_search_results(self, request, queryset, search_term):
+        return _search_by_pk(self, request, queryset, search_term, super().get_search_results)
+
+
+@admin.register(StockReservation)
+class StockReservationAdmin(admin.ModelAdmin):
+    list_display = ("id", "order", "product", "quantity", "status", "expires_at", "created_at")
+    list_filter = ("status",)
+    raw_id_fields = ("order", "product")
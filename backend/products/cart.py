@@ -0,0 +1,179 @@
+# products/cart.py
+"""
+Cart mutations.
+
+Quantities are only ever changed with single-statement, conditional writes so
+concurrent taps on the same cart neither lose increments nor duplicate rows:
+
+    add:    UPDATE ... SET quantity = quantity + n WHERE cart_id = %s AND product_id = %s
+            (INSERT when no row matched; the (cart, product) unique constraint
+            turns a racing second INSERT into a retry of the UPDATE)
+    remove: UPDATE ... SET quantity = quantity - n WHERE ... AND quantity > n
+            else DELETE ... WHERE ... AND quantity <= n   (clamp at zero)
+
+quantity is unsigned on MySQL, so the decrement is guarded by the WHERE clause
+rather than clamped with GREATEST(quantity - n, 0), which would overflow first.
+
+Batches (apply_operations, raise_to) lock the touched rows and then issue at most one
+statement per kind of change: a DELETE, a CASE-based UPDATE and a bulk INSERT.
+"""
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .models import Cart, CartItem, Product
+
+MAX_BATCH_OPERATIONS = 100
+# Rounds of "someone inserted the same line first, redo against their row".
+# Bounded so a different IntegrityError (e.g. the product was deleted) can't spin.
+MAX_WRITE_ATTEMPTS = 3
+
+
+class InvalidOperations(ValueError):
+    pass
+
+
+def _add(cart_id, product_id, n):
+    """Raises IntegrityError if the line can't be inserted for another reason (missing cart or product)."""
+    rows = CartItem.objects.filter(cart_id=cart_id, product_id=product_id)
+    for attempt in range(MAX_WRITE_ATTEMPTS):
+        if rows.update(quantity=F("quantity") + n):
+            return
+        try:
+            with transaction.atomic():
+                CartItem.objects.create(cart_id=cart_id, product_id=product_id, quantity=n)
+            return
+        except IntegrityError:
+            # Retry (adding to their row) only if someone else inserted the line first.
+            if attempt + 1 == MAX_WRITE_ATTEMPTS or not rows.exists():
+                raise
+
+
+def _remove(cart_id, product_id, n):
+    rows = CartItem.objects.filter(cart_id=cart_id, product_id=product_id)
+    while True:
+        if rows.filter(quantity__gt=n).update(quantity=F("quantity") - n):
+            return
+        deleted, _ = rows.filter(quantity__lte=n).delete()
+        if deleted or not rows.exists():
+            return
+        # An increment landed between the two statements; try the decrement again.
+
+
+def touch(cart):
+    """Mark the cart as active (Cart.updated_at drives the idle-cart cleanup)."""
+    Cart.objects.filter(pk=cart.pk).update(updated_at=timezone.now())
+
+
+def apply_delta(cart, product_id, delta):
+    """Add `delta` units (negative to take away) of a product to a cart; 0 or below deletes the line."""
+    if delta > 0:
+        _add(cart.pk, product_id, delta)
+    elif delta < 0:
+        _remove(cart.pk, product_id, -delta)
+    else:
+        return
+    touch(cart)
+
+
+def _collapse(operations):
+    """
+    Validate [{product_id, delta | quantity}, ...] and fold it, in order, into
+    {product_id: ("set", q) | ("delta", d)}.
+    """
+    if not isinstance(operations, list) or not operations:
+        raise InvalidOperations("operations must be a non-empty list.")
+    if len(operations) > MAX_BATCH_OPERATIONS:
+        raise InvalidOperations(f"At most {MAX_BATCH_OPERATIONS} operations per request.")
+
+    plan = {}
+    for op in operations:
+        if not isinstance(op, dict) or ("delta" in op) == ("quantity" in op):
+            raise InvalidOperations("Each operation needs product_id and exactly one of delta or quantity.")
+        try:
+            product_id = int(op.get("product_id"))
+            value = int(op["delta"] if "delta" in op else op["quantity"])
+        except (TypeError, ValueError):
+            raise InvalidOperations("product_id, delta and quantity must be integers.")
+        if "quantity" in op:
+            if value < 0:
+                raise InvalidOperations("quantity can't be negative.")
+            plan[product_id] = ("set", value)
+        else:
+            kind, current = plan.get(product_id, ("delta", 0))
+            plan[product_id] = (kind, max(0, current + value) if kind == "set" else current + value)
+    return plan
+
+
+def apply_operations(cart, operations):
+    """
+    Apply a batch of cart operations atomically. A quantity sets the line, a delta
+    adds to it; lines that end at 0 or below are deleted. Raises InvalidOperations.
+    """
+    _apply_batch(cart, _collapse(operations))
+
+
+def raise_to(cart, quantities):
+    """
+    Make each line at least {product_id: quantity} (existing larger lines are
+    kept), atomically. Repeating the call changes nothing, which is what a
+    retried guest-cart merge needs. Raises InvalidOperations for unknown products.
+    """
+    _apply_batch(cart, {product_id: ("max", qty) for product_id, qty in quantities.items()})
+
+
+def _apply_batch(cart, plan):
+    _check_products(plan)
+
+    for attempt in range(MAX_WRITE_ATTEMPTS):
+        try:
+            with transaction.atomic():
+                _apply_plan(cart, plan)
+            return
+        except IntegrityError:
+            if attempt + 1 == MAX_WRITE_ATTEMPTS:
+                raise
+            # A product deleted since the check is the caller's error, not a race to retry.
+            _check_products(plan)
+            # Otherwise a parallel add inserted one of our new lines first; redo against it.
+
+
+def _check_products(plan):
+    known = set(Product.objects.filter(pk__in=plan).values_list("pk", flat=True))
+    missing = sorted(set(plan) - known)
+    if missing:
+        raise InvalidOperations(f"Unknown product ids: {missing}.")
+
+
+def _apply_plan(cart, plan):
+    existing = {
+        item.product_id: item
+        for item in CartItem.objects.select_for_update().filter(cart=cart, product_id__in=plan)
+    }
+    to_delete, to_update, to_create = [], [], []
+    for product_id, (kind, value) in plan.items():
+        item = existing.get(product_id)
+        current = item.quantity if item else 0
+        if kind == "set":
+            quantity = value
+        elif kind == "max":
+            quantity = max(current, value)
+        else:
+            quantity = max(0, current + value)
+        if item is None:
+            if quantity > 0:
+                to_create.append(CartItem(cart=cart, product_id=product_id, quantity=quantity))
+        elif quantity == 0:
+            to_delete.append(item.pk)
+        elif quantity != current:
+            item.quantity = quantity
+            to_update.append(item)
+
+    if to_delete:
+        CartItem.objects.filter(pk__in=to_delete).delete()
+    if to_update:
+        CartItem.objects.bulk_update(to_update, ["quantity"], batch_size=MAX_BATCH_OPERATIONS)
+    if to_create:
+        CartItem.objects.bulk_create(to_create)
+    if to_delete or to_update or to_create:
+        touch(cart)
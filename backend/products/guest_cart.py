@@ -0,0 +1,90 @@
+# products/guest_cart.py
+"""
+Guest carts that live entirely in a signed client token.
+
+The token is django.core.signing output over a compact "id:qty,id:qty" string
+(zlib-compressed when that helps), so anonymous cart traffic needs no session,
+no Cart row and no DB writes. Each request verifies the signature and prices
+the lines with one Product query. On login the token is merged into the user's
+Cart with products.cart.raise_to, so a retried merge doesn't add the lines twice.
+"""
+from django.conf import settings
+from django.core import signing
+
+from .cart import InvalidOperations, _collapse, raise_to
+from .models import Product
+from .serializers import ProductSerializer
+
+SALT = "products.guest_cart"
+HEADER = "HTTP_X_CART_TOKEN"
+MAX_LINES = 50
+MAX_QUANTITY = 999
+
+
+def load(token):
+    """Token -> {product_id: quantity}; a missing, tampered or expired token is an empty cart."""
+    if not token:
+        return {}
+    try:
+        raw = signing.loads(token, salt=SALT, max_age=settings.GUEST_CART_MAX_AGE_DAYS * 86400)
+    except signing.BadSignature:
+        return {}
+    items = {}
+    try:
+        for part in str(raw).split(","):
+            if part:
+                product_id, quantity = part.split(":")
+                items[int(product_id)] = int(quantity)
+    except ValueError:
+        return {}
+    return {pid: qty for pid, qty in items.items() if qty > 0}
+
+
+def dump(items):
+    if not items:
+        return ""
+    compact = ",".join(f"{pid}:{qty}" for pid, qty in sorted(items.items()))
+    return signing.dumps(compact, salt=SALT, compress=True)
+
+
+def apply(items, operations):
+    """Return a new {product_id: quantity} with the operations applied (same rules as the DB cart)."""
+    items = dict(items)
+    for product_id, (kind, value) in _collapse(operations).items():
+        quantity = value if kind == "set" else items.get(product_id, 0) + value
+        if quantity > 0:
+            items[product_id] = min(quantity, MAX_QUANTITY)
+        else:
+            items.pop(product_id, None)
+    if len(items) > MAX_LINES:
+        raise InvalidOperations(f"A guest cart holds at most {MAX_LINES} different products.")
+    return items
+
+
+def priced(items):
+    """
+    Shape the cart like CartSerializer (plus the token) using one Product query.
+    Lines for products that no longer exist are dropped.
+    """
+    products = Product.objects.in_bulk(list(items))
+    items = {pid: qty for pid, qty in items.items() if pid in products}
+    return items, {
+        "id": None,
+        "items": [
+            {"id": None, "product": ProductSerializer(products[pid]).data, "quantity": qty}
+            for pid, qty in items.items()
+        ],
+        "token": dump(items),
+    }
+
+
+def merge_into_cart(cart, items):
+    """
+    Fold the guest lines into `cart` in one batch; unknown products are skipped.
+    Each line ends at max(account quantity, guest quantity) rather than the sum,
+    so merging the same token twice (a retried login) is harmless.
+    """
+    known = Product.objects.filter(pk__in=list(items)).values_list("pk", flat=True)
+    quantities = {pid: items[pid] for pid in known}
+    if quantities:
+        raise_to(cart, quantities)
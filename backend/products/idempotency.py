@@ -0,0 +1,108 @@
+# products/idempotency.py
+"""
+Idempotency-Key handling for checkout.
+
+The key row is inserted (and committed) before any checkout work, so the
+unique (user, key) constraint is what detects a concurrent duplicate: only the
+request whose INSERT wins runs the checkout, the others get 409 while it is in
+progress and the stored response once it's done. Checkouts with different keys
+never touch each other's rows.
+"""
+import hashlib
+import json
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+from django.utils.regex_helper import _lazy_re_compile
+from rest_framework import status
+from rest_framework.response import Response
+
+from .models import IdempotencyKey
+
+HEADER = "HTTP_IDEMPOTENCY_KEY"
+# Error `code` of the "still running" 409; the only checkout 409 a client should retry.
+IN_PROGRESS_CODE = "idempotency_in_progress"
+re_key = _lazy_re_compile(r"^[A-Za-z0-9_-]{8,64}$")
+
+
+def request_fingerprint(data):
+    return hashlib.sha256(json.dumps(data, sort_keys=True, default=str).encode()).hexdigest()
+
+
+def get_key(request):
+    """The request's Idempotency-Key, None if absent; raises ValueError if malformed."""
+    key = request.META.get(HEADER)
+    if key is None:
+        return None
+    if not re_key.match(key):
+        raise ValueError("Idempotency-Key must be 8-64 characters of A-Z, a-z, 0-9, '-' or '_'.")
+    return key
+
+
+def claim(user, key, fingerprint):
+    """
+    Try to become the request that handles `key`.
+    Returns (claim, None) when this request should run the checkout, or
+    (None, response) with the response to send instead.
+    """
+    existing = None
+    for _ in range(3):
+        try:
+            with transaction.atomic():
+                return IdempotencyKey.objects.create(user=user, key=key, request_hash=fingerprint), None
+        except IntegrityError:
+            existing = IdempotencyKey.objects.filter(user=user, key=key).first()
+        if existing is not None:
+            break
+        # else: a failed attempt released the key in between; try the insert again
+    if existing is None:
+        return None, _in_progress()
+
+    if existing.request_hash != fingerprint:
+        return None, Response(
+            {"detail": "Idempotency-Key was already used with a different request body."},
+            status=status.HTTP_422_UNPROCESSABLE_ENTITY,
+        )
+
+    if existing.status == IdempotencyKey.STATUS_COMPLETED:
+        response = Response(existing.response_body, status=existing.response_status)
+        response["Idempotent-Replayed"] = "true"
+        return None, response
+
+    stale_before = timezone.now() - timedelta(seconds=settings.IDEMPOTENCY_LOCK_TIMEOUT)
+    if existing.created_at < stale_before:
+        # The first attempt died without finishing (its transaction rolled back). Take over.
+        taken = IdempotencyKey.objects.filter(
+            pk=existing.pk, status=IdempotencyKey.STATUS_IN_PROGRESS, created_at=existing.created_at,
+        ).update(created_at=timezone.now())
+        if taken:
+            existing.refresh_from_db()
+            return existing, None
+
+    return None, _in_progress()
+
+
+def _in_progress():
+    response = Response(
+        {"detail": "A request with this Idempotency-Key is still being processed.", "code": IN_PROGRESS_CODE},
+        status=status.HTTP_409_CONFLICT,
+    )
+    response["Retry-After"] = "1"
+    return response
+
+
+def complete(claimed, response, order_id=None):
+    """Store the response; call inside the checkout transaction so both commit together."""
+    IdempotencyKey.objects.filter(pk=claimed.pk).update(
+        status=IdempotencyKey.STATUS_COMPLETED,
+        response_status=response.status_code,
+        response_body=response.data,
+        order_id=order_id,
+    )
+
+
+def release(claimed):
+    """Forget the key after a failed attempt so the client can retry it."""
+    IdempotencyKey.objects.filter(pk=claimed.pk, status=IdempotencyKey.STATUS_IN_PROGRESS).delete()
@@ -0,0 +1,142 @@
+# products/inventory.py
+"""
+Stock reservation.
+
+Stock is taken with one conditional UPDATE per product:
+
+    UPDATE products_product SET stock = stock - qty WHERE id = %s AND stock >= qty
+
+so concurrent checkouts never oversell and nobody waits on a SELECT ... FOR
+UPDATE held across the request. Products with stock = NULL aren't tracked;
+NULL - qty stays NULL, so the same statement covers them.
+
+Unpaid mpesa/card reservations only lapse with STOCK_RESERVATION_EXPIRY_ENABLED
+on: nothing in this app marks those orders PAID yet, so expiring them would
+cancel every one of them. Until then they are held until staff settle or
+cancel the order.
+"""
+import logging
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from mailer.queue import enqueue_mail
+
+from .models import Order, Product, StockReservation
+
+logger = logging.getLogger(__name__)
+
+
+class OutOfStock(Exception):
+    def __init__(self, product, requested):
+        self.product = product
+        self.requested = requested
+        super().__init__(f"Not enough stock for {product.name}.")
+
+
+def reserve_stock(order, items):
+    """
+    Take stock for every line of `order` (items as built by _prepare_items_and_subtotal).
+    Must run inside the checkout transaction: on OutOfStock the caller rolls back,
+    which also puts back the units already taken for earlier lines.
+    """
+    if order.payment_method == Order.PAYMENT_COD or not settings.STOCK_RESERVATION_EXPIRY_ENABLED:
+        expires_at = None
+    else:
+        expires_at = timezone.now() + timedelta(minutes=settings.STOCK_RESERVATION_MINUTES)
+
+    # Same lock order in every transaction (by product id) avoids deadlocks between carts.
+    reservations = []
+    for it in sorted(items, key=lambda it: it["product"].pk):
+        product, qty = it["product"], it["quantity"]
+        taken = Product.objects.filter(
+            Q(stock__isnull=True) | Q(stock__gte=qty), pk=product.pk
+        ).update(stock=F("stock") - qty)
+        if not taken:
+            raise OutOfStock(product, qty)
+        if product.stock is not None:
+            reservations.append(StockReservation(
+                product=product, order=order, quantity=qty, expires_at=expires_at,
+            ))
+    StockReservation.objects.bulk_create(reservations)
+
+
+def commit_reservations(order):
+    """Held units become sold. Idempotent."""
+    return StockReservation.objects.filter(
+        order=order, status=StockReservation.STATUS_HELD
+    ).update(status=StockReservation.STATUS_COMMITTED, expires_at=None)
+
+
+def release_reservations(order):
+    """Put held units for `order` back on the shelf. Idempotent and safe to race."""
+    released = 0
+    for r in StockReservation.objects.filter(order=order, status=StockReservation.STATUS_HELD):
+        with transaction.atomic():
+            # Only the caller that flips HELD -> RELEASED returns the units.
+            if StockReservation.objects.filter(pk=r.pk, status=StockReservation.STATUS_HELD).update(
+                status=StockReservation.STATUS_RELEASED
+            ):
+                Product.objects.filter(pk=r.product_id, stock__isnull=False).update(stock=F("stock") + r.quantity)
+                released += r.quantity
+    return released
+
+
+def notify_expired(order):
+    """Tell the customer their unpaid order was cancelled."""
+    to_email = order.user.email
+    if not to_email:
+        return
+    body_lines = [
+        f"Hi {order.ship_full_name or 'customer'},",
+        "",
+        f"We didn't receive payment for order #{order.id} within "
+        f"{settings.STOCK_RESERVATION_MINUTES} minutes, so it has been cancelled "
+        "and the items put back in stock.",
+        "If you still want them, you're welcome to place the order again.",
+        "",
+        "— JONTECH",
+    ]
+    try:
+        enqueue_mail(
+            f"Your JONTECH order #{order.id} was cancelled",
+            "\n".join(body_lines),
+            [to_email],
+            tag=f"order-expired:{order.id}",
+        )
+    except Exception:  # the cancellation stands either way
+        logger.exception("Could not send the expiry notice for order %s", order.id)
+
+
+def expire_reservations(now=None, limit=500):
+    """
+    Cancel pending orders whose reservations ran out, release their stock and
+    notify the customer. Returns the number of orders cancelled; always 0 while
+    STOCK_RESERVATION_EXPIRY_ENABLED is off.
+    """
+    if not settings.STOCK_RESERVATION_EXPIRY_ENABLED:
+        return 0
+    now = now or timezone.now()
+    order_ids = list(
+        StockReservation.objects.filter(
+            status=StockReservation.STATUS_HELD, expires_at__lte=now,
+        ).values_list("order_id", flat=True).distinct()[:limit]
+    )
+    cancelled = 0
+    for order in Order.objects.filter(pk__in=order_ids).select_related("user"):
+        if order.status in (Order.STATUS_PAID, Order.STATUS_FULFILLED):
+            # Paid through a path that didn't commit (e.g. a queryset update).
+            commit_reservations(order)
+        elif order.status == Order.STATUS_CANCELLED:
+            release_reservations(order)
+        # Conditional so an order paid in the meantime isn't cancelled.
+        elif Order.objects.filter(pk=order.pk, status=Order.STATUS_PENDING).update(status=Order.STATUS_CANCELLED):
+            order.status = Order.STATUS_CANCELLED
+            # Re-save so post_save listeners (stock release, sales rollups) see the change.
+            order.save(update_fields=["status"])
+            notify_expired(order)
+            cancelled += 1
+    return cancelled
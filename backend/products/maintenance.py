@@ -0,0 +1,123 @@
+# products/maintenance.py
+"""
+Housekeeping for rows and files nobody reads any more.
+
+Every purge walks the table in primary-key order and deletes at most
+`chunk_size` rows per statement, each in its own short transaction, with an
+optional pause in between. That keeps row locks (and the undo log on MySQL)
+small and lets replication and live traffic keep up, instead of one
+DELETE ... WHERE updated_at < X locking a range of the live table for minutes.
+"""
+import logging
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.utils import timezone
+
+from mailer.models import OutboundEmail
+
+from .models import Cart, IdempotencyKey, Order
+
+logger = logging.getLogger(__name__)
+
+RECEIPTS_DIR = "receipts"
+
+
+def chunked_delete(queryset, chunk_size=500, pause=0.0, dry_run=False):
+    """
+    Delete the rows of `queryset` in primary-key chunks; returns the number of
+    matched rows. The filter is re-checked when each chunk is deleted, so rows
+    that changed in the meantime (e.g. a cart that became active) are kept.
+    """
+    model = queryset.model
+    total, last_pk = 0, None
+    while True:
+        page = queryset.order_by("pk")
+        if last_pk is not None:
+            page = page.filter(pk__gt=last_pk)
+        pks = list(page.values_list("pk", flat=True)[:chunk_size])
+        if not pks:
+            return total
+        last_pk = pks[-1]
+        if dry_run:
+            total += len(pks)
+            continue
+        _, per_model = queryset.filter(pk__in=pks).delete()
+        deleted = per_model.get(model._meta.label, 0)
+        total += deleted
+        logger.debug("Deleted %d %s row(s) up to pk %s", deleted, model._meta.label, last_pk)
+        if pause:
+            time.sleep(pause)
+
+
+def purge_idle_carts(days=None, **kwargs):
+    """Carts (and their items) untouched for CART_IDLE_DAYS; get_or_create makes a fresh one on demand."""
+    days = settings.CART_IDLE_DAYS if days is None else days
+    cutoff = timezone.now() - timedelta(days=days)
+    return chunked_delete(Cart.objects.filter(updated_at__lt=cutoff), **kwargs)
+
+
+def purge_expired_idempotency_keys(**kwargs):
+    cutoff = timezone.now() - timedelta(hours=settings.IDEMPOTENCY_KEY_TTL_HOURS)
+    return chunked_delete(IdempotencyKey.objects.filter(created_at__lt=cutoff), **kwargs)
+
+
+def purge_expired_password_reset_mail(**kwargs):
+    """
+    Password resets are stateless tokens (PASSWORD_RESET_TIMEOUT), so the only
+    thing left behind is the spooled email holding the link. Once the link has
+    expired the message is useless and shouldn't be kept around.
+    """
+    cutoff = timezone.now() - timedelta(seconds=settings.PASSWORD_RESET_TIMEOUT)
+    qs = OutboundEmail.objects.filter(tag="password_reset", created_at__lt=cutoff).exclude(
+        status=OutboundEmail.STATUS_SENDING
+    )
+    return chunked_delete(qs, **kwargs)
+
+
+def purge_orphan_receipts(min_age_hours=1, chunk_size=500, pause=0.0, dry_run=False):
+    """
+    Delete receipt PDFs that no order points at (left behind by regenerated
+    receipts or deleted orders). Files younger than `min_age_hours` are skipped,
+    as are attachments of mail that hasn't gone out yet.
+    """
+    try:
+        _, files = default_storage.listdir(RECEIPTS_DIR)
+    except FileNotFoundError:
+        return 0
+    cutoff = timezone.now() - timedelta(hours=min_age_hours)
+    pending = {
+        a.get("path")
+        for attachments in OutboundEmail.objects.exclude(status=OutboundEmail.STATUS_SENT)
+        .values_list("attachments", flat=True).iterator()
+        for a in attachments or ()
+    }
+
+    removed = 0
+    for i in range(0, len(files), chunk_size):
+        names = [f"{RECEIPTS_DIR}/{f}" for f in files[i:i + chunk_size]]
+        referenced = set(Order.objects.filter(receipt_pdf__in=names).values_list("receipt_pdf", flat=True))
+        for name in names:
+            if name in referenced or name in pending:
+                continue
+            try:
+                if default_storage.get_modified_time(name) >= cutoff:
+                    continue
+                if not dry_run:
+                    default_storage.delete(name)
+            except (FileNotFoundError, NotImplementedError):
+                continue
+            removed += 1
+        if pause:
+            time.sleep(pause)
+    return removed
+
+
+TASKS = {
+    "carts": purge_idle_carts,
+    "idempotency": purge_expired_idempotency_keys,
+    "password-reset": purge_expired_password_reset_mail,
+    "receipts": purge_orphan_receipts,
+}
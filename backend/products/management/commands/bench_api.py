@@ -0,0 +1,201 @@
+# products/management/commands/bench_api.py
+import json
+import random
+import statistics
+import tempfile
+import time
+from contextlib import contextmanager
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from authapp.authentication import add_user_claims
+from products.models import Product
+from products.management.commands.seed_catalog import BENCH_EMAIL_DOMAIN, BENCH_PREFIX
+
+LIST_URLS = [
+    "/api/products/", "/api/smartphones/", "/api/tablets/", "/api/televisions/",
+    "/api/latest-offers/", "/api/new-iphones/",
+]
+SEARCH_URLS = [
+    "/api/smartphones/?search=8GB", "/api/tablets/?search=Samsung",
+    "/api/audio-devices/?search=Bench", "/api/storages/?search=256GB",
+]
+SCENARIOS = ["list", "detail", "search", "cart", "checkout"]
+
+CHECKOUT_PAYLOAD = {
+    "shipping": {
+        "full_name": "Bench Buyer", "phone": "0700000000", "address1": "1 Bench Rd",
+        "city": "Nairobi", "country": "Kenya",
+    },
+    "payment_method": "cod",
+}
+
+
+@contextmanager
+def bench_settings():
+    """
+    Settings for in-process bench runs. The test client bypasses the network, so
+    host checks are off. Checkout side effects stay local: receipt mail is sent
+    inline to the locmem backend instead of being spooled for the mailer worker,
+    and receipt PDFs are written to a throwaway MEDIA_ROOT.
+    """
+    with tempfile.TemporaryDirectory(prefix="bench-media-") as media_root, override_settings(
+        ALLOWED_HOSTS=["*"],
+        EMAIL_BACKEND="django.core.mail.backends.locmem.EmailBackend",
+        MAIL_QUEUE_ENABLED=False,
+        MEDIA_ROOT=media_root,
+    ):
+        yield
+
+
+def _percentile(sorted_values, pct):
+    if not sorted_values:
+        return 0.0
+    k = (len(sorted_values) - 1) * pct / 100
+    lo = int(k)
+    hi = min(lo + 1, len(sorted_values) - 1)
+    return sorted_values[lo] + (sorted_values[hi] - sorted_values[lo]) * (k - lo)
+
+
+class Command(BaseCommand):
+    help = (
+        "Drive list/detail/search/cart/checkout endpoints in-process against data from "
+        "seed_catalog and report p50/p95/p99 latency (ms) and queries per request. "
+        "Use --out to save results and --baseline to compare against an earlier run."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--iterations", type=int, default=200, help="Measured requests per scenario.")
+        parser.add_argument("--warmup", type=int, default=20)
+        parser.add_argument("--scenario", action="append", choices=SCENARIOS,
+                            help="Run only these scenarios (repeatable). Default: all.")
+        parser.add_argument("--seed", type=int, default=1)
+        parser.add_argument("--out", help="Write results as JSON to this path.")
+        parser.add_argument("--baseline", help="JSON from an earlier --out run to compare against.")
+
+    def handle(self, *args, **opts):
+        self.rng = random.Random(opts["seed"])
+        User = get_user_model()
+        self.user = User.objects.filter(email__endswith=f"@{BENCH_EMAIL_DOMAIN}").order_by("pk").first()
+        if self.user is None:
+            raise CommandError("No bench data found; run `manage.py seed_catalog` first.")
+        self.product_ids = list(
+            Product.objects.filter(name__startswith=f"{BENCH_PREFIX} ").values_list("id", flat=True)[:10_000]
+        )
+
+        token = add_user_claims(RefreshToken.for_user(self.user), self.user).access_token
+        with bench_settings():
+            self.client = Client(HTTP_AUTHORIZATION=f"Bearer {token}", HTTP_ACCEPT_ENCODING="gzip, br")
+            results = {}
+            for name in opts["scenario"] or SCENARIOS:
+                step = getattr(self, f"_step_{name}")
+                for _ in range(opts["warmup"]):
+                    step()
+                results[name] = self._measure(step, opts["iterations"])
+                self._print(name, results[name])
+
+        report = {
+            "created_at": timezone.now().isoformat(),
+            "db_vendor": connection.vendor,
+            "products": Product.objects.count(),
+            "iterations": opts["iterations"],
+            "results": results,
+        }
+        if opts["out"]:
+            with open(opts["out"], "w") as fh:
+                json.dump(report, fh, indent=2)
+            self.stdout.write(f"Saved results to {opts['out']}")
+        if opts["baseline"]:
+            self._compare(opts["baseline"], results)
+
+    # --- scenarios: each call performs one measured request and returns its response ---
+
+    def _step_list(self):
+        return self.client.get(self.rng.choice(LIST_URLS))
+
+    def _step_detail(self):
+        return self.client.get(f"/api/products/{self.rng.choice(self.product_ids)}/")
+
+    def _step_search(self):
+        return self.client.get(self.rng.choice(SEARCH_URLS))
+
+    def _step_cart(self):
+        pid = self.rng.choice(self.product_ids)
+        return self.client.post("/api/cart/add/", {"product_id": pid, "quantity": 1}, content_type="application/json")
+
+    def _step_checkout(self):
+        # Checkout needs a non-empty cart; the add is unmeasured setup.
+        with _Paused(self):
+            self._step_cart()
+        return self.client.post("/api/checkout/", CHECKOUT_PAYLOAD, content_type="application/json")
+
+    # --- measurement ---
+
+    def _measure(self, step, iterations):
+        latencies, queries, errors = [], [], 0
+        for _ in range(iterations):
+            self._paused = 0.0
+            with CaptureQueriesContext(connection) as ctx:
+                start = time.perf_counter()
+                response = step()
+                elapsed = time.perf_counter() - start - self._paused
+            setup_queries = getattr(self, "_paused_queries", 0)
+            self._paused_queries = 0
+            if response.status_code >= 400:
+                errors += 1
+            latencies.append(elapsed * 1000)
+            queries.append(len(ctx.captured_queries) - setup_queries)
+        latencies.sort()
+        return {
+            "p50_ms": round(_percentile(latencies, 50), 3),
+            "p95_ms": round(_percentile(latencies, 95), 3),
+            "p99_ms": round(_percentile(latencies, 99), 3),
+            "mean_ms": round(statistics.fmean(latencies), 3),
+            "queries_per_request": round(statistics.fmean(queries), 2),
+            "max_queries": max(queries),
+            "errors": errors,
+        }
+
+    def _print(self, name, r):
+        self.stdout.write(
+            f"{name:<9} p50 {r['p50_ms']:8.2f}ms  p95 {r['p95_ms']:8.2f}ms  p99 {r['p99_ms']:8.2f}ms  "
+            f"queries/req {r['queries_per_request']:6.1f}  errors {r['errors']}"
+        )
+
+    def _compare(self, path, results):
+        with open(path) as fh:
+            baseline = json.load(fh)["results"]
+        self.stdout.write(f"\nCompared with {path}:")
+        for name, r in results.items():
+            base = baseline.get(name)
+            if not base:
+                continue
+            parts = []
+            for key in ("p50_ms", "p95_ms", "p99_ms", "queries_per_request"):
+                before, after = base[key], r[key]
+                change = ((after - before) / before * 100) if before else 0.0
+                parts.append(f"{key} {before:g} -> {after:g} ({change:+.1f}%)")
+            self.stdout.write(f"{name:<9} " + "  ".join(parts))
+
+
+class _Paused:
+    """Excludes setup work inside a step from the measured latency and query count."""
+
+    def __init__(self, command):
+        self.command = command
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        self.queries_before = len(connection.queries_log)
+
+    def __exit__(self, *exc):
+        self.command._paused += time.perf_counter() - self.start
+        self.command._paused_queries = (
+            getattr(self.command, "_paused_queries", 0) + len(connection.queries_log) - self.queries_before
+        )
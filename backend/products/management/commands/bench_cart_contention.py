@@ -0,0 +1,86 @@
+# products/management/commands/bench_cart_contention.py
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from django.test import Client, override_settings
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from authapp.authentication import add_user_claims
+from products.models import Cart, CartItem, Product
+from products.management.commands.seed_catalog import BENCH_EMAIL_DOMAIN, BENCH_PREFIX
+
+
+class Command(BaseCommand):
+    help = (
+        "Hammer one cart with parallel add-to-cart calls (+1 and, with --mixed, -1) "
+        "through the API, report mutations/s and check no increment was lost or "
+        "duplicated. Use a real database server (MySQL) for meaningful concurrency."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--ops", type=int, default=500, help="Total mutations.")
+        parser.add_argument("--workers", type=int, default=20, help="Concurrent threads.")
+        parser.add_argument("--products", type=int, default=1, help="Spread mutations over this many products.")
+        parser.add_argument("--mixed", action="store_true", help="Every third mutation is -1 instead of +1.")
+
+    def handle(self, *args, **opts):
+        n_products = max(1, opts["products"])
+        products = [
+            Product.objects.create(name=f"{BENCH_PREFIX} cart contention {i}", price=Decimal("10.00"))
+            for i in range(n_products)
+        ]
+        User = get_user_model()
+        stamp = products[0].pk
+        user = User.objects.create(username=f"cartbench{stamp}", email=f"cartbench{stamp}@{BENCH_EMAIL_DOMAIN}")
+        cart = Cart.objects.create(user=user)
+        token = str(add_user_claims(RefreshToken.for_user(user), user).access_token)
+
+        plan = [
+            (products[i % n_products].pk, -1 if opts["mixed"] and i % 3 == 2 else 1)
+            for i in range(opts["ops"])
+        ]
+
+        def mutate(step):
+            product_id, delta = step
+            try:
+                # raise_request_exception=False: the test client's exception hook is process-wide.
+                client = Client(raise_request_exception=False, HTTP_AUTHORIZATION=f"Bearer {token}")
+                resp = client.post("/api/cart/add/", {"product_id": product_id, "quantity": delta},
+                                   content_type="application/json")
+                return resp.status_code
+            except Exception as e:  # e.g. "database is locked" on SQLite
+                return type(e).__name__
+            finally:
+                connections.close_all()
+
+        with override_settings(ALLOWED_HOSTS=["*"]):
+            start = time.perf_counter()
+            with ThreadPoolExecutor(opts["workers"]) as pool:
+                outcomes = Counter(pool.map(mutate, plan))
+            elapsed = time.perf_counter() - start
+
+        self.stdout.write(f"Outcomes: {dict(outcomes)}")
+        self.stdout.write(f"{len(plan)} mutations in {elapsed:.2f}s = {len(plan) / elapsed:.1f}/s "
+                          f"({opts['workers']} workers, {n_products} product(s))")
+
+        ok = True
+        rows = CartItem.objects.filter(cart=cart)
+        if rows.count() > n_products:
+            ok = False
+            self.stdout.write(self.style.ERROR(f"{rows.count()} rows for {n_products} product(s): duplicates."))
+        if not opts["mixed"] and outcomes.get(200) == len(plan):
+            # With only increments every successful call must show up in the total.
+            total = sum(rows.values_list("quantity", flat=True))
+            self.stdout.write(f"Expected quantity {len(plan)}, got {total}")
+            ok = ok and total == len(plan)
+
+        user.delete()
+        Product.objects.filter(pk__in=[p.pk for p in products]).delete()
+        if not ok:
+            raise CommandError("Cart mutations were lost or duplicated.")
+        self.stdout.write(self.style.SUCCESS("No lost or duplicated cart updates."))
@@ -0,0 +1,35 @@
+# products/management/commands/cleanup_stale_data.py
+import time
+
+from django.core.management.base import BaseCommand
+
+from products.maintenance import TASKS
+
+
+class Command(BaseCommand):
+    help = (
+        "Delete idle carts, expired idempotency keys, expired password-reset mail and "
+        "orphaned receipt PDFs, in small primary-key chunks so live tables are never "
+        "locked for long."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--only", action="append", choices=sorted(TASKS),
+                            help="Run just this task (repeatable). Default: all.")
+        parser.add_argument("--chunk-size", type=int, default=500, help="Rows (or files) per delete.")
+        parser.add_argument("--pause", type=float, default=0.05, help="Seconds to sleep between chunks.")
+        parser.add_argument("--dry-run", action="store_true", help="Count what would be deleted.")
+        parser.add_argument("--loop", action="store_true", help="Keep running, every --interval seconds.")
+        parser.add_argument("--interval", type=float, default=3600.0)
+
+    def handle(self, *args, **opts):
+        names = opts["only"] or list(TASKS)
+        verb = "Would delete" if opts["dry_run"] else "Deleted"
+        while True:
+            for name in names:
+                start = time.perf_counter()
+                count = TASKS[name](chunk_size=opts["chunk_size"], pause=opts["pause"], dry_run=opts["dry_run"])
+                self.stdout.write(f"{name}: {verb} {count} in {time.perf_counter() - start:.1f}s")
+            if not opts["loop"]:
+                return
+            time.sleep(opts["interval"])
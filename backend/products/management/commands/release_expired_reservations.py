@@ -0,0 +1,27 @@
+# products/management/commands/release_expired_reservations.py
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from products.inventory import expire_reservations
+
+
+class Command(BaseCommand):
+    help = "Cancel pending orders whose stock reservation expired and put the stock back."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--loop", action="store_true", help="Keep running, checking every --interval seconds.")
+        parser.add_argument("--interval", type=float, default=60.0)
+
+    def handle(self, *args, **opts):
+        if not settings.STOCK_RESERVATION_EXPIRY_ENABLED:
+            self.stdout.write("STOCK_RESERVATION_EXPIRY_ENABLED is off; reservations are left alone.")
+        while True:
+            cancelled = expire_reservations()
+            while cancelled:
+                self.stdout.write(f"Cancelled {cancelled} expired order(s).")
+                cancelled = expire_reservations()
+            if not opts["loop"]:
+                return
+            time.sleep(opts["interval"])
@@ -0,0 +1,218 @@
+# products/management/commands/seed_catalog.py
+import random
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.core.files.storage import default_storage
+from django.core.management.base import BaseCommand
+from django.db import models, transaction
+
+from catalog.registry import CATEGORIES
+from mailer.models import OutboundEmail
+from products.models import Cart, CartItem, Order, OrderItem, Product
+
+BENCH_PREFIX = "Bench"
+BENCH_EMAIL_DOMAIN = "bench.invalid"
+BENCH_PASSWORD = "bench-Passw0rd!"
+SEED_IMAGE = "products/food.jpg"
+
+# OutboundEmail tags that checkout and reservation expiry attach to an order's mail.
+ORDER_MAIL_TAGS = ("receipt:{}", "order-expired:{}")
+
+
+def delete_orders(orders, chunk_size=1000):
+    """Delete `orders` with their items, receipt PDFs and mail (spooled or sent)."""
+    ids = list(orders.values_list("id", flat=True))
+    for i in range(0, len(ids), chunk_size):
+        chunk = ids[i:i + chunk_size]
+        receipts = Order.objects.filter(id__in=chunk).exclude(receipt_pdf="").exclude(receipt_pdf=None)
+        for name in receipts.values_list("receipt_pdf", flat=True):
+            default_storage.delete(name)
+        OutboundEmail.objects.filter(tag__in=[t.format(pk) for pk in chunk for t in ORDER_MAIL_TAGS]).delete()
+        OrderItem.objects.filter(order_id__in=chunk).delete()
+        Order.objects.filter(id__in=chunk).delete()
+    return len(ids)
+
+
+def _specs_text(rng):
+    bits = [
+        f"{rng.choice([2, 3, 4, 6, 8, 12, 16])}GB RAM",
+        f"{rng.choice([32, 64, 128, 256, 512])}GB Storage",
+        f"{rng.choice([3000, 4000, 5000, 6000])}mAh",
+        f"{rng.choice([8, 13, 48, 50, 108])}MP Camera",
+        f'{rng.choice(["6.1", "6.5", "6.7", "10.1", "11"])}" Display',
+    ]
+    rng.shuffle(bits)
+    return ", ".join(bits[:rng.randint(2, 5)])
+
+
+def _value_for(field, rng, label, i):
+    """Plausible random value for one model field (None = leave to the default)."""
+    if field.name == "name":
+        return f"{BENCH_PREFIX} {label} {i}"
+    if field.name == "slug":
+        return f"bench-{label.lower()}-{i}"
+    if field.name == "specs_text":
+        return _specs_text(rng)
+    if field.choices:
+        return rng.choice([c[0] for c in field.choices])
+    if isinstance(field, models.ImageField):
+        return SEED_IMAGE
+    if isinstance(field, models.BooleanField):
+        return rng.random() < 0.5
+    if isinstance(field, models.DecimalField):
+        return Decimal(f"{rng.uniform(5, 75):.1f}")
+    if isinstance(field, (models.PositiveIntegerField, models.PositiveSmallIntegerField)):
+        if field.name.startswith(("price_min", "new_price")):
+            return rng.randint(1_000, 250_000)
+        if field.null and rng.random() < 0.2:
+            return None
+        if isinstance(field, models.PositiveSmallIntegerField):
+            return rng.randint(1, 512)
+        return rng.randint(1, 100_000)
+    if isinstance(field, models.CharField) and not field.blank:
+        return f"{field.name}-{i}"[:field.max_length]
+    return None
+
+
+class Command(BaseCommand):
+    help = (
+        "Seed benchmark data: SCALE rows per category model (each with its Product), "
+        "plus bench users, carts and orders. Rows are marked with a 'Bench' name prefix "
+        "and the bench.invalid email domain so --clear can remove them again."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--scale", type=int, default=1000, help="Rows per category model (e.g. 1000, 10000, 100000).")
+        parser.add_argument("--users", type=int, default=None, help="Bench users (default: scale // 100, min 10).")
+        parser.add_argument("--orders", type=int, default=None, help="Orders (default: scale // 10).")
+        parser.add_argument("--seed", type=int, default=42)
+        parser.add_argument("--batch-size", type=int, default=2000)
+        parser.add_argument("--clear", action="store_true", help="Delete previously seeded bench rows first.")
+
+    def handle(self, *args, **opts):
+        rng = random.Random(opts["seed"])
+        scale, batch = opts["scale"], opts["batch_size"]
+
+        if opts["clear"]:
+            self._clear()
+
+        for category in CATEGORIES:
+            self._seed_category(category.model, scale, batch, rng)
+            self.stdout.write(f"{category.model_path}: {scale} rows")
+
+        n_users = opts["users"] if opts["users"] is not None else max(10, scale // 100)
+        n_orders = opts["orders"] if opts["orders"] is not None else scale // 10
+        users = self._seed_users(n_users)
+        self._seed_carts_and_orders(users, n_orders, batch, rng)
+        self.stdout.write(self.style.SUCCESS(f"Seeded {len(users)} users, {n_orders} orders."))
+
+    def _clear(self):
+        User = get_user_model()
+        bench_users = User.objects.filter(email__endswith=f"@{BENCH_EMAIL_DOMAIN}")
+        delete_orders(Order.objects.filter(user__in=bench_users))
+        bench_users.delete()
+        for category in CATEGORIES:
+            category.model.objects.filter(name__startswith=f"{BENCH_PREFIX} ").delete()
+        OrderItem.objects.filter(product__name__startswith=f"{BENCH_PREFIX} ").delete()
+        Product.objects.filter(name__startswith=f"{BENCH_PREFIX} ").delete()
+        self.stdout.write("Cleared previous bench data.")
+
+    def _seed_category(self, model, scale, batch, rng):
+        label = model.__name__
+        fields = [
+            f for f in model._meta.concrete_fields
+            if not f.primary_key and not f.is_relation and f.name not in ("created_at",)
+        ]
+        start = model.objects.filter(name__startswith=f"{BENCH_PREFIX} {label} ").count()
+        for lo in range(start, start + scale, batch):
+            hi = min(lo + batch, start + scale)
+            rows = []
+            for i in range(lo, hi):
+                kwargs = {}
+                for f in fields:
+                    v = _value_for(f, rng, label, i)
+                    if v is not None:
+                        kwargs[f.name] = v
+                if "price_max_ksh" in kwargs and "price_min_ksh" in kwargs:
+                    kwargs["price_max_ksh"] = kwargs["price_min_ksh"] + rng.randint(0, 20_000)
+                rows.append(model(**kwargs))
+
+            with transaction.atomic():
+                # bulk_create skips post_save, so link Products here (the signal's job normally).
+                Product.objects.bulk_create([
+                    Product(
+                        name=r.name[:200],
+                        brand=getattr(r, "brand", "") or "",
+                        price=getattr(r, "price_min_ksh", None) or getattr(r, "new_price_ksh", 0),
+                        desc=getattr(r, "specs_text", "") or "",
+                        image=SEED_IMAGE,
+                    )
+                    for r in rows
+                ], batch_size=batch)
+                ids = dict(
+                    Product.objects.filter(name__in=[r.name[:200] for r in rows]).values_list("name", "id")
+                )
+                for r in rows:
+                    r.product_id = ids.get(r.name[:200])
+                model.objects.bulk_create(rows, batch_size=batch)
+
+    def _seed_users(self, n):
+        User = get_user_model()
+        existing = set(
+            User.objects.filter(email__endswith=f"@{BENCH_EMAIL_DOMAIN}").values_list("email", flat=True)
+        )
+        # Hash once; every bench user shares the password.
+        proto = User(username="proto")
+        proto.set_password(BENCH_PASSWORD)
+        new = [
+            User(username=f"bench{i}", email=f"bench{i}@{BENCH_EMAIL_DOMAIN}", password=proto.password)
+            for i in range(n)
+            if f"bench{i}@{BENCH_EMAIL_DOMAIN}" not in existing
+        ]
+        User.objects.bulk_create(new, batch_size=1000)
+        return list(User.objects.filter(email__endswith=f"@{BENCH_EMAIL_DOMAIN}"))
+
+    def _seed_carts_and_orders(self, users, n_orders, batch, rng):
+        product_ids = list(
+            Product.objects.filter(name__startswith=f"{BENCH_PREFIX} ").values_list("id", "price")[:50_000]
+        )
+        if not product_ids:
+            return
+
+        Cart.objects.bulk_create([Cart(user=u) for u in users], ignore_conflicts=True)
+        carts = list(Cart.objects.filter(user__in=users))
+        CartItem.objects.filter(cart__in=carts).delete()
+        items = []
+        for cart in carts:
+            for pid, _ in rng.sample(product_ids, min(3, len(product_ids))):
+                items.append(CartItem(cart=cart, product_id=pid, quantity=rng.randint(1, 3)))
+        CartItem.objects.bulk_create(items, batch_size=batch)
+
+        for lo in range(0, n_orders, batch):
+            hi = min(lo + batch, n_orders)
+            with transaction.atomic():
+                orders, lines = [], []
+                for i in range(lo, hi):
+                    chosen = rng.sample(product_ids, min(rng.randint(1, 3), len(product_ids)))
+                    order_lines = [(pid, Decimal(price), rng.randint(1, 3)) for pid, price in chosen]
+                    subtotal = sum(p * q for _, p, q in order_lines)
+                    orders.append(Order(
+                        user=rng.choice(users),
+                        subtotal=subtotal, total=subtotal,
+                        payment_method=rng.choice([c[0] for c in Order.PAYMENT_CHOICES]),
+                        status=rng.choice([c[0] for c in Order.STATUS_CHOICES]),
+                        ship_full_name="Bench Buyer", ship_phone="0700000000",
+                        ship_address1="1 Bench Rd", ship_city="Nairobi",
+                        receipt_number=f"B-{rng.getrandbits(48):012x}",
+                    ))
+                    lines.append(order_lines)
+                Order.objects.bulk_create(orders, batch_size=batch)
+                numbers = [o.receipt_number for o in orders]
+                by_number = dict(Order.objects.filter(receipt_number__in=numbers).values_list("receipt_number", "id"))
+                OrderItem.objects.bulk_create([
+                    OrderItem(order_id=by_number[o.receipt_number], product_id=pid, name=f"item {pid}",
+                              unit_price=price, quantity=qty, line_total=price * qty)
+                    for o, order_lines in zip(orders, lines)
+                    for pid, price, qty in order_lines
+                ], batch_size=batch)
@@ -0,0 +1,77 @@
+# products/management/commands/simulate_checkout_contention.py
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from django.test import Client
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from authapp.authentication import add_user_claims
+from products.models import Cart, CartItem, Order, OrderItem, Product
+from products.management.commands.bench_api import CHECKOUT_PAYLOAD, bench_settings
+from products.management.commands.seed_catalog import BENCH_EMAIL_DOMAIN, BENCH_PREFIX, delete_orders
+
+
+class Command(BaseCommand):
+    help = (
+        "Fire BUYERS parallel checkouts at one product with STOCK units and verify "
+        "nothing is oversold. Use a real database server (MySQL) for meaningful "
+        "concurrency; SQLite serializes writers. The users, product and orders it "
+        "creates are deleted again afterwards."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--buyers", type=int, default=200)
+        parser.add_argument("--stock", type=int, default=50)
+        parser.add_argument("--workers", type=int, default=50, help="Concurrent threads.")
+
+    def handle(self, *args, **opts):
+        buyers, stock = opts["buyers"], opts["stock"]
+        product = Product.objects.create(name=f"{BENCH_PREFIX} contention item", price=Decimal("100.00"), stock=stock)
+
+        User = get_user_model()
+        prefix = f"contention{product.pk}-"
+        User.objects.bulk_create([
+            User(username=f"{prefix}{i}", email=f"{prefix}{i}@{BENCH_EMAIL_DOMAIN}")
+            for i in range(buyers)
+        ])
+        users = User.objects.filter(username__startswith=prefix)
+        try:
+            self._run(product, users, stock, opts["workers"])
+        finally:
+            delete_orders(Order.objects.filter(user__in=users))
+            users.delete()
+            product.delete()
+
+    def _run(self, product, users, stock, workers):
+        Cart.objects.bulk_create([Cart(user=u) for u in users])
+        carts = Cart.objects.filter(user__in=users)
+        CartItem.objects.bulk_create([CartItem(cart=c, product=product, quantity=1) for c in carts])
+        tokens = [str(add_user_claims(RefreshToken.for_user(u), u).access_token) for u in users]
+
+        def checkout(token):
+            try:
+                # raise_request_exception=False: the test client's exception hook is
+                # process-wide, so one thread's error would be re-raised in another.
+                client = Client(raise_request_exception=False, HTTP_AUTHORIZATION=f"Bearer {token}")
+                return client.post("/api/checkout/", CHECKOUT_PAYLOAD, content_type="application/json").status_code
+            except Exception as e:  # e.g. "database is locked" on SQLite
+                return type(e).__name__
+            finally:
+                connections.close_all()
+
+        with bench_settings():
+            with ThreadPoolExecutor(workers) as pool:
+                outcomes = Counter(pool.map(checkout, tokens))
+
+        product.refresh_from_db()
+        sold = sum(OrderItem.objects.filter(product=product).values_list("quantity", flat=True))
+        self.stdout.write(f"Outcomes: {dict(outcomes)}")
+        self.stdout.write(f"Initial stock {stock}, sold {sold}, remaining {product.stock}")
+
+        if sold > stock or sold + product.stock != stock:
+            raise CommandError("Oversold: stock ledger and orders disagree.")
+        self.stdout.write(self.style.SUCCESS("No overselling."))
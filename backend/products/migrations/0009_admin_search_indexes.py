@@ -0,0 +1,31 @@
+# Generated by Django 4.2.4 on 2026-10-19 18:43
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0008_order_user_created_idx'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='product',
+            name='brand',
+            field=models.CharField(blank=True, db_index=True, max_length=120),
+        ),
+        migrations.AlterField(
+            model_name='product',
+            name='name',
+            field=models.CharField(db_index=True, max_length=200),
+        ),
+        migrations.AddIndex(
+            model_name='order',
+            index=models.Index(fields=['ship_phone'], name='order_ship_phone_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='order',
+            index=models.Index(fields=['ship_full_name'], name='order_ship_name_idx'),
+        ),
+    ]
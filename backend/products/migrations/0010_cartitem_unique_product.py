@@ -0,0 +1,33 @@
+# Generated by Django 4.2.4 on 2026-10-19 18:48
+
+from django.db import migrations, models
+from django.db.models import Count, Min, Sum
+
+
+def merge_duplicate_cart_items(apps, schema_editor):
+    """Fold duplicate (cart, product) rows into the oldest one before the constraint goes on."""
+    CartItem = apps.get_model("products", "CartItem")
+    dupes = (
+        CartItem.objects.values("cart_id", "product_id")
+        .annotate(n=Count("id"), keep=Min("id"), total=Sum("quantity"))
+        .filter(n__gt=1)
+    )
+    for row in dupes.iterator():
+        rows = CartItem.objects.filter(cart_id=row["cart_id"], product_id=row["product_id"])
+        rows.filter(id=row["keep"]).update(quantity=row["total"])
+        rows.exclude(id=row["keep"]).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0009_admin_search_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(merge_duplicate_cart_items, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='cartitem',
+            constraint=models.UniqueConstraint(fields=('cart', 'product'), name='uniq_cart_item_product'),
+        ),
+    ]
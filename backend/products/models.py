@@ -5,13 +5,16 @@ from django.utils import timezone
 from django.core.files.base import ContentFile
 
 class Product(models.Model):
-    name = models.CharField(max_length=200)
-    brand = models.CharField(max_length=120, blank=True)
+    name = models.CharField(max_length=200, db_index=True)
+    brand = models.CharField(max_length=120, blank=True, db_index=True)
     price = models.DecimalField(max_digits=12, decimal_places=2)
     old_price = models.DecimalField(max_digits=12, decimal_places=2, null=True, blank=True)
     discount = models.CharField(max_length=50, blank=True)  # e.g., "10% OFF"
     desc = models.TextField(blank=True)
     image = models.ImageField(upload_to="products/", null=True, blank=True)
+    # Units on hand; NULL means stock isn't tracked for this product (never sells out).
+    # Decremented atomically at checkout, see products.inventory.
+    stock = models.PositiveIntegerField(null=True, blank=True)
 
     created_at = models.DateTimeField(auto_now_add=True)
 
@@ -28,6 +31,8 @@ class Cart(models.Model):
     """
     user = models.OneToOneField(settings.AUTH_USER_MODEL, on_delete=models.CASCADE)
     created_at = models.DateTimeField(auto_now_add=True)
+    # Bumped by every cart mutation (products.cart); idle carts are purged by cleanup_stale_data.
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
 
     def __str__(self):
         return f"Cart for {self.user.username}"
@@ -47,6 +52,11 @@ class CartItem(models.Model):
     product = models.ForeignKey(Product, on_delete=models.CASCADE)
     quantity = models.PositiveIntegerField(default=1)
 
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["cart", "product"], name="uniq_cart_item_product"),
+        ]
+
     def __str__(self):
         return f"{self.quantity} x {self.product.name}"
 
@@ -111,6 +121,13 @@ class Order(models.Model):
 
     class Meta:
         ordering = ["-created_at"]
+        indexes = [
+            # Order history (/api/orders/): one range scan per page, however many orders a user has.
+            models.Index(fields=["user", "-created_at", "-id"], name="order_user_created_idx"),
+            # Admin search (exact phone, name prefix).
+            models.Index(fields=["ship_phone"], name="order_ship_phone_idx"),
+            models.Index(fields=["ship_full_name"], name="order_ship_name_idx"),
+        ]
 
     def __str__(self):
         return f"Order #{self.pk} ({self.status})"
@@ -126,3 +143,67 @@ class OrderItem(models.Model):
 
     def __str__(self):
         return f"{self.name} x {self.quantity}"
+
+
+# 📦 Stock reservations
+
+class StockReservation(models.Model):
+    """
+    Units taken off Product.stock for an order.
+    HELD until the order is paid/fulfilled (COMMITTED) or cancelled/expired (RELEASED,
+    units go back on the shelf). expires_at is empty for orders that never expire (COD).
+    """
+    STATUS_HELD = "held"
+    STATUS_COMMITTED = "committed"
+    STATUS_RELEASED = "released"
+    STATUS_CHOICES = [
+        (STATUS_HELD, "Held"),
+        (STATUS_COMMITTED, "Committed"),
+        (STATUS_RELEASED, "Released"),
+    ]
+
+    product = models.ForeignKey(Product, on_delete=models.CASCADE, related_name="reservations")
+    order = models.ForeignKey(Order, on_delete=models.CASCADE, related_name="reservations")
+    quantity = models.PositiveIntegerField()
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=STATUS_HELD)
+    expires_at = models.DateTimeField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [models.Index(fields=["status", "expires_at"])]
+
+    def __str__(self):
+        return f"{self.quantity} x {self.product_id} for order {self.order_id} ({self.status})"
+
+
+# 🔁 Checkout idempotency
+
+class IdempotencyKey(models.Model):
+    """
+    First response to a POST /api/checkout/ carrying an Idempotency-Key header.
+    A retry with the same key gets the stored response instead of a second order.
+    """
+    STATUS_IN_PROGRESS = "in_progress"
+    STATUS_COMPLETED = "completed"
+    STATUS_CHOICES = [
+        (STATUS_IN_PROGRESS, "In progress"),
+        (STATUS_COMPLETED, "Completed"),
+    ]
+
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name="idempotency_keys")
+    key = models.CharField(max_length=64)
+    request_hash = models.CharField(max_length=64)
+    status = models.CharField(max_length=12, choices=STATUS_CHOICES, default=STATUS_IN_PROGRESS)
+    response_status = models.PositiveSmallIntegerField(null=True, blank=True)
+    response_body = models.JSONField(null=True, blank=True)
+    order = models.ForeignKey(Order, null=True, blank=True, on_delete=models.SET_NULL, related_name="+")
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["user", "key"], name="uniq_idempotency_key_per_user"),
+        ]
+        indexes = [models.Index(fields=["created_at"])]
+
+    def __str__(self):
+        return f"{self.key} ({self.status})"
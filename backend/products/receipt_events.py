@@ -0,0 +1,178 @@
+# products/receipt_events.py
+"""
+Waiting for an order's receipt PDF on the server instead of the client polling.
+
+A waiter registers for an order id and is woken by `notify_receipt_ready`
+(fired after commit when ensure_receipt_pdf saves the file). The PDF is
+rendered by whichever worker process placed the order, so with
+RECEIPT_EVENTS_REDIS_URL set the notification is also published on Redis and
+a listener thread in every process relays it to that process's waiters.
+Waiters re-check the order row only every RECEIPT_WAIT_POLL_SECONDS, as a
+safety net for a missed message; the browser holds one connection instead of
+sending a request (JWT check + Order query) every few seconds.
+"""
+import asyncio
+import logging
+import threading
+import time
+from collections import defaultdict
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+
+from .models import Order
+
+logger = logging.getLogger(__name__)
+
+CHANNEL = "receipt-ready"
+LISTENER_RETRY_SECONDS = 5
+
+
+class _Waiters:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._by_order = defaultdict(set)
+
+    def add(self, order_id, callback):
+        with self._lock:
+            self._by_order[order_id].add(callback)
+
+    def discard(self, order_id, callback):
+        with self._lock:
+            callbacks = self._by_order.get(order_id)
+            if callbacks is not None:
+                callbacks.discard(callback)
+                if not callbacks:
+                    del self._by_order[order_id]
+
+    def notify(self, order_id):
+        with self._lock:
+            callbacks = list(self._by_order.get(order_id, ()))
+        for callback in callbacks:
+            callback()
+
+
+_waiters = _Waiters()
+
+_client = None
+_listener = None
+_lock = threading.Lock()
+
+
+def _redis():
+    """Client for RECEIPT_EVENTS_REDIS_URL, or None when notifications stay in-process."""
+    global _client
+    url = getattr(settings, "RECEIPT_EVENTS_REDIS_URL", "")
+    if not url:
+        return None
+    if _client is None:
+        with _lock:
+            if _client is None:
+                try:
+                    import redis
+                except ImportError:
+                    raise ImproperlyConfigured("RECEIPT_EVENTS_REDIS_URL requires the 'redis' package.")
+                _client = redis.Redis.from_url(url)
+    return _client
+
+
+class _Listener(threading.Thread):
+    """Relays readiness published by other processes to this process's waiters."""
+
+    def __init__(self, client):
+        super().__init__(name="receipt-events", daemon=True)
+        self.client = client
+        self.subscribed = threading.Event()
+        self.stopped = threading.Event()
+
+    def run(self):
+        while not self.stopped.is_set():
+            pubsub = self.client.pubsub(ignore_subscribe_messages=True)
+            try:
+                pubsub.subscribe(CHANNEL)
+                self.subscribed.set()
+                while not self.stopped.is_set():
+                    message = pubsub.get_message(timeout=1.0)
+                    if message is not None:
+                        _waiters.notify(int(message["data"]))
+            except Exception:
+                # Waiters still see the receipt through their periodic re-check.
+                logger.exception("Receipt event subscription failed; retrying in %ss", LISTENER_RETRY_SECONDS)
+                self.subscribed.clear()
+                self.stopped.wait(LISTENER_RETRY_SECONDS)
+            finally:
+                pubsub.close()
+
+
+def _ensure_listener():
+    global _listener
+    client = _redis()
+    if client is None or _listener is not None:
+        return
+    with _lock:
+        if _listener is None:
+            _listener = _Listener(client)
+            _listener.start()
+
+
+def notify_receipt_ready(order_id):
+    """Wake the waiters for `order_id` in this process and, through Redis, in the others."""
+    _waiters.notify(order_id)
+    client = _redis()
+    if client is None:
+        return
+    try:
+        client.publish(CHANNEL, order_id)
+    except Exception:
+        logger.warning("Could not publish receipt readiness for order %s", order_id, exc_info=True)
+
+
+def receipt_ready(order_id):
+    return bool(Order.objects.filter(pk=order_id).values_list("receipt_pdf", flat=True).first())
+
+
+def wait_for_receipt(order_id, timeout):
+    """Block up to `timeout` seconds; True once the receipt exists."""
+    _ensure_listener()
+    event = threading.Event()
+    _waiters.add(order_id, event.set)
+    try:
+        deadline = time.monotonic() + timeout
+        while True:
+            if receipt_ready(order_id):
+                return True
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return False
+            event.wait(min(remaining, settings.RECEIPT_WAIT_POLL_SECONDS))
+            event.clear()
+    finally:
+        _waiters.discard(order_id, event.set)
+
+
+async def await_receipt(order_id, timeout):
+    """wait_for_receipt for async views: no thread is held while waiting."""
+    _ensure_listener()
+    loop = asyncio.get_running_loop()
+    event = asyncio.Event()
+
+    def wake():
+        loop.call_soon_threadsafe(event.set)
+
+    _waiters.add(order_id, wake)
+    try:
+        deadline = loop.time() + timeout
+        while True:
+            if await sync_to_async(receipt_ready)(order_id):
+                return True
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                return False
+            try:
+                await asyncio.wait_for(event.wait(), min(remaining, settings.RECEIPT_WAIT_POLL_SECONDS))
+            except asyncio.TimeoutError:
+                pass
+            event.clear()
+    finally:
+        _waiters.discard(order_id, wake)
@@ -4,12 +4,12 @@ from io import BytesIO
 import logging
 from django.template.loader import render_to_string
 from django.template import TemplateDoesNotExist
-from django.core.mail import EmailMessage
-from django.conf import settings
 from django.utils import timezone
 from django.core.files.base import ContentFile
 from xhtml2pdf import pisa
 
+from mailer.queue import enqueue_mail
+
 logger = logging.getLogger(__name__)
 
 
@@ -70,10 +70,13 @@ def ensure_receipt_pdf(order, *, regenerate: bool = False) -> None:
 
 def send_receipt_email(order, to_email: str) -> None:
     """
-    Send an email with the receipt PDF attached.
+    Queue an email with the receipt PDF attached (delivered by the mailer worker).
+    order.receipt_sent_at is set once the message actually goes out
+    (see products.signals.mark_receipt_sent).
 
     Raises:
-        Any email backend exception (SMTP, etc.) if sending fails.
+        ValueError: if the receipt PDF can't be rendered.
+        Any email backend exception when MAIL_QUEUE_ENABLED is off (inline send).
     """
     subject = f"Your JONTECH receipt {order.receipt_number or f'#{order.id}'}"
     body_lines = [
@@ -88,30 +91,24 @@ def send_receipt_email(order, to_email: str) -> None:
         "",
         "— JONTECH",
     ]
-    from_addr = settings.DEFAULT_FROM_EMAIL or settings.EMAIL_HOST_USER
-
-    msg = EmailMessage(
-        subject=subject,
-        body="\n".join(body_lines),
-        from_email=from_addr,
-        to=[to_email],
-    )
 
     # Make sure the PDF exists
     ensure_receipt_pdf(order)
 
-    # Attach the PDF
+    attachments = []
     if order.receipt_pdf:
-        with order.receipt_pdf.open("rb") as f:
-            content = f.read()
-        filename = order.receipt_pdf.name.split("/")[-1]
-        msg.attach(filename, content, "application/pdf")
+        attachments.append({
+            "path": order.receipt_pdf.name,
+            "filename": order.receipt_pdf.name.split("/")[-1],
+            "mimetype": "application/pdf",
+        })
     else:
         logger.warning("Order %s has no receipt_pdf after ensure_receipt_pdf.", order.id)
 
-    # Send email (will honor EMAIL_BACKEND/SMTP settings)
-    msg.send(fail_silently=False)
-
-    # Mark as sent
-    order.receipt_sent_at = timezone.now()
-    order.save(update_fields=["receipt_sent_at"])
+    enqueue_mail(
+        subject,
+        "\n".join(body_lines),
+        [to_email],
+        attachments=attachments,
+        tag=f"receipt:{order.id}",
+    )
@@ -1,7 +1,8 @@
 from rest_framework import serializers
+from backend.metrics import TimedModelSerializer
 from .models import Product, Cart, CartItem, Order, OrderItem
 
-class ProductSerializer(serializers.ModelSerializer):
+class ProductSerializer(TimedModelSerializer):
     class Meta:
         model = Product
         fields = [
@@ -13,11 +14,12 @@ class ProductSerializer(serializers.ModelSerializer):
             "discount",
             "desc",
             "image",
+            "stock",
             "created_at",
         ]
 
 
-class CartItemSerializer(serializers.ModelSerializer):
+class CartItemSerializer(TimedModelSerializer):
     product = ProductSerializer(read_only=True)
     product_id = serializers.PrimaryKeyRelatedField(
         queryset=Product.objects.all(), source="product", write_only=True
@@ -28,7 +30,7 @@ class CartItemSerializer(serializers.ModelSerializer):
         fields = ["id", "product", "product_id", "quantity"]
 
 
-class CartSerializer(serializers.ModelSerializer):
+class CartSerializer(TimedModelSerializer):
     items = CartItemSerializer(many=True, read_only=True)
 
     class Meta:
@@ -38,13 +40,37 @@ class CartSerializer(serializers.ModelSerializer):
 
 # Orders
 
-class OrderItemSerializer(serializers.ModelSerializer):
+class OrderItemSerializer(TimedModelSerializer):
     class Meta:
         model = OrderItem
         fields = ["product", "name", "unit_price", "quantity", "line_total"]
 
 
-class OrderSerializer(serializers.ModelSerializer):
+class OrderSummarySerializer(TimedModelSerializer):
+    """One row of the order history; counts come from SQL annotations (see OrderListView)."""
+    item_count = serializers.IntegerField(read_only=True)
+    unit_count = serializers.IntegerField(read_only=True)
+    has_receipt = serializers.SerializerMethodField()
+
+    def get_has_receipt(self, obj):
+        return bool(obj.receipt_pdf)
+
+    class Meta:
+        model = Order
+        fields = [
+            "id",
+            "status",
+            "total",
+            "payment_method",
+            "created_at",
+            "receipt_number",
+            "item_count",
+            "unit_count",
+            "has_receipt",
+        ]
+
+
+class OrderSerializer(TimedModelSerializer):
     items = OrderItemSerializer(many=True, read_only=True)
     receipt_number = serializers.CharField(read_only=True)
     receipt_pdf_url = serializers.SerializerMethodField()
@@ -0,0 +1,35 @@
+# products/signals.py
+from django.db import transaction
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from mailer.signals import email_sent
+from .inventory import commit_reservations, release_reservations
+from .models import Order
+from .receipt_events import notify_receipt_ready
+
+
+@receiver(email_sent)
+def mark_receipt_sent(sender, email, tag, **kwargs):
+    if not tag.startswith("receipt:"):
+        return
+    Order.objects.filter(pk=tag.split(":", 1)[1]).update(receipt_sent_at=email.sent_at or timezone.now())
+
+
+@receiver(post_save, sender=Order)
+def settle_stock_reservations(sender, instance, created, **kwargs):
+    if created:
+        return
+    if instance.status in (Order.STATUS_PAID, Order.STATUS_FULFILLED):
+        commit_reservations(instance)
+    elif instance.status == Order.STATUS_CANCELLED:
+        release_reservations(instance)
+
+
+@receiver(post_save, sender=Order)
+def announce_receipt(sender, instance, update_fields=None, **kwargs):
+    if update_fields is None or "receipt_pdf" not in update_fields or not instance.receipt_pdf:
+        return
+    order_id = instance.pk
+    transaction.on_commit(lambda: notify_receipt_ready(order_id))
@@ -1,3 +1,477 @@
-from django.test import TestCase
+import asyncio
+import contextlib
+import io
+import os
+import tempfile
+import threading
+import time
+from datetime import timedelta
+from unittest import mock, skipIf
 
-# Create your tests here.
+from django.contrib.auth import get_user_model
+from django.core.files.base import ContentFile
+from django.core.management import call_command
+from django.db import IntegrityError, connection
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from authapp.authentication import add_user_claims
+from mailer.models import OutboundEmail
+
+from . import cart as cart_ops, guest_cart, idempotency, maintenance, receipt_events
+from .inventory import OutOfStock, expire_reservations, reserve_stock
+from .management.commands.seed_catalog import BENCH_EMAIL_DOMAIN
+from .models import Cart, CartItem, IdempotencyKey, Order, OrderItem, Product, StockReservation
+
+try:
+    import fakeredis
+except ImportError:  # optional: only the cross-process receipt test needs it
+    fakeredis = None
+
+
+def make_order(user, payment_method=Order.PAYMENT_MPESA, **kwargs):
+    order = Order.objects.create(
+        user=user, payment_method=payment_method, ship_full_name="Jane Doe", ship_phone="0700000000",
+        ship_address1="Moi Avenue", ship_city="Nairobi", **kwargs,
+    )
+    order.receipt_number = f"R-TEST-{order.pk:06d}"
+    order.save(update_fields=["receipt_number"])
+    return order
+
+
+class ReservationExpiryTests(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user("jane", "jane@example.com", "pw")
+        self.product = Product.objects.create(name="Phone", price=100, stock=5)
+
+    def _reserve(self, qty=2):
+        order = make_order(self.user)
+        reserve_stock(order, [{"product": self.product, "quantity": qty}])
+        return order
+
+    @override_settings(STOCK_RESERVATION_EXPIRY_ENABLED=False)
+    def test_disabled_holds_unpaid_orders(self):
+        order = self._reserve()
+        self.assertIsNone(StockReservation.objects.get(order=order).expires_at)
+
+        StockReservation.objects.filter(order=order).update(expires_at=timezone.now() - timedelta(minutes=1))
+        self.assertEqual(expire_reservations(), 0)
+        order.refresh_from_db()
+        self.assertEqual(order.status, Order.STATUS_PENDING)
+
+    @override_settings(STOCK_RESERVATION_EXPIRY_ENABLED=True, STOCK_RESERVATION_MINUTES=30)
+    def test_expired_order_is_cancelled_restocked_and_customer_told(self):
+        order = self._reserve()
+        self.assertIsNotNone(StockReservation.objects.get(order=order).expires_at)
+        self.assertEqual(expire_reservations(), 0)  # not due yet
+
+        self.assertEqual(expire_reservations(now=timezone.now() + timedelta(minutes=31)), 1)
+        order.refresh_from_db()
+        self.product.refresh_from_db()
+        self.assertEqual(order.status, Order.STATUS_CANCELLED)
+        self.assertEqual(self.product.stock, 5)
+        email = OutboundEmail.objects.get(tag=f"order-expired:{order.pk}")
+        self.assertEqual(email.to, ["jane@example.com"])
+
+    @override_settings(STOCK_RESERVATION_EXPIRY_ENABLED=True)
+    def test_cod_orders_never_expire(self):
+        order = make_order(self.user, payment_method=Order.PAYMENT_COD)
+        reserve_stock(order, [{"product": self.product, "quantity": 1}])
+        self.assertIsNone(StockReservation.objects.get(order=order).expires_at)
+
+
+class ReserveStockTests(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user("jane", "jane@example.com", "pw")
+
+    def test_stale_read_cannot_oversell(self):
+        # Both checkouts read stock=1 before either reserves, as racing requests would.
+        product = Product.objects.create(name="Phone", price=100, stock=1)
+        first, second = make_order(self.user), make_order(self.user)
+        reserve_stock(first, [{"product": product, "quantity": 1}])
+        with self.assertRaises(OutOfStock):
+            reserve_stock(second, [{"product": product, "quantity": 1}])
+        product.refresh_from_db()
+        self.assertEqual(product.stock, 0)
+        self.assertFalse(StockReservation.objects.filter(order=second).exists())
+
+    def test_untracked_stock_is_never_out(self):
+        product = Product.objects.create(name="Cable", price=10, stock=None)
+        reserve_stock(make_order(self.user), [{"product": product, "quantity": 50}])
+        product.refresh_from_db()
+        self.assertIsNone(product.stock)
+        self.assertFalse(StockReservation.objects.exists())
+
+
+class CartWriteRetryTests(TestCase):
+    # Writes made by the mocks stand in for another connection's committed work,
+    # so they mustn't be undone with the savepoint the failed write rolls back.
+    no_savepoint = mock.patch("products.cart.transaction", atomic=contextlib.nullcontext)
+
+    def setUp(self):
+        self.cart = Cart.objects.create(user=get_user_model().objects.create_user("jane", "jane@example.com", "pw"))
+        self.product = Product.objects.create(name="Phone", price=100)
+
+    def test_add_retries_against_a_racing_insert(self):
+        create = CartItem.objects.create
+
+        def racing_create(**kwargs):
+            create(**kwargs)  # the other request's row lands first
+            raise IntegrityError("UNIQUE constraint failed")
+
+        with self.no_savepoint, mock.patch.object(CartItem.objects, "create", side_effect=racing_create):
+            cart_ops.apply_delta(self.cart, self.product.pk, 2)
+        self.assertEqual(CartItem.objects.get(cart=self.cart).quantity, 4)
+
+    def test_add_reraises_other_integrity_errors(self):
+        failing = mock.patch.object(CartItem.objects, "create", side_effect=IntegrityError("FOREIGN KEY constraint failed"))
+        with failing as create, self.assertRaises(IntegrityError):
+            cart_ops.apply_delta(self.cart, self.product.pk, 1)
+        self.assertEqual(create.call_count, 1)
+
+    def test_batch_with_a_deleted_product_is_invalid(self):
+        def product_gone(cart, plan):
+            Product.objects.filter(pk=self.product.pk).delete()
+            raise IntegrityError("FOREIGN KEY constraint failed")
+
+        with self.no_savepoint, mock.patch("products.cart._apply_plan", side_effect=product_gone):
+            with self.assertRaises(cart_ops.InvalidOperations):
+                cart_ops.apply_operations(self.cart, [{"product_id": self.product.pk, "delta": 1}])
+
+    def test_batch_retries_are_bounded(self):
+        with mock.patch("products.cart._apply_plan", side_effect=IntegrityError) as apply_plan:
+            with self.assertRaises(IntegrityError):
+                cart_ops.apply_operations(self.cart, [{"product_id": self.product.pk, "delta": 1}])
+        self.assertEqual(apply_plan.call_count, cart_ops.MAX_WRITE_ATTEMPTS)
+
+
+class GuestCartMergeTests(TestCase):
+    def setUp(self):
+        self.cart = Cart.objects.create(user=get_user_model().objects.create_user("jane", "jane@example.com", "pw"))
+        self.phone = Product.objects.create(name="Phone", price=100)
+        self.case = Product.objects.create(name="Case", price=10)
+
+    def quantities(self):
+        return dict(CartItem.objects.filter(cart=self.cart).values_list("product_id", "quantity"))
+
+    def test_merging_twice_is_the_same_as_once(self):
+        CartItem.objects.create(cart=self.cart, product=self.phone, quantity=3)
+        items = {self.phone.pk: 1, self.case.pk: 2, 999999: 1}
+        guest_cart.merge_into_cart(self.cart, items)
+        guest_cart.merge_into_cart(self.cart, items)
+        self.assertEqual(self.quantities(), {self.phone.pk: 3, self.case.pk: 2})
+
+    def test_guest_quantity_wins_when_larger(self):
+        CartItem.objects.create(cart=self.cart, product=self.phone, quantity=1)
+        guest_cart.merge_into_cart(self.cart, {self.phone.pk: 4})
+        self.assertEqual(self.quantities(), {self.phone.pk: 4})
+
+
+# TransactionTestCase: sqlite defers foreign key checks to commit, which TestCase never reaches.
+class DeletedUserCartTests(TransactionTestCase):
+    def setUp(self):
+        user = get_user_model().objects.create_user("jane", "jane@example.com", "pw")
+        token = add_user_claims(RefreshToken.for_user(user), user).access_token
+        user.delete()
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {token}")
+
+    def test_cart_endpoints_answer_401(self):
+        requests = [
+            ("get", "/api/cart/", None),
+            ("patch", "/api/cart/", {"operations": []}),
+            ("post", "/api/cart/merge/", {}),
+        ]
+        for method, url, data in requests:
+            with self.subTest(method=method, url=url):
+                response = getattr(self.client, method)(url, data, format="json")
+                self.assertEqual(response.status_code, 401)
+                self.assertEqual(response.data["code"], "user_not_found")
+        self.assertFalse(Cart.objects.exists())
+
+
+SHIPPING = {"full_name": "Jane Doe", "phone": "0700000000", "address1": "Moi Avenue", "city": "Nairobi", "country": "Kenya"}
+
+
+@mock.patch("products.views._issue_receipt")
+class CheckoutConflictTests(TestCase):
+    """The two checkout 409s carry different codes; clients retry only the in-progress one."""
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user("jane", "jane@example.com", "pw")
+        self.product = Product.objects.create(name="Phone", price=100, stock=1)
+        CartItem.objects.create(cart=Cart.objects.create(user=self.user), product=self.product, quantity=1)
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.body = {"shipping": SHIPPING, "payment_method": "cod"}
+
+    def test_in_progress_key(self, _issue_receipt):
+        IdempotencyKey.objects.create(
+            user=self.user, key="abcdefgh1234", request_hash=idempotency.request_fingerprint(self.body),
+        )
+        response = self.client.post("/api/checkout/", self.body, format="json", HTTP_IDEMPOTENCY_KEY="abcdefgh1234")
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(response.data["code"], idempotency.IN_PROGRESS_CODE)
+
+    def test_out_of_stock(self, _issue_receipt):
+        # Sold elsewhere after this cart's pre-check read the stock.
+        with mock.patch("products.views.reserve_stock", side_effect=OutOfStock(self.product, 1)):
+            response = self.client.post("/api/checkout/", self.body, format="json", HTTP_IDEMPOTENCY_KEY="abcdefgh5678")
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(response.data["code"], "out_of_stock")
+        self.assertFalse(IdempotencyKey.objects.exists())  # released: a fixed cart may reuse the key
+
+
+# SQLite's test database locks whole tables under concurrent writers, so the race
+# only runs against a database server (MySQL); ReserveStockTests replays it step
+# by step everywhere. Set CHECKOUT_OVERSELL_BUYERS to change the crowd size.
+@skipIf(connection.vendor == "sqlite", "needs a database with concurrent writers (MySQL)")
+class CheckoutOversellTests(TransactionTestCase):
+    """Hundreds of parallel checkouts for a quarter as many units: none may oversell."""
+    buyers = int(os.getenv("CHECKOUT_OVERSELL_BUYERS", "300"))
+    workers = int(os.getenv("CHECKOUT_OVERSELL_WORKERS", "50"))
+
+    def test_parallel_checkouts_never_oversell(self):
+        stock = self.buyers // 4
+        out = io.StringIO()
+        call_command(
+            "simulate_checkout_contention", buyers=self.buyers, stock=stock, workers=self.workers, stdout=out,
+        )
+        self.assertIn(f"Initial stock {stock}, sold {stock}, remaining 0", out.getvalue())
+        self.assertIn("No overselling.", out.getvalue())
+        # The command removes what it created.
+        self.assertFalse(Order.objects.exists())
+        self.assertFalse(Product.objects.exists())
+
+
+class BenchCommandTests(TransactionTestCase):
+    """Benchmark runs must not leave real mail or receipt files behind (receipts run on commit)."""
+
+    def setUp(self):
+        media = tempfile.TemporaryDirectory()
+        self.addCleanup(media.cleanup)
+        self.enterContext(override_settings(MEDIA_ROOT=media.name, MAIL_QUEUE_ENABLED=True))
+        call_command("seed_catalog", scale=2, users=1, orders=0, stdout=io.StringIO())
+        self.bench_orders = Order.objects.filter(user__email__endswith=f"@{BENCH_EMAIL_DOMAIN}")
+
+    def test_checkout_scenario_spools_no_mail_and_writes_no_receipts(self):
+        call_command("bench_api", scenario=["checkout"], iterations=2, warmup=0, stdout=io.StringIO())
+
+        self.assertEqual(self.bench_orders.count(), 2)
+        self.assertFalse(OutboundEmail.objects.filter(status=OutboundEmail.STATUS_QUEUED).exists())
+        for order in self.bench_orders:
+            self.assertTrue(order.receipt_pdf)
+            self.assertFalse(order.receipt_pdf.storage.exists(order.receipt_pdf.name))
+
+    def test_clear_removes_orders_receipts_and_mail(self):
+        order = make_order(get_user_model().objects.get(email__endswith=f"@{BENCH_EMAIL_DOMAIN}"))
+        order.receipt_pdf.save("R-bench.pdf", ContentFile(b"%PDF"))
+        OutboundEmail.objects.create(subject="Receipt", to=["x@bench.invalid"], tag=f"receipt:{order.pk}")
+        kept = OutboundEmail.objects.create(subject="Reset", to=["x@example.com"], tag="password_reset")
+
+        call_command("seed_catalog", scale=0, users=0, clear=True, stdout=io.StringIO())
+
+        self.assertFalse(Order.objects.filter(pk=order.pk).exists())
+        self.assertFalse(order.receipt_pdf.storage.exists(order.receipt_pdf.name))
+        self.assertEqual(list(OutboundEmail.objects.all()), [kept])
+
+
+@override_settings(RECEIPT_WAIT_POLL_SECONDS=30, RECEIPT_EVENTS_REDIS_URL="")
+class ReceiptEventTests(TestCase):
+    """Waiters wake on notification, not on the (slow) safety-net re-check."""
+
+    def notify_soon(self, order_id=7):
+        timer = threading.Timer(0.05, receipt_events.notify_receipt_ready, args=(order_id,))
+        timer.start()
+        self.addCleanup(timer.cancel)
+
+    def test_wait_wakes_on_notify(self):
+        self.notify_soon()
+        with mock.patch.object(receipt_events, "receipt_ready", side_effect=[False, True]):
+            start = time.monotonic()
+            self.assertTrue(receipt_events.wait_for_receipt(7, 10))
+        self.assertLess(time.monotonic() - start, 5)
+
+    def test_await_wakes_on_notify(self):
+        self.notify_soon()
+        with mock.patch.object(receipt_events, "receipt_ready", side_effect=[False, True]):
+            start = time.monotonic()
+            self.assertTrue(asyncio.run(receipt_events.await_receipt(7, 10)))
+        self.assertLess(time.monotonic() - start, 5)
+
+    def test_timeout(self):
+        with mock.patch.object(receipt_events, "receipt_ready", return_value=False):
+            self.assertFalse(receipt_events.wait_for_receipt(7, 0.05))
+            self.assertFalse(asyncio.run(receipt_events.await_receipt(7, 0.05)))
+
+    @skipIf(fakeredis is None, "fakeredis is not installed")
+    def test_notification_from_another_process_wakes_waiter(self):
+        server = fakeredis.FakeServer()
+        self.enterContext(mock.patch.object(receipt_events, "_redis", return_value=fakeredis.FakeRedis(server=server)))
+        self.addCleanup(self._stop_listener)
+        receipt_events._ensure_listener()
+        self.assertTrue(receipt_events._listener.subscribed.wait(5))
+
+        # Another worker's notify_receipt_ready: only the Redis message reaches us.
+        other = fakeredis.FakeRedis(server=server)
+        threading.Timer(0.05, other.publish, args=(receipt_events.CHANNEL, 7)).start()
+        with mock.patch.object(receipt_events, "receipt_ready", side_effect=[False, True]):
+            start = time.monotonic()
+            self.assertTrue(receipt_events.wait_for_receipt(7, 10))
+        self.assertLess(time.monotonic() - start, 5)
+
+    def _stop_listener(self):
+        receipt_events._listener.stopped.set()
+        receipt_events._listener.join(5)
+        receipt_events._listener = None
+
+
+@override_settings(RECEIPT_SSE_HEARTBEAT_SECONDS=0.05, RECEIPT_SSE_MAX_SECONDS=0.2, RECEIPT_WAIT_POLL_SECONDS=30)
+class ReceiptEventsViewTests(TestCase):
+    def setUp(self):
+        User = get_user_model()
+        self.user = User.objects.create_user("jane", "jane@example.com", "pw")
+        self.order = make_order(self.user)
+        token = add_user_claims(RefreshToken.for_user(self.user), self.user).access_token
+        self.auth = {"HTTP_AUTHORIZATION": f"Bearer {token}"}
+        self.url = f"/api/orders/{self.order.pk}/receipt/events/"
+
+    def events(self, response):
+        return b"".join(response.streaming_content).decode()
+
+    def test_requires_authentication(self):
+        self.assertEqual(self.client.get(self.url).status_code, 401)
+        self.assertEqual(self.client.get(self.url, HTTP_AUTHORIZATION="Bearer nope").status_code, 401)
+
+    def test_other_users_order_is_not_found(self):
+        other = make_order(get_user_model().objects.create_user("joe", "joe@example.com", "pw"))
+        response = self.client.get(f"/api/orders/{other.pk}/receipt/events/", **self.auth)
+        self.assertEqual(response.status_code, 404)
+
+    def test_ready_receipt_is_sent_at_once(self):
+        Order.objects.filter(pk=self.order.pk).update(receipt_pdf="receipts/R-TEST.pdf")
+        response = self.client.get(self.url, **self.auth)
+        self.assertEqual(response["Content-Type"], "text/event-stream")
+        body = self.events(response)
+        self.assertIn("event: receipt", body)
+        self.assertIn(f"/api/orders/{self.order.pk}/receipt/download/", body)
+
+    def test_times_out_with_keep_alives(self):
+        body = self.events(self.client.get(self.url, **self.auth))
+        self.assertIn(": keep-alive", body)
+        self.assertIn("event: timeout", body)
+        self.assertNotIn("event: receipt", body)
+
+
+class MaintenanceTests(TestCase):
+    def setUp(self):
+        media = tempfile.TemporaryDirectory()
+        self.addCleanup(media.cleanup)
+        self.media = media.name
+        self.enterContext(override_settings(MEDIA_ROOT=media.name, CART_IDLE_DAYS=60))
+        self.user = get_user_model().objects.create_user("jane", "jane@example.com", "pw")
+
+    def idle_cart(self, username):
+        cart = Cart.objects.create(user=get_user_model().objects.create_user(username, f"{username}@example.com", "pw"))
+        Cart.objects.filter(pk=cart.pk).update(updated_at=timezone.now() - timedelta(days=90))
+        return cart
+
+    def receipt_file(self, name, age_hours):
+        path = os.path.join(self.media, maintenance.RECEIPTS_DIR, name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "wb") as fh:
+            fh.write(b"%PDF")
+        mtime = time.time() - age_hours * 3600
+        os.utime(path, (mtime, mtime))
+        return f"{maintenance.RECEIPTS_DIR}/{name}"
+
+    def test_chunk_delete_rechecks_the_filter(self):
+        carts = [self.idle_cart(f"idle{i}") for i in range(3)]
+        statements = []
+
+        def touch_after_page_read(execute, sql, params, many, context):
+            statements.append(sql)
+            if len(statements) == 2:
+                # The cart is used again after the chunk's ids were read, before they're deleted.
+                Cart.objects.filter(pk=carts[1].pk).update(updated_at=timezone.now())
+            return execute(sql, params, many, context)
+
+        with connection.execute_wrapper(touch_after_page_read):
+            deleted = maintenance.purge_idle_carts(chunk_size=10)
+
+        self.assertEqual(deleted, 2)
+        self.assertEqual(list(Cart.objects.values_list("pk", flat=True)), [carts[1].pk])
+
+    def test_orphan_receipts_skip_referenced_pending_and_young_files(self):
+        order = make_order(self.user)
+        Order.objects.filter(pk=order.pk).update(receipt_pdf=self.receipt_file("referenced.pdf", 48))
+        pending = self.receipt_file("pending.pdf", 48)
+        OutboundEmail.objects.create(subject="Receipt", to=["jane@example.com"], attachments=[{"path": pending}])
+        self.receipt_file("young.pdf", 0)
+        orphan = self.receipt_file("orphan.pdf", 48)
+
+        self.assertEqual(maintenance.purge_orphan_receipts(min_age_hours=1), 1)
+        remaining = set(os.listdir(os.path.join(self.media, maintenance.RECEIPTS_DIR)))
+        self.assertEqual(remaining, {"referenced.pdf", "pending.pdf", "young.pdf"})
+        self.assertNotIn(orphan.split("/")[-1], remaining)
+
+    def test_dry_run_deletes_nothing(self):
+        cart = self.idle_cart("idle")
+        self.receipt_file("orphan.pdf", 48)
+        out = io.StringIO()
+
+        call_command("cleanup_stale_data", dry_run=True, pause=0, stdout=out)
+
+        self.assertIn("carts: Would delete 1", out.getvalue())
+        self.assertIn("receipts: Would delete 1", out.getvalue())
+        self.assertTrue(Cart.objects.filter(pk=cart.pk).exists())
+        self.assertTrue(os.path.exists(os.path.join(self.media, maintenance.RECEIPTS_DIR, "orphan.pdf")))
+
+
+class OrderListViewTests(TestCase):
+    def setUp(self):
+        User = get_user_model()
+        self.user = User.objects.create_user("jane", "jane@example.com", "pw")
+        self.client = APIClient()
+        token = add_user_claims(RefreshToken.for_user(self.user), self.user).access_token
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {token}")
+
+    def get_all(self, url="/api/orders/?page_size=2"):
+        rows = []
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            rows.extend(response.data["results"])
+            url = response.data["next"]
+        return rows
+
+    def test_only_own_orders(self):
+        mine = make_order(self.user)
+        make_order(get_user_model().objects.create_user("joe", "joe@example.com", "pw"))
+        self.assertEqual([row["id"] for row in self.get_all()], [mine.pk])
+
+    def test_cursor_pages_run_newest_first(self):
+        orders = [make_order(self.user) for _ in range(5)]
+        now = timezone.now()
+        for i, order in enumerate(orders):
+            Order.objects.filter(pk=order.pk).update(created_at=now - timedelta(hours=i))
+        # Same timestamp: the higher id comes first.
+        Order.objects.filter(pk=orders[4].pk).update(created_at=now - timedelta(hours=3))
+
+        expected = [orders[0].pk, orders[1].pk, orders[2].pk, orders[4].pk, orders[3].pk]
+        self.assertEqual([row["id"] for row in self.get_all()], expected)
+
+    def test_item_and_unit_counts(self):
+        product = Product.objects.create(name="Phone", price=100)
+        with_items = make_order(self.user)
+        for quantity in (2, 3):
+            OrderItem.objects.create(order=with_items, product=product, name="Phone", unit_price=100,
+                                     quantity=quantity, line_total=100 * quantity)
+        empty = make_order(self.user)
+
+        rows = {row["id"]: row for row in self.get_all()}
+        self.assertEqual((rows[with_items.pk]["item_count"], rows[with_items.pk]["unit_count"]), (2, 5))
+        self.assertEqual((rows[empty.pk]["item_count"], rows[empty.pk]["unit_count"]), (0, 0))
+        self.assertFalse(rows[empty.pk]["has_receipt"])
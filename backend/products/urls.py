@@ -3,12 +3,16 @@ from .views import (
     ProductListView,
     ProductDetailView,
     CartView,
+    GuestCartView,
+    MergeGuestCartView,
     AddToCartView,
     RemoveFromCartView,
     CheckoutValidateView,
     CheckoutCreateView,
+    OrderListView,
     OrderDetailView,
     OrderReceiptStatusView,
+    OrderReceiptEventsView,
     OrderReceiptDownloadView,
     OrderReceiptEmailView,
 )
@@ -19,6 +23,8 @@ urlpatterns = [
 
     # CART
     path("cart/", CartView.as_view(), name="cart"),
+    path("cart/guest/", GuestCartView.as_view(), name="guest-cart"),
+    path("cart/merge/", MergeGuestCartView.as_view(), name="merge-guest-cart"),
     path("cart/add/", AddToCartView.as_view(), name="add-to-cart"),
     path("cart/remove/", RemoveFromCartView.as_view(), name="remove-from-cart"),
 
@@ -27,8 +33,10 @@ urlpatterns = [
     path("checkout/", CheckoutCreateView.as_view(), name="checkout-create"),
 
     # ORDERS
+    path("orders/", OrderListView.as_view(), name="order-list"),
     path("orders/<int:pk>/", OrderDetailView.as_view(), name="order-detail"),
     path("orders/<int:pk>/receipt/", OrderReceiptStatusView.as_view(), name="order-receipt-status"),
+    path("orders/<int:pk>/receipt/events/", OrderReceiptEventsView.as_view(), name="order-receipt-events"),
     path("orders/<int:pk>/receipt/download/", OrderReceiptDownloadView.as_view(), name="order-receipt-download"),
     path("orders/<int:pk>/email-receipt/", OrderReceiptEmailView.as_view(), name="order-email-receipt"),
 ]
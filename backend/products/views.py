@@ -1,19 +1,36 @@
 # products/views.py
 
-from rest_framework.permissions import IsAuthenticated
+from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework import generics, status
 from rest_framework.response import Response
 from rest_framework.views import APIView
+from rest_framework.pagination import CursorPagination
+from django.db.models import Count, IntegerField, OuterRef, Subquery, Sum
+from django.db.models.functions import Coalesce
 from django.shortcuts import get_object_or_404
-from django.db import transaction
+from django.db import IntegrityError, transaction
 from decimal import Decimal
-from django.http import FileResponse
+from django.conf import settings
+from django.core.handlers.asgi import ASGIRequest
+from django.http import FileResponse, JsonResponse, StreamingHttpResponse
 from django.utils import timezone
+from django.views import View
+from asgiref.sync import sync_to_async
+from rest_framework_simplejwt.exceptions import AuthenticationFailed
+import json
 import logging
+import time
 
 from .models import Product, Cart, CartItem, Order, OrderItem
-from .serializers import ProductSerializer, CartSerializer, CartItemSerializer, OrderSerializer
+from .serializers import ProductSerializer, CartSerializer, CartItemSerializer, OrderSerializer, OrderSummarySerializer
 from .receipts import ensure_receipt_pdf, send_receipt_email
+from .inventory import OutOfStock, reserve_stock
+from .receipt_events import await_receipt, wait_for_receipt
+from .cart import InvalidOperations, apply_delta, apply_operations, touch
+from . import guest_cart
+from . import idempotency
+from authapp.authentication import TokenClaimsAuthentication
+from backend.throttling import UserTokenBucketThrottle
 
 logger = logging.getLogger(__name__)
 
@@ -32,17 +49,84 @@ class ProductDetailView(generics.RetrieveAPIView):
 
 # ------------------ CART ------------------
 
+def _user_cart(request):
+    """
+    The logged-in user's cart, created on first use. TokenClaimsAuthentication never
+    reads the user row, so a token can outlive its user; creating the cart then fails
+    on the foreign key and the request is answered like any other unknown user (401).
+    """
+    try:
+        cart, _ = Cart.objects.get_or_create(user_id=request.user.id)
+    except IntegrityError:
+        raise AuthenticationFailed("User not found", code="user_not_found")
+    return cart
+
+
 class CartView(APIView):
+    authentication_classes = [TokenClaimsAuthentication]
     permission_classes = [IsAuthenticated]
 
     def get(self, request, *args, **kwargs):
         """
         Get or create a cart for the logged-in user.
         """
-        cart, created = Cart.objects.get_or_create(user=request.user)
+        cart = _user_cart(request)
         serializer = CartSerializer(cart)
         return Response(serializer.data)
 
+    def patch(self, request, *args, **kwargs):
+        """
+        Apply several changes in one request and return the cart once:
+        {"operations": [{"product_id": 1, "delta": -1}, {"product_id": 2, "quantity": 3}, ...]}
+        """
+        cart = _user_cart(request)
+        try:
+            operations = request.data.get("operations") if hasattr(request.data, "get") else request.data
+            apply_operations(cart, operations)
+        except InvalidOperations as e:
+            return Response({"detail": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        cart = Cart.objects.prefetch_related("items__product").get(pk=cart.pk)
+        return Response(CartSerializer(cart).data, status=status.HTTP_200_OK)
+
+
+class GuestCartView(APIView):
+    """
+    Cart for anonymous visitors, kept in a signed token (see products.guest_cart).
+    The token travels in the X-Cart-Token header and every response carries the
+    current one; nothing is written to the database.
+    """
+    authentication_classes = []
+    permission_classes = [AllowAny]
+
+    def get(self, request, *args, **kwargs):
+        _, data = guest_cart.priced(guest_cart.load(request.META.get(guest_cart.HEADER)))
+        return Response(data)
+
+    def patch(self, request, *args, **kwargs):
+        """Same body as PATCH /api/cart/: {"operations": [{product_id, delta | quantity}, ...]}."""
+        items = guest_cart.load(request.META.get(guest_cart.HEADER))
+        try:
+            operations = request.data.get("operations") if hasattr(request.data, "get") else request.data
+            items = guest_cart.apply(items, operations)
+        except InvalidOperations as e:
+            return Response({"detail": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        _, data = guest_cart.priced(items)
+        return Response(data, status=status.HTTP_200_OK)
+
+
+class MergeGuestCartView(APIView):
+    """Fold a guest cart token into the logged-in user's cart (called right after login)."""
+    authentication_classes = [TokenClaimsAuthentication]
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request, *args, **kwargs):
+        items = guest_cart.load(request.data.get("token") or request.META.get(guest_cart.HEADER))
+        cart = _user_cart(request)
+        if items:
+            guest_cart.merge_into_cart(cart, items)
+        cart = Cart.objects.prefetch_related("items__product").get(pk=cart.pk)
+        return Response(CartSerializer(cart).data, status=status.HTTP_200_OK)
+
 
 class AddToCartView(APIView):
     permission_classes = [IsAuthenticated]
@@ -66,17 +150,11 @@ class AddToCartView(APIView):
             return Response(CartSerializer(cart).data, status=status.HTTP_200_OK)
 
         product = get_object_or_404(Product, id=product_id)
-        cart_item, created = CartItem.objects.get_or_create(
-            cart=cart, product=product, defaults={"quantity": max(1, quantity)}
-        )
-
-        if not created:
-            new_qty = cart_item.quantity + quantity
-            if new_qty <= 0:
-                cart_item.delete()
-            else:
-                cart_item.quantity = new_qty
-                cart_item.save(update_fields=["quantity"])
+        try:
+            apply_delta(cart, product.pk, quantity)
+        except IntegrityError:
+            # The product was deleted after the lookup above.
+            return Response({"detail": "Not found."}, status=status.HTTP_404_NOT_FOUND)
 
         return Response(CartSerializer(cart).data, status=status.HTTP_200_OK)
 
@@ -93,6 +171,7 @@ class RemoveFromCartView(APIView):
 
         cart_item = get_object_or_404(CartItem, cart=cart, product_id=product_id)
         cart_item.delete()
+        touch(cart)
 
         return Response(CartSerializer(cart).data, status=status.HTTP_200_OK)
 
@@ -102,7 +181,8 @@ class RemoveFromCartView(APIView):
 def _prepare_items_and_subtotal(cart):
     """
     Build line items and compute subtotal.
-    (Add stock checks here later if needed.)
+    Stock is only pre-checked here for a friendly error; the binding
+    reservation happens in CheckoutCreateView (products.inventory).
     """
     if not cart.items.exists():
         return None, Decimal("0.00"), "Cart is empty."
@@ -114,6 +194,8 @@ def _prepare_items_and_subtotal(cart):
         qty = int(ci.quantity)
         if qty <= 0:
             return None, Decimal("0.00"), f"Invalid quantity for {p.name}"
+        if p.stock is not None and p.stock < qty:
+            return None, Decimal("0.00"), f"Only {p.stock} left of {p.name}."
         price = Decimal(p.price)
         line_total = price * qty
         subtotal += line_total
@@ -181,11 +263,65 @@ class CheckoutValidateView(APIView):
         })
 
 
+def _issue_receipt(order, user_email, user_id):
+    """Generate the receipt and queue the email (best-effort; never fails the checkout)."""
+    try:
+        ensure_receipt_pdf(order)
+        if user_email:
+            send_receipt_email(order, user_email)
+            logger.info(
+                "Receipt email queued for order %s to %s (user_id=%s).",
+                order.id, user_email, user_id
+            )
+        else:
+            logger.info(
+                "Order %s placed but user has no email set; skipping email. (user_id=%s)",
+                order.id, user_id
+            )
+    except Exception as e:
+        logger.exception(
+            "Receipt generation/email failed for order %s (user_id=%s): %s",
+            order.id, user_id, e
+        )
+
+
 class CheckoutCreateView(APIView):
+    """
+    POST /api/checkout/
+    Send an Idempotency-Key header to make retries safe: a repeat of a finished
+    checkout replays its response, a repeat of one still running gets 409 with
+    code "idempotency_in_progress". Losing the stock race is also a 409, with
+    code "out_of_stock"; that one is final.
+    """
     permission_classes = [IsAuthenticated]
 
-    @transaction.atomic
     def post(self, request):
+        try:
+            key = idempotency.get_key(request)
+        except ValueError as e:
+            return Response({"detail": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        if key is None:
+            with transaction.atomic():
+                return self._place_order(request)
+
+        claimed, replay = idempotency.claim(request.user, key, idempotency.request_fingerprint(request.data))
+        if replay is not None:
+            return replay
+        try:
+            with transaction.atomic():
+                response = self._place_order(request)
+                if response.status_code < 400:
+                    idempotency.complete(claimed, response, order_id=response.data["id"])
+        except Exception:
+            idempotency.release(claimed)
+            raise
+        if response.status_code >= 400:
+            # Errors aren't stored: the client may fix the cart/address and retry with the same key.
+            idempotency.release(claimed)
+        return response
+
+    def _place_order(self, request):
         payload = request.data or {}
         shipping_in = payload.get("shipping") or {}
         billing_in = payload.get("billing") or {}
@@ -223,8 +359,17 @@ class CheckoutCreateView(APIView):
             bill_tax_id=billing.get("tax_id") or "",
         )
 
-        for it in items:
-            OrderItem.objects.create(
+        try:
+            reserve_stock(order, items)
+        except OutOfStock as e:
+            transaction.set_rollback(True)
+            return Response(
+                {"detail": f"Not enough stock for {e.product.name}.", "code": "out_of_stock", "product_id": e.product.pk},
+                status=status.HTTP_409_CONFLICT,
+            )
+
+        OrderItem.objects.bulk_create([
+            OrderItem(
                 order=order,
                 product=it["product"],
                 name=it["name"],
@@ -232,47 +377,72 @@ class CheckoutCreateView(APIView):
                 quantity=it["quantity"],
                 line_total=it["line_total"],
             )
+            for it in items
+        ])
 
         # clear cart
         cart.items.all().delete()
 
-        # Generate receipt + email (best-effort; don't block success)
-        try:
-            if not order.receipt_number:
-                order.receipt_number = f"R-{timezone.now():%Y}-{order.id:06d}"
-                order.save(update_fields=["receipt_number"])
+        order.receipt_number = f"R-{timezone.now():%Y}-{order.id:06d}"
+        order.save(update_fields=["receipt_number"])
 
-            ensure_receipt_pdf(order)
-
-            user_email = (getattr(request.user, "email", "") or "").strip()
-            if user_email:
-                send_receipt_email(order, user_email)
-                logger.info(
-                    "Receipt email queued/sent for order %s to %s (user_id=%s).",
-                    order.id, user_email, request.user.id
-                )
-            else:
-                logger.info(
-                    "Order %s placed but user has no email set; skipping email. (user_id=%s)",
-                    order.id, request.user.id
-                )
-        except Exception as e:
-            logger.exception(
-                "Receipt generation/email failed for order %s (user_id=%s): %s",
-                order.id, request.user.id, e
-            )
+        # Receipt PDF + email run after commit, so the stock rows updated above
+        # aren't kept locked while xhtml2pdf renders.
+        user_email = (getattr(request.user, "email", "") or "").strip()
+        transaction.on_commit(lambda: _issue_receipt(order, user_email, request.user.id))
 
         return Response({"id": order.id, "status": order.status, "total": f"{order.total:.2f}"})
 
 
 # ------------------ ORDERS ------------------
 
+class OrderHistoryPagination(CursorPagination):
+    # Keyset pagination on the (user, -created_at, -id) index: no OFFSET scans on deep pages.
+    page_size = 20
+    page_size_query_param = "page_size"
+    max_page_size = 100
+    ordering = ("-created_at", "-id")
+
+
+def _per_order(aggregate):
+    """Correlated subquery computing `aggregate` over one order's items."""
+    rows = (
+        OrderItem.objects.filter(order=OuterRef("pk"))
+        .order_by()
+        .values("order")
+        .annotate(v=aggregate)
+        .values("v")
+    )
+    return Coalesce(Subquery(rows, output_field=IntegerField()), 0)
+
+
+class OrderListView(generics.ListAPIView):
+    """
+    GET /api/orders/?cursor=...
+    The logged-in user's orders, newest first, as summary rows.
+    """
+    authentication_classes = [TokenClaimsAuthentication]
+    permission_classes = [IsAuthenticated]
+    serializer_class = OrderSummarySerializer
+    pagination_class = OrderHistoryPagination
+
+    def get_queryset(self):
+        # Subqueries are evaluated for the page's rows only, unlike a JOIN + GROUP BY
+        # over all of the user's orders.
+        return (
+            Order.objects.filter(user_id=self.request.user.id)
+            .only("id", "status", "total", "payment_method", "created_at", "receipt_number", "receipt_pdf")
+            .annotate(item_count=_per_order(Count("*")), unit_count=_per_order(Sum("quantity")))
+        )
+
+
 class OrderDetailView(APIView):
+    authentication_classes = [TokenClaimsAuthentication]
     permission_classes = [IsAuthenticated]
 
     def get(self, request, pk):
         try:
-            order = Order.objects.prefetch_related("items").get(pk=pk, user=request.user)
+            order = Order.objects.prefetch_related("items").get(pk=pk, user_id=request.user.id)
         except Order.DoesNotExist:
             return Response({"detail": "Not found"}, status=404)
         data = OrderSerializer(order, context={"request": request}).data
@@ -280,26 +450,105 @@ class OrderDetailView(APIView):
 
 
 class OrderReceiptStatusView(APIView):
+    authentication_classes = [TokenClaimsAuthentication]
     permission_classes = [IsAuthenticated]
 
     def get(self, request, pk):
+        """
+        ?wait=<seconds> turns this into a long poll (the fallback for clients that
+        can't use /receipt/events/): the response is held until the receipt is
+        ready or the wait runs out, capped at RECEIPT_LONG_POLL_MAX_SECONDS.
+        """
         try:
-            order = Order.objects.get(pk=pk, user=request.user)
+            order = Order.objects.get(pk=pk, user_id=request.user.id)
         except Order.DoesNotExist:
             return Response({"detail": "Not found"}, status=404)
         ready = bool(order.receipt_pdf)
-        download_url = None
-        if ready:
-            download_url = request.build_absolute_uri(f"/api/orders/{order.id}/receipt/download/")
-        return Response({"ready": ready, "download_url": download_url})
+        if not ready:
+            try:
+                wait = min(float(request.query_params.get("wait", 0)), settings.RECEIPT_LONG_POLL_MAX_SECONDS)
+            except ValueError:
+                wait = 0
+            if wait > 0:
+                ready = wait_for_receipt(order.pk, wait)
+        return Response(_receipt_status(request, order.pk, ready))
+
+
+def _receipt_status(request, order_id, ready):
+    download_url = request.build_absolute_uri(f"/api/orders/{order_id}/receipt/download/") if ready else None
+    return {"ready": ready, "download_url": download_url}
+
+
+def _sse(event, data):
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+class OrderReceiptEventsView(View):
+    """
+    GET /api/orders/<pk>/receipt/events/  (text/event-stream)
+    Sends one "receipt" event ({"ready": true, "download_url": ...}) when the PDF
+    exists and closes; comment lines keep idle proxies from dropping the stream,
+    and a "timeout" event ends it after RECEIPT_SSE_MAX_SECONDS.
+    Authenticate with the usual Authorization header (read the stream with
+    fetch(); EventSource can't send headers).
+
+    Under ASGI the stream is an async generator and holds no thread while
+    waiting; under WSGI it falls back to a blocking generator.
+    """
+    authenticator = TokenClaimsAuthentication()
+
+    async def get(self, request, pk):
+        try:
+            auth = await sync_to_async(self.authenticator.authenticate)(request)
+        except AuthenticationFailed as e:
+            return JsonResponse({"detail": str(e.detail)}, status=401)
+        if auth is None:
+            return JsonResponse({"detail": "Authentication credentials were not provided."}, status=401)
+        user = auth[0]
+        exists = await sync_to_async(Order.objects.filter(pk=pk, user_id=user.id).exists)()
+        if not exists:
+            return JsonResponse({"detail": "Not found"}, status=404)
+
+        done = _sse("receipt", _receipt_status(request, pk, True))
+        heartbeat = settings.RECEIPT_SSE_HEARTBEAT_SECONDS
+        max_seconds = settings.RECEIPT_SSE_MAX_SECONDS
+
+        async def astream():
+            yield "retry: 5000\n\n"
+            deadline = time.monotonic() + max_seconds
+            while (remaining := deadline - time.monotonic()) > 0:
+                if await await_receipt(pk, min(heartbeat, remaining)):
+                    yield done
+                    return
+                yield ": keep-alive\n\n"
+            yield _sse("timeout", {"ready": False})
+
+        def stream():
+            yield "retry: 5000\n\n"
+            deadline = time.monotonic() + max_seconds
+            while (remaining := deadline - time.monotonic()) > 0:
+                if wait_for_receipt(pk, min(heartbeat, remaining)):
+                    yield done
+                    return
+                yield ": keep-alive\n\n"
+            yield _sse("timeout", {"ready": False})
+
+        response = StreamingHttpResponse(
+            astream() if isinstance(request, ASGIRequest) else stream(),
+            content_type="text/event-stream",
+        )
+        response["Cache-Control"] = "no-cache"
+        response["X-Accel-Buffering"] = "no"  # nginx: don't buffer the stream
+        return response
 
 
 class OrderReceiptDownloadView(APIView):
+    authentication_classes = [TokenClaimsAuthentication]
     permission_classes = [IsAuthenticated]
 
     def get(self, request, pk):
         try:
-            order = Order.objects.get(pk=pk, user=request.user)
+            order = Order.objects.get(pk=pk, user_id=request.user.id)
         except Order.DoesNotExist:
             return Response({"detail": "Not found"}, status=404)
         if not order.receipt_pdf:
@@ -312,8 +561,13 @@ class OrderReceiptDownloadView(APIView):
         return response
 
 
+class ReceiptEmailThrottle(UserTokenBucketThrottle):
+    scope = "receipt_email"
+
+
 class OrderReceiptEmailView(APIView):
     permission_classes = [IsAuthenticated]
+    throttle_classes = [ReceiptEmailThrottle]
 
     def post(self, request, pk):
         try:
@@ -329,7 +583,7 @@ class OrderReceiptEmailView(APIView):
             ensure_receipt_pdf(order)
             send_receipt_email(order, user_email)
             logger.info(
-                "Resent receipt for order %s to %s (user_id=%s).",
+                "Queued receipt resend for order %s to %s (user_id=%s).",
                 order.id, user_email, request.user.id
             )
         except Exception as e:
@@ -1,8 +1,9 @@
 # reallaptops/serializers.py
 from rest_framework import serializers
+from backend.metrics import TimedModelSerializer
 from .models import RealLaptop
 
-class RealLaptopSerializer(serializers.ModelSerializer):
+class RealLaptopSerializer(TimedModelSerializer):
     price_display = serializers.SerializerMethodField()
     image = serializers.SerializerMethodField()
     display_inches = serializers.FloatField(required=False, allow_null=True)
@@ -0,0 +1,37 @@
+# reports/admin.py
+from django.contrib import admin
+
+from .models import DailyCategorySales, DailyProductSales, DailySales
+
+
+class ReadOnlyRollupAdmin(admin.ModelAdmin):
+    """Rollups are maintained by reports.rollups; editing them by hand would desync them."""
+    date_hierarchy = "day"
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        return False
+
+
+@admin.register(DailySales)
+class DailySalesAdmin(ReadOnlyRollupAdmin):
+    list_display = ("day", "status", "payment_method", "orders", "units", "revenue")
+    list_filter = ("status", "payment_method")
+
+
+@admin.register(DailyProductSales)
+class DailyProductSalesAdmin(ReadOnlyRollupAdmin):
+    list_display = ("day", "status", "product_id", "product_name", "units", "revenue")
+    list_filter = ("status",)
+    search_fields = ("=product_id", "^product_name")
+
+
+@admin.register(DailyCategorySales)
+class DailyCategorySalesAdmin(ReadOnlyRollupAdmin):
+    list_display = ("day", "status", "category", "units", "revenue")
+    list_filter = ("status", "category")
@@ -0,0 +1,31 @@
+# reports/categories.py
+from django.core.cache import cache
+
+from catalog.registry import CATEGORIES
+
+# Each catalog model owns a Product (via a `product` one-to-one); the category key is its app label.
+UNCATEGORIZED = "other"
+CACHE_KEY = "reports:category:{}"
+CACHE_TTL = 24 * 3600
+
+
+def categories_for(product_ids):
+    """{product_id: category} for the given products (UNCATEGORIZED when no catalog row points at it)."""
+    product_ids = set(product_ids)
+    cached = cache.get_many([CACHE_KEY.format(pid) for pid in product_ids])
+    result = {pid: cached[CACHE_KEY.format(pid)] for pid in product_ids if CACHE_KEY.format(pid) in cached}
+    missing = product_ids - result.keys()
+    if not missing:
+        return result
+
+    found = {}
+    for category in CATEGORIES:
+        if len(found) == len(missing):
+            break
+        rows = category.model.objects.filter(product_id__in=missing - found.keys())
+        for pid in rows.values_list("product_id", flat=True):
+            found[pid] = category.key
+    fresh = {pid: found.get(pid, UNCATEGORIZED) for pid in missing}
+    cache.set_many({CACHE_KEY.format(pid): cat for pid, cat in fresh.items()}, CACHE_TTL)
+    result.update(fresh)
+    return result
@@ -0,0 +1,128 @@
+# reports/exports.py
+"""
+Order / order-line exports that stream in constant memory.
+
+Orders are read in id-ordered keyset chunks (WHERE id > last ORDER BY id LIMIT n)
+with each chunk's items fetched in one query. On MySQL, QuerySet.iterator()
+still buffers the whole result client-side, so the chunking is what keeps
+memory flat for multi-month ranges.
+"""
+import csv
+from datetime import datetime, time, timedelta
+
+from django.utils import timezone
+
+from products.models import Order, OrderItem
+
+try:
+    from openpyxl import Workbook
+except ImportError:  # XLSX export is optional
+    Workbook = None
+
+ORDER_FIELDS = [
+    ("order_id", "id"),
+    ("created_at", "created_at"),
+    ("status", "status"),
+    ("payment_method", "payment_method"),
+    ("receipt_number", "receipt_number"),
+    ("customer_email", "user__email"),
+    ("ship_full_name", "ship_full_name"),
+    ("ship_phone", "ship_phone"),
+    ("ship_city", "ship_city"),
+    ("ship_country", "ship_country"),
+    ("subtotal", "subtotal"),
+    ("shipping_fee", "shipping_fee"),
+    ("total", "total"),
+]
+LINE_FIELDS = [
+    ("product_id", "product_id"),
+    ("item_name", "name"),
+    ("unit_price", "unit_price"),
+    ("quantity", "quantity"),
+    ("line_total", "line_total"),
+]
+
+# Spreadsheet apps evaluate text cells starting with these as formulas (CSV injection).
+FORMULA_PREFIXES = ("=", "+", "-", "@", "\t", "\r")
+
+
+def day_bounds(start, end):
+    """[start 00:00, end+1 00:00) in the current time zone."""
+    return (
+        timezone.make_aware(datetime.combine(start, time.min)),
+        timezone.make_aware(datetime.combine(end + timedelta(days=1), time.min)),
+    )
+
+
+def iter_rows(start, end, lines=True, statuses=None, chunk_size=1000):
+    """
+    Header row, then one row per order (or per order line when `lines`; an order
+    with no lines gets one row with blank line columns).
+    """
+    header = [name for name, _ in ORDER_FIELDS]
+    if lines:
+        header += [name for name, _ in LINE_FIELDS]
+    yield header
+
+    lo, hi = day_bounds(start, end)
+    orders = Order.objects.filter(created_at__gte=lo, created_at__lt=hi).order_by("id")
+    if statuses:
+        orders = orders.filter(status__in=statuses)
+    order_columns = [col for _, col in ORDER_FIELDS]
+    line_columns = [col for _, col in LINE_FIELDS]
+
+    last_id = 0
+    while True:
+        chunk = list(orders.filter(id__gt=last_id).values_list(*order_columns)[:chunk_size])
+        if not chunk:
+            return
+        last_id = chunk[-1][0]
+        if not lines:
+            for row in chunk:
+                yield [_cell(v) for v in row]
+            continue
+
+        items = {}
+        for it in OrderItem.objects.filter(order_id__in=[r[0] for r in chunk]).order_by("order_id", "id") \
+                .values_list("order_id", *line_columns):
+            items.setdefault(it[0], []).append(it[1:])
+        blank_line = [""] * len(line_columns)
+        for row in chunk:
+            order_cells = [_cell(v) for v in row]
+            # An order without items still gets one row, so order totals add up.
+            for line in items.get(row[0]) or [None]:
+                yield order_cells + (blank_line if line is None else [_cell(v) for v in line])
+
+
+def _cell(value):
+    if isinstance(value, datetime):
+        return timezone.localtime(value).isoformat(timespec="seconds")
+    if isinstance(value, str) and value.startswith(FORMULA_PREFIXES):
+        # Customer-typed text (names, phones, item names): a leading quote keeps it literal.
+        return "'" + value
+    return "" if value is None else value
+
+
+class _Echo:
+    """File-like object whose write() hands the line back (csv.writer -> generator)."""
+
+    def write(self, value):
+        return value
+
+
+def iter_csv(rows):
+    writer = csv.writer(_Echo())
+    yield "\ufeff"  # BOM so Excel opens UTF-8 correctly
+    for row in rows:
+        yield writer.writerow(row)
+
+
+def write_xlsx(rows, fh):
+    """Write rows to `fh` as XLSX using openpyxl's write-only (streaming) mode."""
+    if Workbook is None:
+        raise RuntimeError("XLSX export requires the 'openpyxl' package.")
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet("orders")
+    for row in rows:
+        ws.append([float(v) if hasattr(v, "as_tuple") else v for v in row])
+    wb.save(fh)
@@ -0,0 +1,61 @@
+# reports/management/commands/backfill_sales_rollups.py
+from datetime import date, datetime, time, timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+
+from products.models import Order
+from reports.models import DailyCategorySales, DailyProductSales, DailySales, OrderRollupState
+from reports.rollups import sync_orders
+
+
+class Command(BaseCommand):
+    help = (
+        "Bring the daily sales rollups up to date for existing orders, in id-ordered chunks. "
+        "Already-applied orders are skipped, so it is safe to re-run; --rebuild recomputes the range from scratch."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--since", help="First day (YYYY-MM-DD, order creation date). Default: all history.")
+        parser.add_argument("--until", help="Last day (YYYY-MM-DD). Default: today.")
+        parser.add_argument("--chunk-size", type=int, default=1000)
+        parser.add_argument("--rebuild", action="store_true",
+                            help="Delete the range's rollups and per-order state first, then recompute.")
+
+    def handle(self, *args, **opts):
+        try:
+            since = date.fromisoformat(opts["since"]) if opts["since"] else None
+            until = date.fromisoformat(opts["until"]) if opts["until"] else timezone.localdate()
+        except ValueError:
+            raise CommandError("--since/--until must be YYYY-MM-DD.")
+
+        orders = Order.objects.filter(created_at__lt=_start_of(until + timedelta(days=1)))
+        if since:
+            orders = orders.filter(created_at__gte=_start_of(since))
+
+        if opts["rebuild"]:
+            if since is None:
+                raise CommandError("--rebuild needs --since (or rebuild everything with --since 1970-01-01).")
+            with transaction.atomic():
+                for model in (DailySales, DailyProductSales, DailyCategorySales, OrderRollupState):
+                    model.objects.filter(day__range=(since, until)).delete()
+            self.stdout.write(f"Cleared rollups for {since}..{until}.")
+
+        last_id, seen, changed = 0, 0, 0
+        while True:
+            ids = list(
+                orders.filter(id__gt=last_id).order_by("id").values_list("id", flat=True)[:opts["chunk_size"]]
+            )
+            if not ids:
+                break
+            changed += sync_orders(ids)
+            seen += len(ids)
+            last_id = ids[-1]
+            self.stdout.write(f"  {seen} orders scanned, {changed} applied (last id {last_id})")
+
+        self.stdout.write(self.style.SUCCESS(f"Done: {seen} orders scanned, {changed} rollup updates."))
+
+
+def _start_of(day):
+    return timezone.make_aware(datetime.combine(day, time.min))
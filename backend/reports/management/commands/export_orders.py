@@ -0,0 +1,47 @@
+# reports/management/commands/export_orders.py
+import sys
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from reports.exports import Workbook, iter_csv, iter_rows, write_xlsx
+
+
+class Command(BaseCommand):
+    help = "Export orders (one row per order line by default) for a date range as CSV or XLSX, in constant memory."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--start", required=True, help="First day, YYYY-MM-DD.")
+        parser.add_argument("--end", help="Last day, YYYY-MM-DD (default: today).")
+        parser.add_argument("--filetype", choices=["csv", "xlsx"], default="csv")
+        parser.add_argument("--orders-only", action="store_true", help="One row per order instead of per line.")
+        parser.add_argument("--status", default="", help="Comma-separated order statuses to include.")
+        parser.add_argument("--chunk-size", type=int, default=1000)
+        parser.add_argument("--out", help="Output file (default: stdout; required for xlsx).")
+
+    def handle(self, *args, **opts):
+        try:
+            start = date.fromisoformat(opts["start"])
+            end = date.fromisoformat(opts["end"]) if opts["end"] else timezone.localdate()
+        except ValueError:
+            raise CommandError("--start/--end must be YYYY-MM-DD.")
+        statuses = [s.strip().upper() for s in opts["status"].split(",") if s.strip()]
+        rows = iter_rows(start, end, lines=not opts["orders_only"], statuses=statuses, chunk_size=opts["chunk_size"])
+
+        if opts["filetype"] == "xlsx":
+            if Workbook is None:
+                raise CommandError("XLSX export requires the 'openpyxl' package.")
+            if not opts["out"]:
+                raise CommandError("--out is required for xlsx.")
+            with open(opts["out"], "wb") as fh:
+                write_xlsx(rows, fh)
+            return
+
+        out = open(opts["out"], "w", newline="", encoding="utf-8") if opts["out"] else sys.stdout
+        try:
+            for chunk in iter_csv(rows):
+                out.write(chunk)
+        finally:
+            if out is not sys.stdout:
+                out.close()
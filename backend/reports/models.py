@@ -0,0 +1,67 @@
+# reports/models.py
+from decimal import Decimal
+
+from django.db import models
+
+
+class DailySales(models.Model):
+    """Orders/revenue/units per day, order status and payment method."""
+    day = models.DateField()
+    status = models.CharField(max_length=12)
+    payment_method = models.CharField(max_length=10)
+    orders = models.PositiveIntegerField(default=0)
+    units = models.PositiveIntegerField(default=0)
+    revenue = models.DecimalField(max_digits=14, decimal_places=2, default=Decimal("0.00"))
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["day", "status", "payment_method"], name="uniq_daily_sales"),
+        ]
+        verbose_name_plural = "daily sales"
+
+    def __str__(self):
+        return f"{self.day} {self.status}/{self.payment_method}: {self.revenue}"
+
+
+class DailyProductSales(models.Model):
+    """Units/revenue per day, order status and product (product_id kept even if the product is deleted)."""
+    day = models.DateField()
+    status = models.CharField(max_length=12)
+    product_id = models.BigIntegerField()
+    product_name = models.CharField(max_length=255, blank=True)
+    units = models.PositiveIntegerField(default=0)
+    revenue = models.DecimalField(max_digits=14, decimal_places=2, default=Decimal("0.00"))
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["day", "status", "product_id"], name="uniq_daily_product_sales"),
+        ]
+        indexes = [models.Index(fields=["product_id", "day"])]
+        verbose_name_plural = "daily product sales"
+
+
+class DailyCategorySales(models.Model):
+    """Units/revenue per day, order status and catalog category (app label, e.g. "smartphones")."""
+    day = models.DateField()
+    status = models.CharField(max_length=12)
+    category = models.CharField(max_length=40)
+    units = models.PositiveIntegerField(default=0)
+    revenue = models.DecimalField(max_digits=14, decimal_places=2, default=Decimal("0.00"))
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["day", "status", "category"], name="uniq_daily_category_sales"),
+        ]
+        verbose_name_plural = "daily category sales"
+
+
+class OrderRollupState(models.Model):
+    """
+    What each order currently contributes to the rollups (its day/status/payment
+    method when last applied). Lets a status change move the order between
+    buckets, and makes re-syncing an order a no-op.
+    """
+    order_id = models.BigIntegerField(primary_key=True)
+    day = models.DateField(null=True, db_index=True)
+    status = models.CharField(max_length=12, blank=True)  # "" = nothing applied yet
+    payment_method = models.CharField(max_length=10, blank=True)
@@ -0,0 +1,110 @@
+# reports/rollups.py
+"""
+Incremental daily sales rollups.
+
+sync_orders() brings the rollup tables in line with the current state of some
+orders: for each order whose status (or first appearance) differs from its
+OrderRollupState, the old contribution is subtracted and the new one added,
+with F() increments so concurrent syncs of different orders don't conflict.
+Order items never change after checkout, so an order's contribution is fully
+determined by its day, status and payment method.
+"""
+from collections import defaultdict
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from products.models import Order, OrderItem
+from .categories import categories_for
+from .models import DailyCategorySales, DailyProductSales, DailySales, OrderRollupState
+
+
+def _bucket():
+    return {"orders": 0, "units": 0, "revenue": Decimal("0.00")}
+
+
+def _apply(model, deltas, extra_defaults=None):
+    extra_defaults = extra_defaults or {}
+    for key, delta in deltas.items():
+        delta = {k: v for k, v in delta.items() if v}
+        if not delta:
+            continue
+        lookup = dict(key)
+        row, created = model.objects.get_or_create(**lookup, defaults=extra_defaults.get(key, {}))
+        model.objects.filter(pk=row.pk).update(**{k: F(k) + v for k, v in delta.items()})
+
+
+@transaction.atomic
+def sync_orders(order_ids, deleting=False):
+    """
+    Apply pending rollup changes for these orders. Idempotent. Returns how many orders changed.
+    deleting=True removes the orders' contribution (call before the rows and their items go).
+    """
+    order_ids = list(order_ids)
+    if not order_ids:
+        return 0
+
+    # Placeholder states for orders seen for the first time, then lock all of them so
+    # two syncs of the same order serialize (different orders don't block each other).
+    OrderRollupState.objects.bulk_create(
+        [OrderRollupState(order_id=oid) for oid in order_ids], ignore_conflicts=True,
+    )
+    states = {s.order_id: s for s in OrderRollupState.objects.select_for_update().filter(order_id__in=order_ids)}
+    orders = {o["id"]: o for o in Order.objects.filter(id__in=order_ids).values("id", "created_at", "status", "payment_method")}
+
+    changes = []  # (state, old (day, status, pm) or None, new (day, status, pm) or None)
+    for oid, state in states.items():
+        order = None if deleting else orders.get(oid)
+        new = None
+        if order is not None:
+            new = (timezone.localdate(order["created_at"]), order["status"], order["payment_method"])
+        old = (state.day, state.status, state.payment_method) if state.status else None
+        if old != new:
+            changes.append((state, old, new))
+    if not changes:
+        return 0
+
+    changed_ids = [state.order_id for state, _, _ in changes]
+    lines = defaultdict(list)
+    for it in OrderItem.objects.filter(order_id__in=changed_ids).values("order_id", "product_id", "name", "quantity", "line_total"):
+        lines[it["order_id"]].append(it)
+    category = categories_for({it["product_id"] for its in lines.values() for it in its})
+
+    daily, by_product, by_category = defaultdict(_bucket), defaultdict(_bucket), defaultdict(_bucket)
+    names = {}
+    for state, old, new in changes:
+        for sign, key in ((-1, old), (1, new)):
+            if key is None:
+                continue
+            day, status, pm = key
+            d = daily[(("day", day), ("status", status), ("payment_method", pm))]
+            d["orders"] += sign
+            for it in lines[state.order_id]:
+                units, revenue = sign * it["quantity"], sign * it["line_total"]
+                d["units"] += units
+                d["revenue"] += revenue
+                pkey = (("day", day), ("status", status), ("product_id", it["product_id"]))
+                by_product[pkey]["units"] += units
+                by_product[pkey]["revenue"] += revenue
+                names[pkey] = {"product_name": it["name"][:255]}
+                ckey = (("day", day), ("status", status), ("category", category[it["product_id"]]))
+                by_category[ckey]["units"] += units
+                by_category[ckey]["revenue"] += revenue
+
+    _apply(DailySales, daily)
+    _apply(DailyProductSales, {k: {"units": v["units"], "revenue": v["revenue"]} for k, v in by_product.items()}, names)
+    _apply(DailyCategorySales, {k: {"units": v["units"], "revenue": v["revenue"]} for k, v in by_category.items()})
+
+    for state, _, new in changes:
+        if new is None:  # order deleted: nothing left to track
+            state.delete()
+            continue
+        state.day, state.status, state.payment_method = new
+        state.save()
+    return len(changes)
+
+
+def sync_order(order_id):
+    return sync_orders([order_id])
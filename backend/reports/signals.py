@@ -0,0 +1,24 @@
+# reports/signals.py
+from django.db import transaction
+from django.db.models.signals import post_save, pre_delete
+from django.dispatch import receiver
+
+from products.models import Order
+from .rollups import sync_order, sync_orders
+
+
+@receiver(post_save, sender=Order)
+def rollup_on_order_save(sender, instance, created, update_fields=None, **kwargs):
+    if not created and update_fields is not None and "status" not in update_fields:
+        return
+    # After commit: a new order's items are inserted after the Order row itself.
+    # Robust: a failed rollup is logged and must not break the caller's other
+    # on_commit work (receipts, stock); backfill_sales_rollups catches it up.
+    order_id = instance.pk
+    transaction.on_commit(lambda: sync_order(order_id), robust=True)
+
+
+@receiver(pre_delete, sender=Order)
+def rollup_on_order_delete(sender, instance, **kwargs):
+    # Before the cascade removes the order's items, which the subtraction needs.
+    sync_orders([instance.pk], deleting=True)
@@ -0,0 +1,86 @@
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.test import TestCase
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from products.models import Order, OrderItem, Product
+from .exports import iter_rows
+from .models import DailySales
+
+
+class RollupSignalTests(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user("jane", "jane@example.com", "pw")
+
+    def _create_order(self):
+        return Order.objects.create(
+            user=self.user, total=100, ship_full_name="Jane Doe", ship_phone="0700000000",
+            ship_address1="Moi Avenue", ship_city="Nairobi", receipt_number="R-TEST-000001",
+        )
+
+    def test_order_save_updates_rollups_after_commit(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self._create_order()
+        self.assertEqual(DailySales.objects.get().orders, 1)
+
+    def test_failing_rollup_does_not_break_later_callbacks(self):
+        later = mock.Mock()
+        with mock.patch("reports.signals.sync_order", side_effect=RuntimeError("boom")):
+            # captureOnCommitCallbacks logs robust failures as "django.test" (outside tests: django.db.backends.base).
+            with self.assertLogs("django.test", "ERROR"):
+                with self.captureOnCommitCallbacks(execute=True):
+                    self._create_order()
+                    transaction.on_commit(later)
+        later.assert_called_once()
+
+
+class ExportTests(TestCase):
+    def test_formula_like_text_is_escaped(self):
+        user = get_user_model().objects.create_user("jane", "jane@example.com", "pw")
+        Order.objects.create(
+            user=user, total=100, ship_full_name='=HYPERLINK("http://evil.example","x")', ship_phone="+254700000000",
+            ship_address1="Moi Avenue", ship_city="@SUM(A1)", receipt_number="R-TEST-000001",
+        )
+        today = timezone.localdate()
+        header, row = list(iter_rows(today, today, lines=False))
+        cells = dict(zip(header, row))
+        self.assertEqual(cells["ship_full_name"], '\'=HYPERLINK("http://evil.example","x")')
+        self.assertEqual(cells["ship_phone"], "'+254700000000")
+        self.assertEqual(cells["ship_city"], "'@SUM(A1)")
+        self.assertEqual(cells["receipt_number"], "R-TEST-000001")
+        self.assertEqual(cells["total"], 100)
+
+    def test_line_export_keeps_orders_without_items(self):
+        user = get_user_model().objects.create_user("jane", "jane@example.com", "pw")
+        common = dict(user=user, ship_full_name="Jane Doe", ship_phone="0700000000", ship_address1="Moi Avenue",
+                      ship_city="Nairobi")
+        with_items = Order.objects.create(total=300, receipt_number="R-TEST-000001", **common)
+        empty = Order.objects.create(total=50, receipt_number="R-TEST-000002", **common)
+        product = Product.objects.create(name="Phone", price=100)
+        for quantity in (1, 2):
+            OrderItem.objects.create(order=with_items, product=product, name="Phone", unit_price=100,
+                                     quantity=quantity, line_total=100 * quantity)
+
+        today = timezone.localdate()
+        header, *rows = list(iter_rows(today, today, lines=True))
+        rows = [dict(zip(header, row)) for row in rows]
+        self.assertEqual([r["order_id"] for r in rows], [with_items.pk, with_items.pk, empty.pk])
+        self.assertEqual([r["quantity"] for r in rows], [1, 2, ""])
+        self.assertEqual(rows[-1]["total"], 50)
+        self.assertEqual(rows[-1]["item_name"], "")
+
+
+class SalesReportViewTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(get_user_model().objects.create_user("staff", "staff@example.com", "pw", is_staff=True))
+
+    def test_limit_must_be_positive(self):
+        for limit in ("-1", "0", "x"):
+            response = self.client.get("/api/reports/sales/", {"group_by": "product", "limit": limit})
+            self.assertEqual(response.status_code, 400, limit)
+        response = self.client.get("/api/reports/sales/", {"group_by": "product", "limit": "5"})
+        self.assertEqual(response.status_code, 200)
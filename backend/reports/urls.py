@@ -0,0 +1,8 @@
+from django.urls import path
+
+from .views import OrderExportView, SalesReportView
+
+urlpatterns = [
+    path("reports/sales/", SalesReportView.as_view(), name="sales-report"),
+    path("reports/orders/export/", OrderExportView.as_view(), name="order-export"),
+]
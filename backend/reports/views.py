@@ -0,0 +1,135 @@
+# reports/views.py
+import tempfile
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.db.models import Max, Sum
+from django.http import FileResponse, StreamingHttpResponse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.permissions import IsAdminUser
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from products.models import Order
+from .exports import Workbook, iter_csv, iter_rows, write_xlsx
+from .models import DailyCategorySales, DailyProductSales, DailySales
+
+# group_by -> (rollup model, grouping columns, metrics)
+GROUPINGS = {
+    "day": (DailySales, ["day"], ["orders", "units", "revenue"]),
+    "status": (DailySales, ["status"], ["orders", "units", "revenue"]),
+    "payment_method": (DailySales, ["payment_method"], ["orders", "units", "revenue"]),
+    "product": (DailyProductSales, ["product_id"], ["units", "revenue"]),
+    "category": (DailyCategorySales, ["category"], ["units", "revenue"]),
+}
+MAX_RANGE_DAYS = 3660
+
+
+def _parse_range(params, default_days=29):
+    """(start, end) from ?start=&end= (YYYY-MM-DD); raises ValueError on bad input."""
+    end = date.fromisoformat(params.get("end") or timezone.localdate().isoformat())
+    start = date.fromisoformat(params.get("start") or (end - timedelta(days=default_days)).isoformat())
+    if start > end or (end - start).days > MAX_RANGE_DAYS:
+        raise ValueError(f"Invalid range (start <= end, at most {MAX_RANGE_DAYS} days).")
+    return start, end
+
+
+class SalesReportView(APIView):
+    """
+    GET /api/reports/sales/?start=YYYY-MM-DD&end=YYYY-MM-DD&group_by=day&status=PAID,FULFILLED
+    Staff only. Answered from the daily rollups (reports.rollups), never from OrderItem.
+    group_by: day | status | payment_method | product | category. status defaults to
+    everything except CANCELLED. product rows are sorted by revenue (top `limit`).
+    """
+    permission_classes = [IsAdminUser]
+
+    def get(self, request):
+        try:
+            start, end = _parse_range(request.query_params)
+            limit = min(int(request.query_params.get("limit", 100)), 1000)
+            if limit < 1:
+                raise ValueError("Invalid limit.")
+        except ValueError as e:
+            return Response({"detail": f"{e} Dates are YYYY-MM-DD; limit is a positive integer."},
+                            status=status.HTTP_400_BAD_REQUEST)
+
+        group_by = request.query_params.get("group_by", "day")
+        if group_by not in GROUPINGS:
+            return Response({"detail": f"group_by must be one of: {', '.join(GROUPINGS)}."},
+                            status=status.HTTP_400_BAD_REQUEST)
+
+        valid_statuses = [s for s, _ in Order.STATUS_CHOICES]
+        raw = request.query_params.get("status")
+        statuses = [s.strip().upper() for s in raw.split(",") if s.strip()] if raw else \
+            [s for s in valid_statuses if s != Order.STATUS_CANCELLED]
+        if any(s not in valid_statuses for s in statuses):
+            return Response({"detail": f"status must be among: {', '.join(valid_statuses)}."},
+                            status=status.HTTP_400_BAD_REQUEST)
+
+        model, columns, metrics = GROUPINGS[group_by]
+        rows = (
+            model.objects.filter(day__range=(start, end), status__in=statuses)
+            .values(*columns)
+            .annotate(**{m: Sum(m) for m in metrics})
+        )
+        if group_by == "product":
+            rows = rows.annotate(product_name=Max("product_name")).order_by("-revenue")[:limit]
+        else:
+            rows = rows.order_by(*columns)
+
+        totals = DailySales.objects.filter(day__range=(start, end), status__in=statuses).aggregate(
+            orders=Sum("orders"), units=Sum("units"), revenue=Sum("revenue"),
+        )
+        return Response({
+            "start": start,
+            "end": end,
+            "group_by": group_by,
+            "statuses": statuses,
+            "totals": {
+                "orders": totals["orders"] or 0,
+                "units": totals["units"] or 0,
+                "revenue": f"{totals['revenue'] or Decimal('0.00'):.2f}",
+            },
+            "rows": [{**r, "revenue": f"{r['revenue']:.2f}"} for r in rows],
+        })
+
+
+class OrderExportView(APIView):
+    """
+    GET /api/reports/orders/export/?start=YYYY-MM-DD&end=YYYY-MM-DD&filetype=csv|xlsx&lines=1&status=PAID
+    Staff only. CSV is streamed row by row; XLSX is built in openpyxl's write-only
+    mode into a temp file and streamed from there. lines=0 gives one row per order.
+    """
+    permission_classes = [IsAdminUser]
+
+    def get(self, request):
+        params = request.query_params
+        try:
+            start, end = _parse_range(params)
+        except ValueError as e:
+            return Response({"detail": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        filetype = params.get("filetype", "csv")
+        if filetype not in ("csv", "xlsx"):
+            return Response({"detail": "filetype must be csv or xlsx."}, status=status.HTTP_400_BAD_REQUEST)
+        if filetype == "xlsx" and Workbook is None:
+            return Response({"detail": "XLSX export is not available (openpyxl is not installed)."},
+                            status=status.HTTP_400_BAD_REQUEST)
+
+        lines = params.get("lines", "1") not in ("0", "false")
+        statuses = [s.strip().upper() for s in params.get("status", "").split(",") if s.strip()]
+        rows = iter_rows(start, end, lines=lines, statuses=statuses)
+        filename = f"orders{'-lines' if lines else ''}-{start}-{end}.{filetype}"
+
+        if filetype == "csv":
+            response = StreamingHttpResponse(iter_csv(rows), content_type="text/csv; charset=utf-8")
+            response["Content-Disposition"] = f'attachment; filename="{filename}"'
+            return response
+
+        tmp = tempfile.TemporaryFile()
+        write_xlsx(rows, tmp)
+        tmp.seek(0)
+        return FileResponse(
+            tmp, as_attachment=True, filename=filename,
+            content_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+        )
@@ -1,8 +1,9 @@
 # smartphones/serializers.py
 from rest_framework import serializers
+from backend.metrics import TimedModelSerializer
 from .models import Smartphone
 
-class SmartphoneSerializer(serializers.ModelSerializer):
+class SmartphoneSerializer(TimedModelSerializer):
     brand_display = serializers.CharField(source="get_brand_display", read_only=True)
     price_display = serializers.SerializerMethodField()
     image = serializers.SerializerMethodField()
@@ -1,5 +1,6 @@
 # smartphones/views.py
 from rest_framework import generics, filters
+from catalog.specs import SpecFilterBackend
 from .models import Smartphone
 from .serializers import SmartphoneSerializer
 
@@ -10,10 +11,11 @@ class SmartphoneListView(generics.ListAPIView):
       - brand=Samsung|Apple|Tecno|Infinix|Xiaomi/POCO|OPPO|Others
       - search=<text>   (searches name/specs_text/brand)
       - ordering=created_at|price_min_ksh|price_max_ksh|name (-prefix for desc)
+      - ram_gb, storage_gb, battery_mah, camera_mp, display_inches (=, _min=, _max=; see catalog.specs)
     """
     serializer_class = SmartphoneSerializer
     queryset = Smartphone.objects.all()
-    filter_backends = [filters.SearchFilter, filters.OrderingFilter]
+    filter_backends = [filters.SearchFilter, filters.OrderingFilter, SpecFilterBackend]
     search_fields = ["name", "specs_text", "brand"]
     ordering_fields = ["created_at", "price_min_ksh", "price_max_ksh", "name"]
     ordering = ["brand", "name"]
@@ -1,7 +1,8 @@
 from rest_framework import serializers
+from backend.metrics import TimedModelSerializer
 from .models import StorageDevice
 
-class StorageDeviceSerializer(serializers.ModelSerializer):
+class StorageDeviceSerializer(TimedModelSerializer):
     brand_display = serializers.CharField(source="get_brand_display", read_only=True)
     price_display = serializers.SerializerMethodField()
     image = serializers.SerializerMethodField()
@@ -1,4 +1,5 @@
 from rest_framework import generics, filters
+from catalog.specs import SpecFilterBackend
 from .models import StorageDevice
 from .serializers import StorageDeviceSerializer
 
@@ -10,10 +11,11 @@ class StorageDeviceListView(generics.ListAPIView):
       - search=<text> (searches name/specs_text/brand/interface/form_factor)
       - ordering=created_at|price_min_ksh|price_max_ksh|name (prefix with '-' for desc)
       - page, page_size (if pagination enabled)
+      - ram_gb, storage_gb, battery_mah, camera_mp, display_inches (=, _min=, _max=; see catalog.specs)
     """
     serializer_class = StorageDeviceSerializer
     queryset = StorageDevice.objects.all()
-    filter_backends = [filters.SearchFilter, filters.OrderingFilter]
+    filter_backends = [filters.SearchFilter, filters.OrderingFilter, SpecFilterBackend]
     search_fields = ["name", "specs_text", "brand", "interface", "form_factor"]
     ordering_fields = ["created_at", "price_min_ksh", "price_max_ksh", "name"]
     ordering = ["brand", "name"]
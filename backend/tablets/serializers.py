@@ -1,8 +1,9 @@
 # tablets/serializers.py
 from rest_framework import serializers
+from backend.metrics import TimedModelSerializer
 from .models import Tablet
 
-class TabletSerializer(serializers.ModelSerializer):
+class TabletSerializer(TimedModelSerializer):
     brand_display = serializers.CharField(source="get_brand_display", read_only=True)
     price_display = serializers.SerializerMethodField()
     image = serializers.SerializerMethodField()  # absolute URL, matches model name
@@ -1,4 +1,5 @@
 from rest_framework import generics, filters
+from catalog.specs import SpecFilterBackend
 from .models import Tablet
 from .serializers import TabletSerializer
 
@@ -9,10 +10,11 @@ class TabletListView(generics.ListAPIView):
       - brand=Samsung|Apple|Lenovo|Huawei|Tablets for Kids|Others
       - search=<text>   (searches name/specs_text/brand)
       - ordering=created_at|price_min_ksh|price_max_ksh|name (prefix with '-' for desc)
+      - ram_gb, storage_gb, battery_mah, camera_mp, display_inches (=, _min=, _max=; see catalog.specs)
     """
     serializer_class = TabletSerializer
     queryset = Tablet.objects.all()  # DRF 'ordering' handles default order
-    filter_backends = [filters.SearchFilter, filters.OrderingFilter]
+    filter_backends = [filters.SearchFilter, filters.OrderingFilter, SpecFilterBackend]
     search_fields = ["name", "specs_text", "brand"]
     ordering_fields = ["created_at", "price_min_ksh", "price_max_ksh", "name"]
     ordering = ["brand", "name"]
@@ -1,7 +1,8 @@
 from rest_framework import serializers
+from backend.metrics import TimedModelSerializer
 from .models import Television
 
-class TelevisionSerializer(serializers.ModelSerializer):
+class TelevisionSerializer(TimedModelSerializer):
     brand_display = serializers.CharField(source="get_brand_display", read_only=True)
     panel_display = serializers.CharField(source="get_panel_display", read_only=True)
     resolution_display = serializers.CharField(source="get_resolution_display", read_only=True)
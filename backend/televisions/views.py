@@ -1,4 +1,5 @@
 from rest_framework import generics, filters
+from catalog.specs import SpecFilterBackend
 from .models import Television
 from .serializers import TelevisionSerializer
 
@@ -13,10 +14,11 @@ class TelevisionListView(generics.ListAPIView):
       - resolution=HD|FHD|UHD|8K
       - search=<text>   (searches name/specs_text/brand/panel/resolution)
       - ordering=created_at|price_min_ksh|price_max_ksh|screen_size_inches|name (prefix with '-' for desc)
+      - ram_gb, storage_gb, battery_mah, camera_mp, display_inches (=, _min=, _max=; see catalog.specs)
     """
     serializer_class = TelevisionSerializer
     queryset = Television.objects.all()
-    filter_backends = [filters.SearchFilter, filters.OrderingFilter]
+    filter_backends = [filters.SearchFilter, filters.OrderingFilter, SpecFilterBackend]
     search_fields = ["name", "specs_text", "brand", "panel", "resolution"]
     ordering_fields = ["created_at", "price_min_ksh", "price_max_ksh", "screen_size_inches", "name"]
     ordering = ["brand", "screen_size_inches", "name"]
@@ -26,6 +26,29 @@ export function getUser() {
   }
 }
 
+/* ------------------------- Guest cart token ------------------------- */
+// Anonymous visitors keep their cart in a signed token issued by /api/cart/guest/.
+const GUEST_CART_KEY = "guest_cart";
+
+function getGuestCartToken() {
+  return localStorage.getItem(GUEST_CART_KEY) || "";
+}
+
+function setGuestCartToken(token) {
+  if (token) localStorage.setItem(GUEST_CART_KEY, token);
+  else localStorage.removeItem(GUEST_CART_KEY);
+}
+
+async function guestCartRequest(operations) {
+  const data = await request("/api/cart/guest/", {
+    method: operations ? "PATCH" : "GET",
+    body: operations ? { operations } : undefined,
+    headers: { "X-Cart-Token": getGuestCartToken() },
+  });
+  setGuestCartToken(data.token);
+  return data;
+}
+
 export function clearAuth() {
   localStorage.removeItem("access");
   localStorage.removeItem("refresh");
@@ -67,11 +90,12 @@ function join(urlBase, path) {
   return `${urlBase}${p}`;
 }
 
-export async function request(path, { method = "GET", body, headers } = {}) {
+export async function request(path, { method = "GET", body, headers, signal } = {}) {
   const res = await fetch(join(API_URL, path), {
     method,
     headers: { "Content-Type": "application/json", ...(headers || {}) },
     body: body ? JSON.stringify(body) : undefined,
+    signal,
   });
 
   let data = null;
@@ -100,10 +124,62 @@ export async function authRequest(path, { method = "GET", body, headers } = {})
     data = await res.json();
   } catch {}
 
-  if (!res.ok) throw new Error(firstMessage(data) || `HTTP ${res.status}`);
+  if (!res.ok) {
+    const err = new Error(firstMessage(data) || `HTTP ${res.status}`);
+    err.status = res.status;
+    err.code = data?.code;
+    throw err;
+  }
   return data;
 }
 
+/** Random key for Idempotency-Key headers (one per logical operation, reused on retry). */
+export function newIdempotencyKey() {
+  if (globalThis.crypto?.randomUUID) return globalThis.crypto.randomUUID();
+  return `${Date.now().toString(36)}-${Math.random().toString(36).slice(2)}${Math.random().toString(36).slice(2)}`;
+}
+
+const sleep = (ms) => new Promise((r) => setTimeout(r, ms));
+
+// Error code of the checkout 409 that means "the same key is still running; ask again".
+export const CHECKOUT_IN_PROGRESS = "idempotency_in_progress";
+
+/* --------------------------- Catalog snapshots --------------------------- */
+// Pre-rendered list responses published by the backend (catalog.snapshots). Plain
+// lists and single-filter lists are read from immutable files; anything else
+// (search, ordering, other filters) goes to the live endpoint.
+const SNAPSHOT_FILTERS = { newiphones: "badge" }; // default "brand"
+const MANIFEST_TTL_MS = 10000;
+let manifestCache = { at: 0, data: null };
+
+async function snapshotManifest() {
+  if (manifestCache.data && Date.now() - manifestCache.at < MANIFEST_TTL_MS) return manifestCache.data;
+  const res = await fetch(join(API_URL, "/snapshots/manifest.json"));
+  if (!res.ok) throw new Error(`HTTP ${res.status}`);
+  manifestCache = { at: Date.now(), data: await res.json() };
+  return manifestCache.data;
+}
+
+async function catalogList(category, path, params = {}) {
+  const filter = SNAPSHOT_FILTERS[category] || "brand";
+  // page/page_size are ignored by the (unpaginated) list endpoints.
+  const { page, page_size, [filter]: value, ...rest } = params;
+  const blank = (v) => v === undefined || v === null || String(v).trim() === "";
+  if (Object.values(rest).every(blank)) {
+    try {
+      const manifest = await snapshotManifest();
+      const name = manifest[blank(value) ? category : `${category}?${filter}=${String(value).trim()}`];
+      if (name) {
+        const res = await fetch(join(API_URL, `/snapshots/${name}`));
+        if (res.ok) return await res.json();
+      }
+    } catch {
+      // fall back to the live endpoint
+    }
+  }
+  return request(`${path}${qs(params)}`);
+}
+
 /* --------------------------------- API ----------------------------------- */
 export const api = {
   /* ------------------------------- Auth ------------------------------- */
@@ -117,6 +193,16 @@ export const api = {
       body: { email, password },
     });
     setTokens({ access: data.access, refresh: data.refresh, user: data.user });
+    const guestToken = getGuestCartToken();
+    if (guestToken) {
+      try {
+        await authRequest("/api/cart/merge/", { method: "POST", body: { token: guestToken } });
+        setGuestCartToken("");
+        window.dispatchEvent(new CustomEvent("cart-updated"));
+      } catch {
+        // Keep the token; the merge can be retried on the next login.
+      }
+    }
     return data;
   },
 
@@ -147,32 +233,38 @@ export const api = {
   },
 
   /* ------------------------------- Cart ------------------------------- */
+  // Without a login the cart is a guest cart (same response shape, plus a token).
   cart: {
     get() {
+      if (!getAccessToken()) return guestCartRequest();
       return authRequest("/api/cart/");
     },
     add(productId, quantity = 1) {
+      if (!getAccessToken()) return guestCartRequest([{ product_id: productId, delta: quantity }]);
       return authRequest("/api/cart/add/", {
         method: "POST",
         body: { product_id: productId, quantity },
       });
     },
     remove(productId) {
+      if (!getAccessToken()) return guestCartRequest([{ product_id: productId, quantity: 0 }]);
       return authRequest("/api/cart/remove/", {
         method: "POST",
         body: { product_id: productId },
       });
     },
     increment(productId) {
-      return authRequest("/api/cart/add/", {
-        method: "POST",
-        body: { product_id: productId, quantity: 1 },
-      });
+      return api.cart.add(productId, 1);
     },
     decrement(productId) {
-      return authRequest("/api/cart/add/", {
-        method: "POST",
-        body: { product_id: productId, quantity: -1 },
+      return api.cart.add(productId, -1);
+    },
+    // operations: [{ product_id, delta } | { product_id, quantity }], applied in one transaction
+    update(operations) {
+      if (!getAccessToken()) return guestCartRequest(operations);
+      return authRequest("/api/cart/", {
+        method: "PATCH",
+        body: { operations },
       });
     },
   },
@@ -180,7 +272,7 @@ export const api = {
   /* ------------------------------ Tablets ---------------------------- */
   tablets: {
     list({ brand, search, ordering, page, page_size } = {}) {
-      return request(`/api/tablets/${qs({ brand, search, ordering, page, page_size })}`);
+      return catalogList("tablets", "/api/tablets/", { brand, search, ordering, page, page_size });
     },
     get(id) {
       return request(`/api/tablets/${id}/`);
@@ -190,7 +282,7 @@ export const api = {
   /* --------------------------- Reallaptops ---------------------------- */
   reallaptops: {
     list({ brand, search, ordering, page, page_size } = {}) {
-      return request(`/api/reallaptops/${qs({ brand, search, ordering, page, page_size })}`);
+      return catalogList("reallaptops", "/api/reallaptops/", { brand, search, ordering, page, page_size });
     },
     get(id) {
       return request(`/api/reallaptops/${id}/`);
@@ -200,7 +292,7 @@ export const api = {
   /* ---------------------------- Smartphones --------------------------- */
   smartphones: {
     list({ brand, search, ordering, page, page_size } = {}) {
-      return request(`/api/smartphones/${qs({ brand, search, ordering, page, page_size })}`);
+      return catalogList("smartphones", "/api/smartphones/", { brand, search, ordering, page, page_size });
     },
     get(id) {
       return request(`/api/smartphones/${id}/`);
@@ -210,7 +302,7 @@ export const api = {
   /* ------------------------------ Storages ---------------------------- */
   storages: {
     list({ brand, search, ordering, page, page_size } = {}) {
-      return request(`/api/storages/${qs({ brand, search, ordering, page, page_size })}`);
+      return catalogList("storages", "/api/storages/", { brand, search, ordering, page, page_size });
     },
     get(id) {
       return request(`/api/storages/${id}/`);
@@ -220,7 +312,7 @@ export const api = {
   /* --------------------------- Audio Devices --------------------------- */
   audio: {
     list({ brand, category, search, ordering, page, page_size } = {}) {
-      return request(`/api/audio-devices/${qs({ brand, category, search, ordering, page, page_size })}`);
+      return catalogList("audio", "/api/audio-devices/", { brand, category, search, ordering, page, page_size });
     },
     get(id) {
       return request(`/api/audio-devices/${id}/`);
@@ -230,7 +322,9 @@ export const api = {
   /* ----------------------- Mobile Accessories ------------------------- */
   accessories: {
     list({ brand, category, search, ordering, page, page_size } = {}) {
-      return request(`/api/mobile-accessories/${qs({ brand, category, search, ordering, page, page_size })}`);
+      return catalogList("accessories", "/api/mobile-accessories/", {
+        brand, category, search, ordering, page, page_size,
+      });
     },
     get(id) {
       return request(`/api/mobile-accessories/${id}/`);
@@ -240,9 +334,9 @@ export const api = {
   /* ----------------------------- Televisions --------------------------- */
   televisions: {
     list({ brand, panel, resolution, min_size, max_size, search, ordering, page, page_size } = {}) {
-      return request(
-        `/api/televisions/${qs({ brand, panel, resolution, min_size, max_size, search, ordering, page, page_size })}`
-      );
+      return catalogList("televisions", "/api/televisions/", {
+        brand, panel, resolution, min_size, max_size, search, ordering, page, page_size,
+      });
     },
     get(id) {
       return request(`/api/televisions/${id}/`);
@@ -252,7 +346,7 @@ export const api = {
   // M-KOPA
   mkopa: {
     list({ brand, category, search, ordering, page, page_size } = {}) {
-      return request(`/api/mkopa-items/${qs({ brand, category, search, ordering, page, page_size })}`);
+      return catalogList("mkopa", "/api/mkopa-items/", { brand, category, search, ordering, page, page_size });
     },
     get(id) {
       return request(`/api/mkopa-items/${id}/`);
@@ -262,7 +356,7 @@ export const api = {
   /* --------------------------- Latest Offers --------------------------- */
   latestOffers: {
     list({ brand, label, search, ordering, page, page_size } = {}) {
-      return request(`/api/latest-offers/${qs({ brand, label, search, ordering, page, page_size })}`);
+      return catalogList("offers", "/api/latest-offers/", { brand, label, search, ordering, page, page_size });
     },
     get(id) {
       return request(`/api/latest-offers/${id}/`);
@@ -272,7 +366,9 @@ export const api = {
   /* ---------------------- Budget Smartphones (NEW) --------------------- */
   budgetSmartphones: {
     list({ brand, badge, search, ordering, page, page_size } = {}) {
-      return request(`/api/budget-smartphones/${qs({ brand, badge, search, ordering, page, page_size })}`);
+      return catalogList("budgetsmartphones", "/api/budget-smartphones/", {
+        brand, badge, search, ordering, page, page_size,
+      });
     },
     get(id) {
       return request(`/api/budget-smartphones/${id}/`);
@@ -282,7 +378,7 @@ export const api = {
   /* --------------------------- Dial Phones --------------------------- */
   dialPhones: {
     list({ brand, badge, search, ordering, page, page_size } = {}) {
-      return request(`/api/dial-phones/${qs({ brand, badge, search, ordering, page, page_size })}`);
+      return catalogList("dialphones", "/api/dial-phones/", { brand, badge, search, ordering, page, page_size });
     },
     get(id) {
       return request(`/api/dial-phones/${id}/`);
@@ -292,7 +388,7 @@ export const api = {
   /* --------------------------- New iPhones ---------------------------- */
   newIphones: {
     list({ badge, search, ordering, page, page_size } = {}) {
-      return request(`/api/new-iphones/${qs({ badge, search, ordering, page, page_size })}`);
+      return catalogList("newiphones", "/api/new-iphones/", { badge, search, ordering, page, page_size });
     },
     get(id) {
       return request(`/api/new-iphones/${id}/`);
@@ -314,19 +410,73 @@ export const api = {
     validate() {
       return authRequest("/api/checkout/validate/", { method: "POST" });
     },
-    create({ shipping, billing, payment_method }) {
-      return authRequest("/api/checkout/", {
-        method: "POST",
-        body: { shipping, billing, payment_method },
-      });
+    /**
+     * Place the order. Network failures and "still processing" answers (409 with
+     * code "idempotency_in_progress") are retried with the same idempotency key, so a
+     * retry never creates a second order. Other 409s (e.g. "out_of_stock") are final.
+     */
+    async create({ shipping, billing, payment_method }, idempotencyKey = newIdempotencyKey()) {
+      const attempts = 4;
+      for (let i = 1; ; i++) {
+        try {
+          return await authRequest("/api/checkout/", {
+            method: "POST",
+            headers: { "Idempotency-Key": idempotencyKey },
+            body: { shipping, billing, payment_method },
+          });
+        } catch (e) {
+          const retryable = e.status === undefined || e.code === CHECKOUT_IN_PROGRESS || e.status >= 502;
+          if (!retryable || i >= attempts) throw e;
+          await sleep(500 * 2 ** (i - 1));
+        }
+      }
     },
   },
   orders: {
+    /** Order history page; pass the previous page's `next` URL to continue. */
+    list(nextUrl) {
+      if (!nextUrl) return authRequest("/api/orders/");
+      const u = new URL(nextUrl);
+      return authRequest(`${u.pathname}${u.search}`);
+    },
     getById(id) {
       return authRequest(`/api/orders/${id}/`);
     },
-    receiptStatus(id) {
-      return authRequest(`/api/orders/${id}/receipt/`);
+    // wait > 0: the server holds the request until the receipt is ready (long poll, max 25s)
+    receiptStatus(id, { wait } = {}) {
+      return authRequest(`/api/orders/${id}/receipt/${qs({ wait })}`);
+    },
+    // Server-Sent Events over fetch (EventSource can't send the Authorization header).
+    // Resolves with { ready, download_url } once the receipt exists, or null if the stream timed out.
+    async waitForReceipt(id, { signal } = {}) {
+      const token = getAccessToken();
+      const res = await fetch(join(API_URL, `/api/orders/${id}/receipt/events/`), {
+        headers: {
+          Accept: "text/event-stream",
+          ...(token ? { Authorization: `Bearer ${token}` } : {}),
+        },
+        signal,
+      });
+      if (!res.ok || !res.body) throw new Error(`HTTP ${res.status}`);
+
+      const reader = res.body.pipeThrough(new TextDecoderStream()).getReader();
+      let buffer = "";
+      for (;;) {
+        const { value, done } = await reader.read();
+        if (done) return null;
+        buffer += value;
+        let sep;
+        while ((sep = buffer.indexOf("\n\n")) !== -1) {
+          const block = buffer.slice(0, sep);
+          buffer = buffer.slice(sep + 2);
+          const event = /^event: (.*)$/m.exec(block)?.[1];
+          const data = /^data: (.*)$/m.exec(block)?.[1];
+          if (event === "receipt" || event === "timeout") {
+            reader.cancel();
+            return event === "receipt" ? JSON.parse(data) : null;
+          }
+        }
+      }
     },
     emailReceipt(id) {
       return authRequest(`/api/orders/${id}/email-receipt/`, { method: "POST" });
@@ -336,6 +486,23 @@ export const api = {
     },
   },
 
+  /* ---------------------------- Catalog sync ---------------------------- */
+  catalog: {
+    // Rows added/updated/removed after `since`; pass back `next` while `has_more`.
+    changes(since = 0, { category, limit } = {}) {
+      return request(`/api/catalog/changes/${qs({ since, category, limit })}`);
+    },
+    // Closest rows of the same category by price and specs (smartphones, tablets,
+    // reallaptops, televisions, storages).
+    similar(category, id, limit) {
+      return request(`/api/catalog/${category}/${id}/similar/${qs({ limit })}`);
+    },
+    // Typeahead: { query, results: [{ category, id, name, brand, slug }] }.
+    autocomplete(q, { limit, signal } = {}) {
+      return request(`/api/catalog/autocomplete/${qs({ q, limit })}`, { signal });
+    },
+  },
+
   /* ------------------------------- Search ------------------------------- */
   search: {
     async all(q, { limit = 8 } = {}) {
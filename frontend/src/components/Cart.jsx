@@ -1,7 +1,10 @@
 // src/Pages/Cart.jsx
-import React, { useEffect, useMemo, useState, memo, useCallback } from "react";
+import React, { useEffect, useMemo, useRef, useState, memo, useCallback } from "react";
 import { useNavigate } from "react-router-dom";
-import api from "../api";
+import api, { getAccessToken } from "../api";
+
+// Clicks within this window are sent together as one PATCH /api/cart/
+const FLUSH_DELAY_MS = 300;
 
 // Memoized row to avoid re-rendering all items when one changes
 const CartItemRow = memo(function CartItemRow({
@@ -119,42 +122,109 @@ const Cart = () => {
     });
   }, []);
 
-  const withBusy = (productId, fn) => async () => {
-    setBusyMap((m) => ({ ...m, [productId]: true }));
+  // { [productId]: { delta } | { quantity } } waiting to be sent
+  const pendingRef = useRef({});
+  const timerRef = useRef(null);
+  // Batches sent but not answered yet; each resolves true (saved) or false (failed).
+  const inFlightRef = useRef(new Set());
+  const [checkingOut, setCheckingOut] = useState(false);
+
+  const flush = useCallback(async () => {
+    timerRef.current = null;
+    const pending = pendingRef.current;
+    pendingRef.current = {};
+    const operations = Object.entries(pending).map(([productId, op]) => ({
+      product_id: Number(productId),
+      ...op,
+    }));
+    if (operations.length === 0) return true;
+
+    const ids = Object.keys(pending);
+    setBusyMap((m) => ({ ...m, ...Object.fromEntries(ids.map((id) => [id, true])) }));
+    const request = api.cart.update(operations);
+    const settled = request.then(() => true, () => false);
+    inFlightRef.current.add(settled);
     try {
-      await fn();
+      const data = await request;
+      // Keep the optimistic state if more clicks were queued meanwhile.
+      if (Object.keys(pendingRef.current).length === 0) {
+        setCart(data);
+        broadcastCount(data.items);
+      }
+      return true;
     } catch (err) {
       setError(err.message);
       fetchCart();
+      return false;
     } finally {
+      inFlightRef.current.delete(settled);
       setBusyMap((m) => {
         const copy = { ...m };
-        delete copy[productId];
+        ids.forEach((id) => delete copy[id]);
         return copy;
       });
     }
+  }, []);
+
+  // Send queued clicks now and wait for every batch on the wire; true if all were saved.
+  const flushAll = useCallback(async () => {
+    if (timerRef.current) clearTimeout(timerRef.current);
+    const inFlight = [...inFlightRef.current];
+    const results = await Promise.all([flush(), ...inFlight]);
+    return results.every(Boolean);
+  }, [flush]);
+
+  // Send anything still queued when leaving the page.
+  useEffect(
+    () => () => {
+      if (timerRef.current) {
+        clearTimeout(timerRef.current);
+        flush();
+      }
+    },
+    [flush]
+  );
+
+  const enqueue = (productId, op) => {
+    const prev = pendingRef.current[productId];
+    if ("delta" in op && prev) {
+      op = "quantity" in prev
+        ? { quantity: Math.max(0, prev.quantity + op.delta) }
+        : { delta: prev.delta + op.delta };
+    }
+    pendingRef.current = { ...pendingRef.current, [productId]: op };
+    if (timerRef.current) clearTimeout(timerRef.current);
+    timerRef.current = setTimeout(flush, FLUSH_DELAY_MS);
+  };
+
+  const increment = (productId) => {
+    optimisticUpdate(productId, +1);
+    enqueue(productId, { delta: 1 });
+  };
+
+  const decrement = (productId) => {
+    optimisticUpdate(productId, -1);
+    enqueue(productId, { delta: -1 });
   };
 
-  const increment = (productId) =>
-    withBusy(productId, async () => {
-      optimisticUpdate(productId, +1);
-      await api.cart.increment(productId);
-    })();
-
-  const decrement = (productId) =>
-    withBusy(productId, async () => {
-      optimisticUpdate(productId, -1);
-      await api.cart.decrement(productId);
-    })();
-
-  const removeItem = (productId) =>
-    withBusy(productId, async () => {
-      optimisticUpdate(productId, "remove");
-      await api.cart.remove(productId);
-    })();
-
-  const handleCheckout = () => {
-    if (!cart || cart.items.length === 0) return;
+  const removeItem = (productId) => {
+    optimisticUpdate(productId, "remove");
+    enqueue(productId, { quantity: 0 });
+  };
+
+  const handleCheckout = async () => {
+    if (!cart || cart.items.length === 0 || checkingOut) return;
+    // Checkout reads the server-side cart: save the last clicks first.
+    setCheckingOut(true);
+    const saved = await flushAll();
+    setCheckingOut(false);
+    if (!saved) return; // the error is shown and the cart reloaded
+
+    if (!getAccessToken()) {
+      // Guest cart is merged into the account on login.
+      navigate("/login");
+      return;
+    }
     // 🔹 Scroll to top before navigating
     window.scrollTo({ top: 0, behavior: "smooth" });
     navigate("/checkout");
@@ -186,10 +256,11 @@ const Cart = () => {
       <div className="mt-6 flex justify-between items-center p-4 bg-white rounded-xl shadow">
         <span className="text-xl font-bold">Total: Ksh {total.toFixed(2)}</span>
         <button
-          className="bg-green-600 text-white px-6 py-3 rounded-xl hover:bg-green-700 font-medium"
+          className="bg-green-600 text-white px-6 py-3 rounded-xl hover:bg-green-700 font-medium disabled:opacity-60"
           onClick={handleCheckout}
+          disabled={checkingOut}
         >
-          Checkout
+          {checkingOut ? "Saving cart…" : "Checkout"}
         </button>
       </div>
     </section>
@@ -1,7 +1,7 @@
 // src/Pages/Checkout.jsx
-import React, { useEffect, useMemo, useState } from "react";
+import React, { useEffect, useMemo, useRef, useState } from "react";
 import { useNavigate } from "react-router-dom";
-import api from "../api";
+import api, { CHECKOUT_IN_PROGRESS, getAccessToken, newIdempotencyKey } from "../api";
 
 const emptyShipping = {
   full_name: "",
@@ -28,8 +28,14 @@ export default function Checkout() {
   const [shipping, setShipping] = useState(emptyShipping);
   const [billing, setBilling] = useState(emptyBilling);
   const [paymentMethod, setPaymentMethod] = useState("cod"); // cod | mpesa | card
+  // Same key across retries of one order attempt, so a lost response can't create a second order.
+  const idempotencyKey = useRef(null);
 
   useEffect(() => {
+    if (!getAccessToken()) {
+      navigate("/login");
+      return;
+    }
     (async () => {
       try {
         const c = await api.cart.get();
@@ -95,14 +101,21 @@ export default function Checkout() {
     try {
       await api.checkout.validate();
 
-      const order = await api.checkout.create({
-        shipping: s,
-        billing: b,
-        payment_method: paymentMethod,
-      });
-
+      if (!idempotencyKey.current) idempotencyKey.current = newIdempotencyKey();
+      const order = await api.checkout.create(
+        {
+          shipping: s,
+          billing: b,
+          payment_method: paymentMethod,
+        },
+        idempotencyKey.current
+      );
+
+      idempotencyKey.current = null;
       navigate(`/order-confirmation/${order.id}`);
     } catch (e) {
+      // A definite rejection (e.g. empty cart, out of stock) frees the key; the next attempt is a new order.
+      if (e.status && e.status < 500 && e.code !== CHECKOUT_IN_PROGRESS) idempotencyKey.current = null;
       setError(e.message || "Failed to place order.");
     } finally {
       setPlacing(false);
@@ -9,6 +9,23 @@ import logo from "../assets/logo.svg";
 import { getAccessToken, getUser, clearAuth } from "../api";
 import api from "../api";
 
+// Detail page route per catalog category (backend app label), for autocomplete picks.
+const DETAIL_PATHS = {
+  smartphones: "/smartphone",
+  tablets: "/tablet",
+  storages: "/storage",
+  audio: "/audio",
+  accessories: "/accessories",
+  televisions: "/televisions",
+  mkopa: "/mkopa",
+  reallaptops: "/reallaptop",
+  offers: "/latest-offers",
+  budgetsmartphones: "/budget-smartphones",
+  dialphones: "/dialphones",
+  newiphones: "/new-iphones",
+};
+const SUGGEST_DELAY_MS = 120;
+
 const Header = () => {
   const navigate = useNavigate();
 
@@ -18,6 +35,11 @@ const Header = () => {
   // NEW: query state for both desktop + mobile
   const [query, setQuery] = useState("");
 
+  // Autocomplete suggestions for the query
+  const [suggestions, setSuggestions] = useState([]);
+  const [suggestOpen, setSuggestOpen] = useState(false);
+  const [activeSuggestion, setActiveSuggestion] = useState(-1);
+
   // Auth state
   const [isAuthed, setIsAuthed] = useState(Boolean(getAccessToken()));
   const [user, setUser] = useState(getUser());
@@ -50,7 +72,6 @@ const Header = () => {
 
   // Fetch cart items
   const fetchCartCount = async () => {
-    if (!isAuthed) return setCartCount(0);
     try {
       const data = await api.cart.get();
       const totalItems = (data.items || []).reduce((acc, item) => acc + item.quantity, 0);
@@ -91,6 +112,29 @@ const Header = () => {
     };
   }, []);
 
+  // Fetch suggestions shortly after typing stops; a newer keystroke aborts the older request
+  useEffect(() => {
+    const q = query.trim();
+    if (q.length < 2) {
+      setSuggestions([]);
+      return;
+    }
+    const controller = new AbortController();
+    const timer = setTimeout(() => {
+      api.catalog
+        .autocomplete(q, { limit: 8, signal: controller.signal })
+        .then((data) => {
+          setSuggestions(data?.results || []);
+          setActiveSuggestion(-1);
+        })
+        .catch(() => {}); // aborted or offline: plain search still works
+    }, SUGGEST_DELAY_MS);
+    return () => {
+      clearTimeout(timer);
+      controller.abort();
+    };
+  }, [query]);
+
   // Auto-focus the mobile search input when opened
   useEffect(() => {
     if (mobile.searchOpen && mobileSearchInputRef.current) {
@@ -137,9 +181,42 @@ const Header = () => {
     const q = (query || "").trim();
     if (!q) return;
     setMobile((m) => ({ ...m, menuOpen: false, searchOpen: false }));
+    setSuggestOpen(false);
     navigate(`/search?q=${encodeURIComponent(q)}`);
   };
 
+  const pickSuggestion = (s) => {
+    setSuggestOpen(false);
+    setQuery("");
+    setMobile((m) => ({ ...m, menuOpen: false, searchOpen: false }));
+    navigate(`${DETAIL_PATHS[s.category] || "/search"}/${s.id}`);
+  };
+
+  const handleSearchChange = (e) => {
+    setQuery(e.target.value);
+    setSuggestOpen(true);
+  };
+
+  // Arrow keys move through the suggestions, Enter opens the highlighted one (or searches)
+  const handleSearchKeyDown = (e) => {
+    const count = suggestOpen ? suggestions.length : 0;
+    if (e.key === "ArrowDown" && suggestions.length) {
+      e.preventDefault();
+      setSuggestOpen(true);
+      setActiveSuggestion((i) => (i + 1) % suggestions.length);
+    } else if (e.key === "ArrowUp" && count) {
+      e.preventDefault();
+      setActiveSuggestion((i) => (i <= 0 ? count - 1 : i - 1));
+    } else if (e.key === "Escape") {
+      setSuggestOpen(false);
+    } else if (e.key === "Enter") {
+      if (count && activeSuggestion >= 0) pickSuggestion(suggestions[activeSuggestion]);
+      else goSearch();
+    }
+  };
+
+  const showSuggestions = suggestOpen && suggestions.length > 0;
+
   // NEW: Centralized cart click handler with login redirection
   const handleCartClick = () => {
     if (isAuthed) {
@@ -173,8 +250,12 @@ const Header = () => {
             placeholder="Search for products..."
             className="flex-1 border-t border-b border-blue-600 px-4 py-2 focus:outline-none"
             value={query}
-            onChange={(e) => setQuery(e.target.value)}
-            onKeyDown={(e) => e.key === "Enter" && goSearch()}
+            onChange={handleSearchChange}
+            onKeyDown={handleSearchKeyDown}
+            onBlur={() => setSuggestOpen(false)}
+            role="combobox"
+            aria-expanded={showSuggestions}
+            aria-autocomplete="list"
           />
           <button
             className="bg-blue-700 text-white px-4 py-2 rounded-r-md hover:bg-blue-800 transition"
@@ -183,6 +264,15 @@ const Header = () => {
             Search
           </button>
 
+          {showSuggestions && !showDropdownLinks && (
+            <SuggestList
+              items={suggestions}
+              active={activeSuggestion}
+              onPick={pickSuggestion}
+              className="left-40 right-0"
+            />
+          )}
+
           {/* Dropdown links for "All Categories" */}
           {showDropdownLinks && (
             <div
@@ -304,9 +394,18 @@ const Header = () => {
                 !mobile.searchOpen ? "w-0 opacity-0 pointer-events-none" : "w-36 opacity-100 mr-2",
               ].join(" ")}
               value={query}
-              onChange={(e) => setQuery(e.target.value)}
-              onKeyDown={(e) => e.key === "Enter" && goSearch()}
+              onChange={handleSearchChange}
+              onKeyDown={handleSearchKeyDown}
+              onBlur={() => setSuggestOpen(false)}
             />
+            {mobile.searchOpen && showSuggestions && (
+              <SuggestList
+                items={suggestions}
+                active={activeSuggestion}
+                onPick={pickSuggestion}
+                className="right-0 w-64"
+              />
+            )}
             <button
               aria-label="Toggle search"
               aria-expanded={mobile.searchOpen}
@@ -467,4 +566,28 @@ const PanelLink = ({ to, onSelect, children, innerRef }) => (
   </Link>
 );
 
+// Items react on mousedown, not click: it fires before the input's blur closes the list.
+const SuggestList = ({ items, active, onPick, className }) => (
+  <ul
+    role="listbox"
+    className={`absolute top-full mt-1 bg-white border border-gray-300 rounded shadow-lg z-50 max-h-96 overflow-y-auto text-sm ${className}`}
+  >
+    {items.map((s, i) => (
+      <li
+        key={`${s.category}:${s.id}`}
+        role="option"
+        aria-selected={i === active}
+        className={`px-4 py-2 cursor-pointer ${i === active ? "bg-blue-50 text-blue-700" : "hover:bg-blue-50"}`}
+        onMouseDown={(e) => {
+          e.preventDefault();
+          onPick(s);
+        }}
+      >
+        <span className="font-medium">{s.name}</span>
+        {s.brand && <span className="ml-2 text-gray-500">{s.brand}</span>}
+      </li>
+    ))}
+  </ul>
+);
+
 export default Header;
@@ -27,31 +27,41 @@ export default function OrderConfirmation() {
     })();
   }, [id]);
 
-  // Poll receipt status until ready (or up to ~60s)
+  // Wait for the receipt on one held connection (SSE); fall back to long polling
   useEffect(() => {
-    let attempts = 0;
-    let timer = null;
+    const controller = new AbortController();
+    let cancelled = false;
 
-    async function check() {
-      attempts += 1;
+    const markReady = (s) => {
+      if (cancelled) return;
+      setReceiptReady(true);
+      setReceiptUrl(s.download_url || api.orders.downloadUrl(id));
+    };
+
+    (async () => {
       try {
-        const s = await api.orders.receiptStatus(id);
-        if (s.ready) {
-          setReceiptReady(true);
-          setReceiptUrl(s.download_url || api.orders.downloadUrl(id));
-          return; // stop polling
-        }
+        const s = await api.orders.waitForReceipt(id, { signal: controller.signal });
+        if (s) markReady(s);
+        return;
       } catch {
-        // ignore
+        // stream not available (old browser, proxy, network) -> long poll below
       }
-      if (attempts < 15) { // 15 * 4s = 60s
-        timer = setTimeout(check, 4000);
+      for (let attempt = 0; attempt < 5 && !cancelled; attempt++) { // ~5 x 25s
+        try {
+          const s = await api.orders.receiptStatus(id, { wait: 25 });
+          if (s.ready) {
+            markReady(s);
+            return;
+          }
+        } catch {
+          await new Promise((r) => setTimeout(r, 4000));
+        }
       }
-    }
+    })();
 
-    check();
     return () => {
-      if (timer) clearTimeout(timer);
+      cancelled = true;
+      controller.abort();
     };
   }, [id]);
 
@@ -2,6 +2,7 @@ import React, { useEffect, useState } from "react";
 import { useParams, useNavigate } from "react-router-dom";
 import api from "../api";
 import { toast } from "react-toastify";
+import SimilarProducts from "./SimilarProducts";
 
 const FallbackImg = "/images/fallback.jpg";
 
@@ -176,6 +177,8 @@ export default function ReallaptopDetail() {
           </div>
         </div>
       </div>
+
+      <SimilarProducts category="reallaptops" id={id} detailPath="/reallaptop" />
     </div>
   );
 }
@@ -0,0 +1,61 @@
+// src/components/SimilarProducts.jsx
+import React, { useEffect, useState } from "react";
+import { useNavigate } from "react-router-dom";
+import api from "../api";
+
+const FallbackImg = "/images/fallback.jpg";
+
+// "Similar products" strip for a detail page. `category` is the backend app label
+// (e.g. "smartphones"), `detailPath` the route prefix of this category's detail page.
+export default function SimilarProducts({ category, id, detailPath, limit = 6 }) {
+  const navigate = useNavigate();
+  const [items, setItems] = useState([]);
+
+  useEffect(() => {
+    let cancelled = false;
+    api.catalog
+      .similar(category, id, limit)
+      .then((rows) => {
+        if (!cancelled) setItems(Array.isArray(rows) ? rows : []);
+      })
+      .catch(() => {
+        if (!cancelled) setItems([]); // optional section; the page works without it
+      });
+    return () => {
+      cancelled = true;
+    };
+  }, [category, id, limit]);
+
+  if (!items.length) return null;
+
+  return (
+    <section className="mt-12">
+      <h2 className="text-xl font-semibold mb-4">Similar products</h2>
+      <div className="grid gap-4 grid-cols-2 sm:grid-cols-3 lg:grid-cols-6">
+        {items.map((item) => (
+          <button
+            key={item.id}
+            className="text-left border rounded p-3 bg-white hover:shadow"
+            onClick={() => navigate(`${detailPath}/${item.id}`)}
+          >
+            <div className="h-32 flex items-center justify-center mb-2">
+              <img
+                src={item.image || FallbackImg}
+                alt={item.name}
+                className="max-h-full max-w-full object-contain"
+                loading="lazy"
+                onError={(e) => {
+                  e.currentTarget.src = FallbackImg;
+                }}
+              />
+            </div>
+            <div className="text-sm font-medium line-clamp-2">{item.name}</div>
+            <div className="text-sm text-blue-600 mt-1">
+              {item.price_display || `${item.price_min_ksh} KSh`}
+            </div>
+          </button>
+        ))}
+      </div>
+    </section>
+  );
+}
@@ -3,6 +3,7 @@ import React, { useEffect, useState } from "react";
 import { useParams, useNavigate } from "react-router-dom";
 import api from "../api";
 import { toast } from "react-toastify";
+import SimilarProducts from "./SimilarProducts";
 
 const FallbackImg = "/images/fallback.jpg";
 
@@ -206,6 +207,8 @@ export default function SmartphoneDetail() {
           </div>
         </div>
       </div>
+
+      <SimilarProducts category="smartphones" id={id} detailPath="/smartphone" />
     </div>
   );
 }
@@ -2,6 +2,7 @@ import React, { useEffect, useState } from "react";
 import { useParams, useNavigate } from "react-router-dom";
 import api from "../api";
 import { toast } from "react-toastify";
+import SimilarProducts from "./SimilarProducts";
 
 const FallbackImg = "/images/fallback.jpg";
 
@@ -177,6 +178,8 @@ export default function StorageDetail() {
           </div>
         </div>
       </div>
+
+      <SimilarProducts category="storages" id={id} detailPath="/storage" />
     </div>
   );
 }
@@ -2,6 +2,7 @@ import React, { useEffect, useState } from "react";
 import { useParams, useNavigate } from "react-router-dom";
 import api from "../api";
 import { toast } from "react-toastify";
+import SimilarProducts from "./SimilarProducts";
 
 const FallbackImg = "/images/fallback.jpg";
 
@@ -156,6 +157,8 @@ export default function TabletDetail() {
           </div>
         </div>
       </div>
+
+      <SimilarProducts category="tablets" id={id} detailPath="/tablet" />
     </div>
   );
 }
@@ -3,6 +3,7 @@ import React, { useEffect, useState } from "react";
 import { useParams, useNavigate } from "react-router-dom";
 import api from "../api";
 import { toast } from "react-toastify";
+import SimilarProducts from "./SimilarProducts";
 
 const FallbackImg = "/images/fallback.jpg";
 
@@ -198,6 +199,8 @@ export default function TelevisionDetail() {
           </div>
         </div>
       </div>
+
+      <SimilarProducts category="televisions" id={id} detailPath="/televisions" />
     </div>
   );
 }